@@ -1,13 +0,0 @@
-const products = [
-  {
-    "id": 1,
-    "name": "sa",
-    "price": 100.0,
-    "category": "Parfumerie",
-    "rating": 5,
-    "badge": "Nouveau",
-    "description": "",
-    "image_path": "images\\product_1761637270.png",
-    "icon": "\ud83c\udf81"
-  }
-];
\ No newline at end of file
@@ -1,13 +0,0 @@
-const products = [
-  {
-    "id": 2,
-    "name": "sauvaGE",
-    "price": 100.0,
-    "category": "Parfumerie",
-    "rating": 5,
-    "badge": "Nouveau",
-    "description": "",
-    "image_path": "images\\product_1761640519.png",
-    "icon": "\ud83c\udf81"
-  }
-];
\ No newline at end of file
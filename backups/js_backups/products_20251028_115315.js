@@ -1 +0,0 @@
-const products = [];
\ No newline at end of file
@@ -1,13 +0,0 @@
-const products = [
-  {
-    "id": 3,
-    "name": "Serum",
-    "price": 3000.0,
-    "category": "Soins Visage",
-    "rating": 5,
-    "badge": "Bio",
-    "description": "",
-    "image_path": "images\\product_1761641568.jpeg",
-    "icon": "\ud83c\udf81"
-  }
-];
\ No newline at end of file
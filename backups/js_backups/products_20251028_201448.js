@@ -1,13 +0,0 @@
-const products = [
-  {
-    "id": 4,
-    "name": "serum",
-    "price": 1000.0,
-    "category": "Soins Visage",
-    "rating": 5,
-    "badge": "Nouveau",
-    "description": "",
-    "image_path": "images\\product_1761661908.jpeg",
-    "icon": "\ud83c\udf81"
-  }
-];
\ No newline at end of file
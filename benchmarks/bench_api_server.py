@@ -0,0 +1,89 @@
+# benchmarks/bench_api_server.py
+
+"""
+Débit de l'API HTTP du catalogue (modules/api_server.py) : plusieurs
+clients keep-alive envoient des requêtes variées (pages, filtres, tris,
+GET conditionnels) au serveur, dans le même processus.
+
+Usage : python benchmarks/bench_api_server.py [nb_produits] [nb_requêtes]
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+from common import CATEGORIES, make_products
+
+from modules.api_server import CatalogApiServer
+from modules.database_manager import DatabaseManager
+from modules.product_service import ProductService
+
+CLIENTS = 8
+
+URLS = [
+    "/api/products",
+    "/api/products?page=2&sort=price-asc",
+    "/api/products?sort=name&page_size=48",
+    "/api/products?q=serum",
+    "/api/products?min_price=1000&max_price=5000&sort=price-desc",
+    "/api/products/1",
+    "/api/categories",
+] + [f"/api/products?category={c.replace(' ', '%20').replace('&', '%26')}" for c in CATEGORIES]
+
+
+async def client(port, count, conditional, stats):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    etags = {}
+    for i in range(count):
+        url = URLS[i % len(URLS)]
+        extra = f"If-None-Match: {etags[url]}\r\n" if conditional and url in etags else ""
+        writer.write(f"GET {url} HTTP/1.1\r\nHost: localhost\r\n{extra}\r\n".encode())
+        await writer.drain()
+
+        status = int((await reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await reader.readline()
+            if line == b"\r\n":
+                break
+            name, _, value = line.decode().partition(":")
+            if name.lower() == "content-length":
+                length = int(value)
+            elif name.lower() == "etag":
+                etags[url] = value.strip()
+        await reader.readexactly(length)
+        stats[status] = stats.get(status, 0) + 1
+    writer.close()
+
+
+async def run(service, total, conditional):
+    server = CatalogApiServer(service, port=0)
+    await server.start()
+    stats = {}
+    start = time.perf_counter()
+    await asyncio.gather(*(client(server.port, total // CLIENTS, conditional, stats)
+                           for _ in range(CLIENTS)))
+    elapsed = time.perf_counter() - start
+    await server.stop()
+    label = "GET conditionnels" if conditional else "GET simples"
+    print(f"{label:<20}{total / elapsed:>10.0f} req/s   statuts : {stats}")
+
+
+def main(count, total):
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        with open("products.json", "w", encoding="utf-8") as f:
+            json.dump(make_products(count), f, ensure_ascii=False)
+        service = ProductService(DatabaseManager("products.json"))
+
+        print(f"{count} produits, {total} requêtes, {CLIENTS} clients keep-alive")
+        asyncio.run(run(service, total, conditional=False))
+        asyncio.run(run(service, total, conditional=True))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 20000)
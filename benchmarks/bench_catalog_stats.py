@@ -0,0 +1,59 @@
+# benchmarks/bench_catalog_stats.py
+
+"""
+Coût d'un rafraîchissement du tableau de bord après une modification :
+compteurs de CatalogStats tenus à jour (replace() + summary()), comparés
+au recalcul complet sur tous les produits. Vérifie après une série de
+modifications que les compteurs tenus à jour égalent le recalcul.
+
+Usage : python benchmarks/bench_catalog_stats.py [nb_produits ...]
+"""
+
+import random
+import sys
+
+from common import BADGES, CATEGORIES, make_products, timed
+
+from modules.catalog_stats import CatalogStats
+from modules.product import Product, replace
+
+MODIFICATIONS = 1000
+
+
+def run(count):
+    products = Product.from_dicts(make_products(count))
+    build_time, stats = timed(CatalogStats, products)
+    rng = random.Random(count)
+
+    def modify():
+        """Une modification (comme ProductService.update()) puis un rafraîchissement."""
+        row = rng.randrange(len(products))
+        old = products[row]
+        new = products[row] = replace(old, price=round(rng.uniform(100, 60000), 2),
+                                      category=rng.choice(CATEGORIES), badge=rng.choice(BADGES),
+                                      image_path=rng.choice(('', old.image_path)))
+        stats.replace(old, new)
+        return stats.summary()
+
+    incremental_time, _ = timed(lambda: [modify() for _ in range(MODIFICATIONS)], repeat=1)
+    recompute_time, expected = timed(lambda: CatalogStats(products).summary())
+    identical = stats.summary() == expected
+
+    per_refresh = incremental_time / MODIFICATIONS
+    print(f"\n{count} produits")
+    print(f"  recalcul complet : {recompute_time * 1000:>8.1f} ms")
+    print(f"  tenu à jour      : {per_refresh * 1000:>8.3f} ms par modification"
+          f"   x{recompute_time / per_refresh:.0f}   (premier calcul : {build_time * 1000:.0f} ms)")
+    print("  compteurs identiques au recalcul : " + ("oui" if identical else "NON"))
+    return identical
+
+
+def main(counts):
+    ok = True
+    for count in counts:
+        ok = run(count) and ok
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main([int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000]))
@@ -0,0 +1,66 @@
+# benchmarks/bench_cli_startup.py
+
+"""
+Mesure le temps de démarrage de la ligne de commande (python -m modules.cli)
+comparé à l'interpréteur seul et à l'import de l'interface graphique, puis
+affiche les imports les plus coûteux d'un 'cli export' (python -X importtime).
+
+Usage : python benchmarks/bench_cli_startup.py [nb_produits]
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from common import make_products, timed
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run(command, cwd):
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    return subprocess.run(command, cwd=cwd, env=env, capture_output=True, text=True)
+
+
+def top_imports(command, cwd, count=10):
+    """Imports les plus longs (temps cumulé, en ms) d'une commande."""
+    stderr = run([sys.executable, "-X", "importtime"] + command[1:], cwd).stderr
+    timings = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        timings.append((int(cumulative) / 1000, name.rstrip()))
+    return sorted(timings, reverse=True)[:count]
+
+
+def main(count):
+    with tempfile.TemporaryDirectory() as workdir:
+        with open(os.path.join(workdir, "products.json"), "w", encoding="utf-8") as f:
+            json.dump(make_products(count), f, ensure_ascii=False)
+        # Premier export : les suivants mesurent le cas « déjà à jour »
+        run([sys.executable, "-m", "modules.cli", "export"], workdir)
+
+        commands = [
+            ("python -c pass", [sys.executable, "-c", "pass"], workdir),
+            ("cli --help", [sys.executable, "-m", "modules.cli", "--help"], workdir),
+            ("cli export", [sys.executable, "-m", "modules.cli", "export"], workdir),
+            ("cli list --limit 1", [sys.executable, "-m", "modules.cli", "list", "--limit", "1"], workdir),
+            ("import gestion", [sys.executable, "-c", "import gestion"], ROOT),
+        ]
+
+        print(f"{count} produits, meilleur temps sur 5 lancements\n")
+        for label, command, cwd in commands:
+            elapsed, result = timed(run, command, cwd, repeat=5)
+            status = "" if result.returncode == 0 else "  (échec : dépendance absente ?)"
+            print(f"{label:<22}{elapsed * 1000:>8.1f} ms{status}")
+
+        print("\nImports les plus coûteux de 'cli export' :")
+        for cumulative, name in top_imports(commands[2][1], workdir):
+            print(f"{cumulative:>8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,157 @@
+# benchmarks/bench_concurrent_writers.py
+
+"""
+Test de charge multi-processus : plusieurs processus (comme plusieurs
+postes lançant gestion.py) ajoutent, modifient et suppriment des produits
+dans le même products.json, puis on vérifie qu'aucune modification n'a
+été perdue :
+- chaque produit ajouté est présent une seule fois, et les ids sont uniques
+- la dernière modification de chaque processus sur ses produits est présente
+- les produits supprimés ont disparu
+- le numéro de version a augmenté d'autant que d'écritures réussies.
+
+La même charge est rejouée sans le verrou inter-processus, pour comparaison.
+
+Usage : python benchmarks/bench_concurrent_writers.py [nb_processus] [opérations_par_processus]
+"""
+
+import contextlib
+import json
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+from common import make_products
+
+from modules.database_manager import DatabaseManager
+from modules.product_service import ProductService
+
+INITIAL_PRODUCTS = 1000
+SHARED_IDS = range(1, 11)   # produits modifiés par tous les processus
+
+
+class UnlockedDatabaseManager(DatabaseManager):
+    """
+    Stockage JSON dont le verrou n'est pas exposé au service : chaque écriture
+    reste atomique, mais relecture et écriture ne forment plus une seule
+    opération (comportement d'avant).
+    """
+
+    def lock(self):
+        return contextlib.nullcontext()
+
+
+def find(service, name):
+    return next((p for p in service.get_all() if p['name'] == name), None)
+
+
+def writer(worker, operations, journal, locked):
+    """Charge d'un processus. Retourne ce qu'il a écrit, pour vérification."""
+    manager = DatabaseManager if locked else UnlockedDatabaseManager
+    service = ProductService(manager("products.json", journal=journal))
+    rng = random.Random(worker)
+    added = []       # noms des produits ajoutés par ce processus
+    prices = {}      # nom -> dernier prix enregistré
+    deleted = set()
+    commits = 0
+
+    for i in range(operations):
+        choice = rng.random()
+        if choice < 0.5 or not prices:
+            name = f"P{worker}-{i}"
+            success, _ = service.add({'name': name, 'price': 100 + i, 'category': 'Test'})
+            if success:
+                added.append(name)
+                prices[name] = float(100 + i)
+        elif choice < 0.8:
+            # Modification d'un de ses produits, avec contrôle de version
+            name = rng.choice(list(prices))
+            product = find(service, name)
+            if product is None:
+                continue
+            price = float(rng.randint(1, 10000))
+            success, _ = service.update(product['id'], {**product, 'price': price}, expected=product)
+            if success:
+                prices[name] = price
+        elif choice < 0.9:
+            # Modification concurrente d'un produit commun (le dernier gagne)
+            product = service.get_by_id(rng.choice(SHARED_IDS))
+            success, _ = service.update(product['id'], {**product, 'rating': rng.randint(1, 5)})
+        else:
+            name = rng.choice(list(prices))
+            product = find(service, name)
+            if product is None:
+                continue
+            success, _ = service.delete(product['id'])
+            if success:
+                del prices[name]
+                deleted.add(name)
+        commits += success
+    return added, prices, deleted, commits
+
+
+def run(processes, operations, journal, locked):
+    with open("products.json", "w", encoding="utf-8") as f:
+        json.dump(make_products(INITIAL_PRODUCTS), f, ensure_ascii=False)
+    for leftover in ("products.journal", "products.version"):
+        if os.path.exists(leftover):
+            os.remove(leftover)
+    version_before = DatabaseManager("products.json").get_version()
+
+    start = time.perf_counter()
+    with multiprocessing.Pool(processes) as pool:
+        results = pool.starmap(writer, [(worker, operations, journal, locked)
+                                        for worker in range(processes)])
+    elapsed = time.perf_counter() - start
+
+    db = DatabaseManager("products.json", journal=journal)
+    stored = db.load()
+    by_name = {}
+    for product in stored:
+        by_name.setdefault(product['name'], []).append(product)
+
+    problems = []
+    ids = [product['id'] for product in stored]
+    if len(ids) != len(set(ids)):
+        problems.append(f"{len(ids) - len(set(ids))} id(s) en double")
+    commits = 0
+    for added, prices, deleted, worker_commits in results:
+        commits += worker_commits
+        lost = [name for name in prices if len(by_name.get(name, ())) != 1]
+        stale = [name for name, price in prices.items()
+                 if len(by_name.get(name, ())) == 1 and by_name[name][0]['price'] != price]
+        revived = [name for name in deleted if name in by_name]
+        if lost:
+            problems.append(f"{len(lost)} produit(s) ajouté(s) perdu(s) ou en double")
+        if stale:
+            problems.append(f"{len(stale)} modification(s) perdue(s)")
+        if revived:
+            problems.append(f"{len(revived)} suppression(s) perdue(s)")
+    # Une écriture par opération, plus les compactions du journal
+    if not journal and db.get_version() - version_before != commits:
+        problems.append(f"version +{db.get_version() - version_before} "
+                        f"pour {commits} écriture(s)")
+
+    label = f"{'journal' if journal else 'JSON'}, {'avec' if locked else 'sans'} verrou"
+    status = "OK" if not problems else "ÉCHEC : " + ", ".join(problems)
+    print(f"{label:<26}{commits / elapsed:>8.0f} écritures/s   {status}")
+    return not problems
+
+
+def main(processes, operations):
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        print(f"{processes} processus x {operations} opérations, "
+              f"{INITIAL_PRODUCTS} produits au départ\n")
+        ok = run(processes, operations, journal=False, locked=True)
+        ok = run(processes, operations, journal=True, locked=True) and ok
+        run(processes, operations, journal=False, locked=False)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 4,
+                  int(sys.argv[2]) if len(sys.argv) > 2 else 200))
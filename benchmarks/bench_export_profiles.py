@@ -0,0 +1,57 @@
+# benchmarks/bench_export_profiles.py
+
+"""
+Compare la taille et le temps de l'export products.js entre le profil
+'dev' (sortie historique : indentée, emojis échappés) et le profil
+'production' (compact, UTF-8 brut, .gz/.br précompressés).
+
+Usage : python benchmarks/bench_export_profiles.py [nb_produits ...]
+"""
+
+import contextlib
+import importlib.util
+import io
+import os
+import sys
+import tempfile
+
+from common import make_products, timed
+
+from modules.products_exporter import ProductsExporter
+
+
+def file_size(path):
+    return os.path.getsize(path) if os.path.exists(path) else None
+
+
+def export_quietly(exporter, products):
+    # Les messages de l'exporteur ne nous intéressent pas ici
+    with contextlib.redirect_stdout(io.StringIO()):
+        return exporter.export_to_js(products, force=True)
+
+
+def run(count):
+    products = make_products(count)
+    print(f"\n{count} produits")
+    print(f"{'profil':<12}{'temps':>11}{'products.js':>14}{'.gz':>12}{'.br':>12}")
+
+    cwd = os.getcwd()
+    for profile in ("dev", "production"):
+        with tempfile.TemporaryDirectory() as workdir:
+            os.chdir(workdir)
+            try:
+                exporter = ProductsExporter(profile=profile, search_index=False)
+                elapsed, _ = timed(export_quietly, exporter, products)
+                sizes = [file_size(exporter.js_file + ext) for ext in ("", ".gz", ".br")]
+            finally:
+                os.chdir(cwd)
+
+        cells = "".join(f"{size / 1024:>10.1f} K" if size else f"{'-':>12}" for size in sizes[1:])
+        print(f"{profile:<12}{elapsed * 1000:>8.1f} ms{sizes[0] / 1024:>12.1f} K{cells}")
+
+
+if __name__ == "__main__":
+    if importlib.util.find_spec('brotli') is None:
+        print("(module brotli absent : pas de fichiers .br)")
+    for n in [int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000]:
+        run(n)
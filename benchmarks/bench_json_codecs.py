@@ -0,0 +1,82 @@
+# benchmarks/bench_json_codecs.py
+
+"""
+Compare les modules JSON disponibles (orjson, msgspec, json) pour la
+lecture et l'écriture de products.json et l'export products.js (profils
+dev et production), et vérifie que les fichiers produits sont identiques
+octet pour octet d'un module à l'autre.
+
+Usage : python benchmarks/bench_json_codecs.py [nb_produits ...]
+"""
+
+import contextlib
+import hashlib
+import io
+import json
+import os
+import sys
+import tempfile
+
+from common import make_products, timed
+
+from modules import json_codec
+from modules.database_manager import DatabaseManager
+from modules.products_exporter import ProductsExporter
+
+
+def digest(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def export(products, profile):
+    exporter = ProductsExporter(profile=profile, search_index=False)
+    # Les messages de l'exporteur ne nous intéressent pas ici
+    with contextlib.redirect_stdout(io.StringIO()):
+        exporter.export_to_js(products, force=True)
+    return digest(exporter.js_file)
+
+
+def run(count):
+    products = make_products(count)
+    print(f"\n{count} produits")
+    print(f"{'module':<10}{'lecture':>10}{'écriture':>11}{'export dev':>13}{'export prod':>14}")
+
+    outputs = {}
+    cwd = os.getcwd()
+    for codec in json_codec.available_codecs():
+        json_codec.set_codec(codec)
+        with tempfile.TemporaryDirectory() as workdir:
+            os.chdir(workdir)
+            try:
+                with open("products.json", "w", encoding="utf-8") as f:
+                    json.dump(products, f, ensure_ascii=False, indent=2)
+                db = DatabaseManager("products.json")
+                with contextlib.redirect_stdout(io.StringIO()):
+                    load_time, loaded = timed(db.load)
+                    save_time, _ = timed(db.save, loaded)
+                dev_time, dev_digest = timed(export, loaded, "dev")
+                prod_time, prod_digest = timed(export, loaded, "production")
+                outputs[codec] = (loaded == products, digest("products.json"),
+                                  dev_digest, prod_digest)
+            finally:
+                os.chdir(cwd)
+        print(f"{codec:<10}{load_time * 1000:>8.0f} ms{save_time * 1000:>9.0f} ms"
+              f"{dev_time * 1000:>11.0f} ms{prod_time * 1000:>12.0f} ms")
+
+    reference = outputs.get('json')
+    identical = all(output[0] and output[1:] == reference[1:] for output in outputs.values())
+    print("Données relues et fichiers identiques d'un module à l'autre : "
+          + ("oui" if identical else "NON"))
+    return identical
+
+
+def main(counts):
+    ok = True
+    for count in counts:
+        ok = run(count) and ok
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main([int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000]))
@@ -0,0 +1,155 @@
+# benchmarks/bench_product_columns.py
+
+"""
+Statistiques et modification des prix en masse : boucle Python sur la
+liste des produits, comparée à la vue en colonnes NumPy
+(ProductService.columns() et reprice()). Vérifie que les deux donnent
+les mêmes résultats et le même products.json.
+
+Nécessite NumPy.
+
+Usage : python benchmarks/bench_product_columns.py [nb_produits ...]
+"""
+
+import contextlib
+import hashlib
+import io
+import json
+import math
+import os
+import sys
+import tempfile
+
+from common import CATEGORIES, make_products, timed
+
+from modules import product_columns
+from modules.database_manager import DatabaseManager
+from modules.product_service import ProductService
+
+PERCENT = 10
+
+
+def python_statistics(products):
+    """Les mêmes statistiques que la vue en colonnes, en parcourant les produits."""
+    categories = {}
+    badges = {}
+    ratings = {}
+    for product in products:
+        price = float(product['price'])
+        rating = int(product['rating'])
+        entry = categories.get(product['category'] or '')
+        if entry is None:
+            entry = categories[product['category'] or ''] = {
+                'count': 0, 'total': 0.0, 'min': price, 'max': price, 'ratings': 0}
+        entry['count'] += 1
+        entry['total'] += price
+        entry['min'] = min(entry['min'], price)
+        entry['max'] = max(entry['max'], price)
+        entry['ratings'] += rating
+        badge = product['badge'] or ''
+        badges[badge] = badges.get(badge, 0) + 1
+        ratings[rating] = ratings.get(rating, 0) + 1
+    prices = [float(product['price']) for product in products]
+    return {
+        'categories': {category: (entry['count'], entry['total'], entry['min'], entry['max'],
+                                  entry['ratings'] / entry['count'])
+                       for category, entry in categories.items()},
+        'badges': badges,
+        'ratings': dict(sorted(ratings.items())),
+        'prices': (len(prices), sum(prices), min(prices), max(prices)),
+    }
+
+
+def columns_statistics(columns):
+    prices = columns.price_summary()
+    return {
+        'categories': {category: (entry['count'], entry['total'], entry['min'], entry['max'],
+                                  entry['mean_rating'])
+                       for category, entry in columns.category_summary().items()},
+        'badges': columns.badge_counts(),
+        'ratings': columns.rating_counts(),
+        'prices': (prices['count'], prices['total'], prices['min'], prices['max']),
+    }
+
+
+def same(a, b):
+    """Égalité, aux arrondis de sommation près."""
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(same(a[key], b[key]) for key in a)
+    if isinstance(a, tuple):
+        return len(a) == len(b) and all(same(x, y) for x, y in zip(a, b))
+    return math.isclose(a, b, rel_tol=1e-9)
+
+
+def digest(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def open_service(products, name):
+    with open(name, "w", encoding="utf-8") as f:
+        json.dump(products, f, ensure_ascii=False, indent=2)
+    return ProductService(DatabaseManager(name))
+
+
+def batch_reprice(service, category):
+    with service.batch() as batch:
+        for product in list(service.get_all()):
+            if product['category'] == category:
+                service.update(product['id'], {**product,
+                                               'price': round(product['price'] * (1 + PERCENT / 100), 2)})
+    return batch.result
+
+
+def run(count):
+    products = make_products(count)
+    category = CATEGORIES[0]
+    print(f"\n{count} produits")
+
+    service = open_service(products, "columns.json")
+    python_time, expected = timed(python_statistics, service.get_all())
+    build_time, columns = timed(product_columns.ProductColumns, service.get_all())
+    columns_time, result = timed(columns_statistics, columns)
+    ok = same(expected, result)
+    print(f"  statistiques   Python : {python_time * 1000:>7.1f} ms   "
+          f"colonnes : {columns_time * 1000:>6.2f} ms (+ {build_time * 1000:.0f} ms de "
+          f"construction)   x{python_time / columns_time:.0f}   "
+          + ("identiques" if ok else "DIFFÉRENTES"))
+
+    # +PERCENT % sur une catégorie : une écriture dans les deux cas. Une
+    # première écriture (premières sauvegardes) est faite hors mesure
+    reference = open_service(products, "batch.json")
+    with contextlib.redirect_stdout(io.StringIO()):
+        service.reprice(0)
+        reference.reprice(0)
+        reprice_time, (success, message) = timed(service.reprice, PERCENT, category=category,
+                                                 repeat=1)
+        ok = ok and success
+        batch_time, (success, _) = timed(batch_reprice, reference, category, repeat=1)
+    identical = success and digest("batch.json") == digest("columns.json")
+    ok = ok and identical
+    print(f"  +{PERCENT} % sur « {category} »   colonnes : {reprice_time * 1000:>7.0f} ms"
+          f"   lot produit par produit : {batch_time * 1000:>7.0f} ms   "
+          f"x{batch_time / reprice_time:.1f}   "
+          + ("fichiers identiques" if identical else "fichiers DIFFÉRENTS"))
+    return ok
+
+
+def main(counts):
+    if not product_columns.is_available():
+        print("NumPy n'est pas installé.")
+        return 1
+    ok = True
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            for count in counts:
+                ok = run(count) and ok
+        finally:
+            os.chdir(cwd)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main([int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000]))
@@ -0,0 +1,69 @@
+# benchmarks/bench_product_memory.py
+
+"""
+Mémoire occupée par le catalogue chargé (octets par produit) : liste de
+dict telle que lue dans products.json, puis liste de Product (avant/après),
+et coût des conversions (from_dicts, to_dict, encodage JSON). Vérifie que
+le JSON écrit depuis les Product est identique à celui écrit depuis les dict.
+
+Usage : python benchmarks/bench_product_memory.py [nb_produits ...]
+"""
+
+import gc
+import sys
+import tracemalloc
+
+from common import make_products, timed
+
+from modules import json_codec
+from modules.product import Product
+
+
+def measure(build):
+    """Octets alloués par build() et encore utilisés par son résultat."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = build()
+        gc.collect()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return size, result
+
+
+def run(count):
+    # Comme au chargement réel : chaque produit a ses propres textes
+    raw = json_codec.encode(make_products(count), pretty=True)
+
+    dict_size, dicts = measure(lambda: json_codec.decode(raw))
+    product_size, products = measure(lambda: Product.from_dicts(json_codec.decode(raw)))
+    converted = sum(type(product) is Product for product in products)
+
+    from_time, _ = timed(Product.from_dicts, dicts)
+    to_time, _ = timed(lambda: [product.to_dict() for product in products])
+    dict_encode_time, dict_data = timed(json_codec.encode, dicts, pretty=True)
+    product_encode_time, product_data = timed(json_codec.encode, products, pretty=True)
+
+    print(f"\n{count} produits ({converted} convertis en Product, module {json_codec.codec})")
+    print(f"  mémoire   dict : {dict_size / count:>6.0f} octets/produit"
+          f"   Product : {product_size / count:>6.0f} octets/produit"
+          f"   ({(1 - product_size / dict_size) * 100:.0f} % de moins)")
+    print(f"  conversion  from_dicts : {from_time * 1000:.0f} ms"
+          f"   to_dict : {to_time * 1000:.0f} ms")
+    print(f"  encodage    dict : {dict_encode_time * 1000:.0f} ms"
+          f"   Product : {product_encode_time * 1000:.0f} ms")
+    identical = dict_data == product_data and converted == count
+    print("  JSON identique : " + ("oui" if identical else "NON"))
+    return identical
+
+
+def main(counts):
+    ok = True
+    for count in counts:
+        ok = run(count) and ok
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main([int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000]))
@@ -0,0 +1,49 @@
+# benchmarks/common.py
+
+"""Outils partagés par les benchmarks : catalogue synthétique et chronométrage."""
+
+import os
+import random
+import sys
+import time
+
+# Permet d'importer 'modules' quand le script est lancé depuis la racine du projet
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CATEGORIES = ["Mode & Vêtements", "Accessoires & Lifestyle", "Soins Visage",
+              "Soins Corps", "Soins Capillaires", "Parfumerie"]
+BADGES = [None, None, "Best-seller", "Nouveau", "Premium", "Bio"]
+ICONS = ["🎁", "💄", "👗", "🌸", "✨", "👜"]
+WORDS = ["sérum", "éclat", "crème", "robe", "élégante", "parfum", "huile", "soin",
+         "velours", "rose", "ambre", "lumière", "douceur", "satin", "jasmin", "argan"]
+
+
+def make_products(count, seed=42):
+    """Génère 'count' produits réalistes (même forme que products.json), le plus récent en premier."""
+    rng = random.Random(seed)
+    products = []
+    for product_id in range(count, 0, -1):
+        products.append({
+            'id': product_id,
+            'name': " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 3))).capitalize(),
+            'price': round(rng.uniform(500, 50000), 2),
+            'category': rng.choice(CATEGORIES),
+            'rating': rng.randint(1, 5),
+            'badge': rng.choice(BADGES),
+            'description': " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 12))),
+            'image_path': f"images\\product_{1761600000 + product_id}.jpeg",
+            'icon': rng.choice(ICONS),
+        })
+    return products
+
+
+def timed(func, *args, repeat=3, **kwargs):
+    """Exécute func 'repeat' fois et retourne (meilleur temps en secondes, dernier résultat)."""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
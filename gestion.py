@@ -7,19 +7,38 @@ import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import os
 import sys
+import shutil
 from pathlib import Path
 import time
-from PIL import Image, ImageTk
 
 # Ajout du chemin du projet pour importer les modules
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 # Import des modules de la structure du projet
-from modules.database_manager import DatabaseManager
-from modules.product_service import ProductService
+from modules.storage_backend import open_storage
+from modules.product_service import CONFLICT_MESSAGE, ProductService
 from modules.products_exporter import ProductsExporter
+from modules.background_worker import BackgroundWorker
+from modules.thumbnail_cache import ThumbnailCache
+from modules import image_pipeline
 from modules.ui_helpers import show_info, show_error, show_warning, ask_yes_no
 
+# Fichier de données : "products.json" (JSON) ou "products.db" (SQLite)
+DB_FILE = os.environ.get("LADYGLAM_DB", "products.json")
+# Mode journal du stockage JSON (ajouts en fin de products.journal)
+DB_JOURNAL = os.environ.get("LADYGLAM_JOURNAL", "0") == "1"
+# Export fragmenté du catalogue pour le site (nécessite un serveur HTTP)
+EXPORT_SHARDED = os.environ.get("LADYGLAM_EXPORT_MODE") == "sharded"
+# Profil d'export : "dev" (JSON indenté) ou "production" (compact + .gz/.br)
+EXPORT_PROFILE = os.environ.get("LADYGLAM_EXPORT_PROFILE", "dev")
+
+PRODUCT_CATEGORIES = ["Mode & Vêtements", "Accessoires & Lifestyle",
+                      "Soins Visage", "Soins Corps", "Soins Capillaires", "Parfumerie"]
+# Filtre de la liste : toutes catégories confondues
+ALL_CATEGORIES = "Toutes les catégories"
+# Délai avant de lancer la recherche pendant la frappe (ms)
+SEARCH_DEBOUNCE_MS = 120
+
 # ============================================================================
 # DESIGN SYSTEM - MINIMALISTE MODE CLAIR (inchangé)
 # ============================================================================
@@ -317,6 +336,331 @@ class SimpleToast(tk.Toplevel):
         else:
             self.destroy()
 
+class VirtualTreeview(tk.Frame):
+    """
+    Liste virtualisée basée sur ttk.Treeview : seules les lignes visibles
+    existent comme éléments Tk ; elles sont réutilisées et remplies à la
+    volée depuis la liste de données lors du défilement. Le coût d'un
+    affichage ne dépend donc pas de la taille du catalogue.
+    """
+    
+    def __init__(self, parent, columns, format_row, key=None, row_height=40,
+                 on_select=None, **tree_kwargs):
+        super().__init__(parent, bg=DS.COLORS['bg_primary'])
+        
+        self.format_row = format_row
+        self.key = key or (lambda item: item.get('id'))
+        self.row_height = row_height
+        self.on_select = on_select
+        
+        self.items = []
+        self.offset = 0            # index du premier élément affiché
+        self.visible_rows = 1      # lignes entièrement visibles
+        self.selected_key = None
+        self._row_ids = []         # éléments Tk réutilisés
+        self._index_cache = None   # clé -> index, construit à la demande
+        
+        self.scrollbar = ttk.Scrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        self.tree = ttk.Treeview(self, columns=columns, show='headings',
+                                 selectmode='browse', **tree_kwargs)
+        self.tree.pack(fill=tk.BOTH, expand=True)
+        
+        self.tree.bind('<Configure>', lambda e: self._resize())
+        self.tree.bind('<<TreeviewSelect>>', self._on_tree_select)
+        self.tree.bind('<MouseWheel>', self._on_mousewheel)
+        self.tree.bind('<Button-4>', lambda e: self.scroll(-3))
+        self.tree.bind('<Button-5>', lambda e: self.scroll(3))
+        self.tree.bind('<Up>', lambda e: self._move_selection(-1))
+        self.tree.bind('<Down>', lambda e: self._move_selection(1))
+        self.tree.bind('<Prior>', lambda e: self._move_selection(-self.visible_rows))
+        self.tree.bind('<Next>', lambda e: self._move_selection(self.visible_rows))
+        self.tree.bind('<Home>', lambda e: self._move_selection(-len(self.items)))
+        self.tree.bind('<End>', lambda e: self._move_selection(len(self.items)))
+    
+    # --- Données ---------------------------------------------------------
+    
+    def set_items(self, items):
+        """Remplace les données affichées (la liste n'est pas copiée)."""
+        self.items = items
+        self._index_cache = None
+        if self.selected_key is not None and self.index_of(self.selected_key) is None:
+            self.selected_key = None
+        self._clamp_offset()
+        self.refresh()
+    
+    def insert_item(self, index, item):
+        """Insère un élément sans tout réafficher (la vue reste en place)."""
+        self.items.insert(index, item)
+        self._index_cache = None
+        if index < self.offset:
+            self.offset += 1
+        self._patch(index)
+    
+    def replace_item(self, index, item):
+        """Remplace un élément ; seule sa ligne est redessinée si elle est visible."""
+        if self._index_cache is not None and self.key(self.items[index]) != self.key(item):
+            self._index_cache = None
+        self.items[index] = item
+        position = index - self.offset
+        if 0 <= position < len(self._row_ids):
+            row_id = self._row_ids[position]
+            self.tree.item(row_id, values=self.format_row(item))
+    
+    def remove_item(self, index):
+        """Retire un élément sans tout réafficher (la vue reste en place)."""
+        item = self.items.pop(index)
+        self._index_cache = None
+        if self.key(item) == self.selected_key:
+            self.selected_key = None
+        if index < self.offset:
+            self.offset -= 1
+        self._patch(index)
+    
+    def _patch(self, index):
+        """
+        Après une insertion/suppression à 'index' : seules les lignes
+        visibles situées après 'index' changent (contenu et rayures).
+        """
+        self._clamp_offset()
+        if index < self.offset + len(self._row_ids):
+            self.refresh()
+        else:
+            self._update_scrollbar()
+    
+    def index_of(self, key):
+        """Index de l'élément de clé 'key', ou None."""
+        # La plupart du temps l'élément cherché est affiché
+        for i in range(self.offset, min(self.offset + len(self._row_ids), len(self.items))):
+            if self.key(self.items[i]) == key:
+                return i
+        if self._index_cache is None:
+            self._index_cache = {self.key(item): i for i, item in enumerate(self.items)}
+        return self._index_cache.get(key)
+    
+    def selected_item(self):
+        """Élément sélectionné, ou None."""
+        if self.selected_key is None:
+            return None
+        index = self.index_of(self.selected_key)
+        return self.items[index] if index is not None else None
+    
+    def clear_selection(self):
+        self.selected_key = None
+        self.tree.selection_remove(*self.tree.selection())
+    
+    # --- Affichage -------------------------------------------------------
+    
+    def _resize(self):
+        """Adapte le nombre de lignes Tk à la hauteur disponible."""
+        if not self._row_ids:
+            self._row_ids.append(self.tree.insert('', 'end', values=()))
+        
+        # Hauteur de l'en-tête : position de la première ligne (une ligne par défaut)
+        height = self.tree.winfo_height()
+        bbox = self.tree.bbox(self._row_ids[0])
+        heading = bbox[1] if bbox else self.row_height
+        self.visible_rows = max(1, (height - heading) // self.row_height)
+        
+        # Une ligne de plus pour la partie basse partiellement visible
+        wanted = self.visible_rows + 1
+        while len(self._row_ids) < wanted:
+            self._row_ids.append(self.tree.insert('', 'end', values=()))
+        while len(self._row_ids) > wanted:
+            self.tree.delete(self._row_ids.pop())
+        
+        self._clamp_offset()
+        self.refresh()
+    
+    def _clamp_offset(self):
+        max_offset = max(0, len(self.items) - self.visible_rows)
+        self.offset = min(max(0, self.offset), max_offset)
+    
+    def refresh(self):
+        """Remplit les lignes Tk avec les éléments de la fenêtre visible."""
+        selected_row = None
+        for i, row_id in enumerate(self._row_ids):
+            index = self.offset + i
+            if index < len(self.items):
+                item = self.items[index]
+                tag = 'evenrow' if index % 2 == 0 else 'oddrow'
+                self.tree.item(row_id, values=self.format_row(item), tags=(tag,))
+                # Rattache la ligne si elle avait été détachée (liste courte)
+                self.tree.move(row_id, '', i)
+                if self.selected_key is not None and self.key(item) == self.selected_key:
+                    selected_row = row_id
+            else:
+                self.tree.detach(row_id)
+        
+        if selected_row:
+            if self.tree.selection() != (selected_row,):
+                self.tree.selection_set(selected_row)
+        elif self.tree.selection():
+            self.tree.selection_remove(*self.tree.selection())
+        
+        self.tree.yview_moveto(0)
+        self._update_scrollbar()
+    
+    def _update_scrollbar(self):
+        total = len(self.items)
+        if total <= self.visible_rows:
+            self.scrollbar.set(0, 1)
+        else:
+            self.scrollbar.set(self.offset / total, (self.offset + self.visible_rows) / total)
+    
+    # --- Défilement ------------------------------------------------------
+    
+    def scroll(self, rows):
+        self.offset += rows
+        self._clamp_offset()
+        self.refresh()
+    
+    def see(self, index):
+        """Fait défiler pour que l'élément 'index' soit visible."""
+        if index < self.offset:
+            self.offset = index
+        elif index >= self.offset + self.visible_rows:
+            self.offset = index - self.visible_rows + 1
+        self._clamp_offset()
+        self.refresh()
+    
+    def _on_scrollbar(self, action, value, unit=None):
+        if action == 'moveto':
+            self.offset = int(float(value) * len(self.items))
+            self._clamp_offset()
+            self.refresh()
+        elif action == 'scroll':
+            step = self.visible_rows if unit == 'pages' else 1
+            self.scroll(int(value) * step)
+    
+    def _on_mousewheel(self, event):
+        self.scroll(-3 if event.delta > 0 else 3)
+        return 'break'
+    
+    # --- Sélection -------------------------------------------------------
+    
+    def _on_tree_select(self, event):
+        selection = self.tree.selection()
+        if not selection or selection[0] not in self._row_ids:
+            return
+        index = self.offset + self._row_ids.index(selection[0])
+        if index >= len(self.items):
+            return
+        key = self.key(self.items[index])
+        # Les sélections faites par refresh() ne changent pas la clé : on les ignore
+        if key == self.selected_key:
+            return
+        self.selected_key = key
+        if self.on_select:
+            self.on_select(self.items[index])
+    
+    def _move_selection(self, delta):
+        """Navigation clavier, y compris au-delà des lignes affichées."""
+        if not self.items:
+            return 'break'
+        current = self.index_of(self.selected_key) if self.selected_key is not None else None
+        index = 0 if current is None else min(max(0, current + delta), len(self.items) - 1)
+        self.selected_key = self.key(self.items[index])
+        self.see(index)
+        if self.on_select:
+            self.on_select(self.items[index])
+        return 'break'
+
+class CatalogDashboard(tk.Toplevel):
+    """
+    Tableau de bord du catalogue : produits par catégorie et par badge,
+    répartition des prix et des notes, produits sans image. Affiche un
+    CatalogSummary (ProductService.statistics()) ; show() le remplace par
+    un plus récent, sans parcourir les produits.
+    """
+    
+    BAR_WIDTH = 160
+    
+    def __init__(self, parent, on_close=None):
+        super().__init__(parent)
+        self.title("Tableau de bord - Lady Glam Manager")
+        self.configure(bg=DS.COLORS['bg_secondary'])
+        self.minsize(640, 420)
+        self.on_close = on_close
+        self.protocol("WM_DELETE_WINDOW", self.close)
+        
+        self.summary_label = tk.Label(self, text="Calcul des statistiques...",
+                                      bg=DS.COLORS['bg_secondary'],
+                                      fg=DS.COLORS['text_secondary'],
+                                      font=(DS.FONTS['family_alt'], DS.FONTS['size_base']))
+        self.summary_label.pack(anchor='w', padx=DS.SPACING['xl'], pady=(DS.SPACING['lg'], 0))
+        
+        grid = tk.Frame(self, bg=DS.COLORS['bg_secondary'])
+        grid.pack(fill=tk.BOTH, expand=True, padx=DS.SPACING['xl'], pady=DS.SPACING['lg'])
+        grid.grid_columnconfigure((0, 1), weight=1, uniform='dashboard')
+        
+        self.sections = {}
+        for i, (key, title) in enumerate((('categories', "Par catégorie"), ('badges', "Par badge"),
+                                          ('prices', "Prix (FDJ)"), ('ratings', "Notes"))):
+            card = MinimalCard(grid)
+            card.grid(row=i // 2, column=i % 2, sticky='nsew',
+                      padx=DS.SPACING['sm'], pady=DS.SPACING['sm'])
+            tk.Label(card.inner, text=title,
+                    bg=DS.COLORS['bg_primary'],
+                    fg=DS.COLORS['text_primary'],
+                    font=(DS.FONTS['family_alt'], DS.FONTS['size_lg'], 'bold')).pack(anchor='w')
+            rows = tk.Frame(card.inner, bg=DS.COLORS['bg_primary'])
+            rows.pack(fill=tk.BOTH, expand=True, pady=(DS.SPACING['sm'], 0))
+            self.sections[key] = rows
+    
+    @staticmethod
+    def _price_label(low, high):
+        if high is None:
+            return f"≥ {low:,}".replace(',', ' ')
+        return f"{low:,} – {high:,}".replace(',', ' ')
+    
+    def _fill(self, key, rows):
+        """Remplit une section : une ligne (libellé, barre, nombre) par entrée."""
+        frame = self.sections[key]
+        for child in frame.winfo_children():
+            child.destroy()
+        largest = max((count for _, count in rows), default=0) or 1
+        for i, (label, count) in enumerate(rows):
+            tk.Label(frame, text=label, anchor='w',
+                    bg=DS.COLORS['bg_primary'],
+                    fg=DS.COLORS['text_secondary'],
+                    font=(DS.FONTS['family_alt'], DS.FONTS['size_sm'])).grid(row=i, column=0, sticky='w')
+            bar = tk.Canvas(frame, width=self.BAR_WIDTH, height=12,
+                            bg=DS.COLORS['bg_primary'], highlightthickness=0)
+            bar.create_rectangle(0, 2, max(1, self.BAR_WIDTH * count // largest), 12,
+                                 fill=DS.COLORS['accent_light'], width=0)
+            bar.grid(row=i, column=1, padx=DS.SPACING['sm'])
+            tk.Label(frame, text=str(count), anchor='e',
+                    bg=DS.COLORS['bg_primary'],
+                    fg=DS.COLORS['text_primary'],
+                    font=(DS.FONTS['family_alt'], DS.FONTS['size_sm'])).grid(row=i, column=2, sticky='e')
+    
+    def show(self, summary):
+        """Affiche un CatalogSummary."""
+        parts = [f"{summary.count} produits"]
+        if summary.average_price is not None:
+            parts.append(f"prix moyen {summary.average_price:.2f} FDJ")
+            parts.append(f"note moyenne {summary.average_rating:.1f}")
+        parts.append(f"{summary.missing_images} sans image")
+        self.summary_label.config(text="   •   ".join(parts),
+                                  fg=DS.COLORS['warning'] if summary.missing_images
+                                  else DS.COLORS['text_secondary'])
+        
+        self._fill('categories', [(category or "Sans catégorie", count)
+                                  for category, count in summary.categories.items()])
+        self._fill('badges', [(badge or "Sans badge", count)
+                              for badge, count in summary.badges.items()])
+        self._fill('prices', [(self._price_label(low, high), count)
+                              for low, high, count in summary.price_ranges])
+        self._fill('ratings', [('⭐' * rating if 0 < rating <= 5 else str(rating), count)
+                               for rating, count in summary.ratings.items()])
+    
+    def close(self):
+        if self.on_close:
+            self.on_close()
+        self.destroy()
+
 # ============================================================================
 # APPLICATION PRINCIPALE MINIMALISTE
 # ============================================================================
@@ -335,13 +679,29 @@ class MinimalLadyGlamManager:
         Path("images").mkdir(exist_ok=True)
         
         self.current_product_id = None
+        self.current_product = None   # produit tel qu'affiché dans le formulaire
         self.selected_image_path = None
         self.current_product_image = None
         
         # Initialisation des services
-        self.db = DatabaseManager("products.json")
+        self.db = open_storage(DB_FILE, journal=DB_JOURNAL)
         self.service = ProductService(self.db)
-        self.exporter = ProductsExporter("products.json", "web/js/products.js")
+        self.exporter = ProductsExporter("products.json", "web/js/products.js",
+                                         sharded=EXPORT_SHARDED,
+                                         profile=EXPORT_PROFILE)
+        
+        # Les accès disque se font sur un thread de travail
+        self.worker = BackgroundWorker(self.root, on_busy_change=self.set_busy)
+        
+        # Miniatures des images (cache mémoire + disque) et recherche : lectures
+        # faites sur un thread séparé pour ne pas attendre les enregistrements
+        self.thumbnails = ThumbnailCache()
+        self.reader_worker = BackgroundWorker(self.root, poll_interval=10)
+        self._search_after = None
+        self.dashboard = None   # fenêtre du tableau de bord, si ouverte
+        
+        # La liste est mise à jour ligne par ligne à chaque modification
+        self.service.subscribe(self._on_service_change)
         
         self.configure_styles()
         self.setup_keyboard_shortcuts()
@@ -374,6 +734,8 @@ class MinimalLadyGlamManager:
         self.root.bind('<Control-s>', lambda e: self.save_product())
         self.root.bind('<F5>', lambda e: self.load_products())
         self.root.bind('<Escape>', lambda e: self.clear_form())
+        self.root.bind('<Control-f>', lambda e: self.search_entry.entry.focus_set())
+        self.root.bind('<Control-d>', lambda e: self.show_dashboard())
     
     def on_window_resize(self, event=None):
         """Gère le redimensionnement de la fenêtre"""
@@ -503,6 +865,13 @@ class MinimalLadyGlamManager:
                                     font=(DS.FONTS['family_alt'], DS.FONTS['size_base']))
         self.stats_label.pack(side=tk.RIGHT, pady=DS.SPACING['md'])
         
+        # Indicateur d'activité (tâches disque en cours)
+        self.busy_label = tk.Label(inner_header, text="",
+                                   bg=DS.COLORS['bg_primary'],
+                                   fg=DS.COLORS['warning'],
+                                   font=(DS.FONTS['family_alt'], DS.FONTS['size_sm']))
+        self.busy_label.pack(side=tk.RIGHT, padx=DS.SPACING['lg'], pady=DS.SPACING['md'])
+        
         # Separator
         tk.Frame(self.root, bg=DS.COLORS['border'], height=1).pack(fill=tk.X)
         
@@ -570,8 +939,7 @@ class MinimalLadyGlamManager:
         cat_inner.pack(fill=tk.BOTH, expand=True, padx=1, pady=1)
         
         self.combo_category = ttk.Combobox(cat_inner,
-                                          values=["Mode & Vêtements", "Accessoires & Lifestyle",
-                                                  "Soins Visage", "Soins Corps", "Soins Capillaires", "Parfumerie"],
+                                          values=PRODUCT_CATEGORIES,
                                           font=(DS.FONTS['family_alt'], DS.FONTS['size_sm']),
                                           height=8,
                                           state='readonly')
@@ -752,10 +1120,40 @@ class MinimalLadyGlamManager:
         toolbar_right = tk.Frame(toolbar, bg=DS.COLORS['bg_primary'])
         toolbar_right.pack(side=tk.RIGHT)
         
+        MinimalButton(toolbar_right, text="Statistiques", icon="📊",
+                     command=self.show_dashboard, style='secondary',
+                     width=130).pack(side=tk.LEFT, padx=DS.SPACING['xs'])
+        
         MinimalButton(toolbar_right, text="Exporter JS", icon="🌐",
                      command=self.export_products_js, style='primary',
                      width=120).pack(side=tk.LEFT, padx=DS.SPACING['xs'])
         
+        # Barre de recherche (Ctrl+F) : filtre la liste pendant la frappe
+        search_bar = tk.Frame(card.inner, bg=DS.COLORS['bg_primary'])
+        search_bar.pack(fill=tk.X, pady=(0, DS.SPACING['lg']))
+        
+        tk.Label(search_bar, text="🔍",
+                bg=DS.COLORS['bg_primary'],
+                fg=DS.COLORS['text_secondary'],
+                font=(DS.FONTS['family_alt'], DS.FONTS['size_base'])).pack(side=tk.LEFT, padx=(0, DS.SPACING['xs']))
+        
+        self.search_entry = MinimalEntry(search_bar)
+        self.search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.search_entry.entry.bind('<KeyRelease>', lambda e: self.schedule_search())
+        self.search_entry.entry.bind('<Escape>', lambda e: self.clear_search() or 'break')
+        
+        self.filter_category = ttk.Combobox(search_bar,
+                                           values=[ALL_CATEGORIES] + PRODUCT_CATEGORIES,
+                                           font=(DS.FONTS['family_alt'], DS.FONTS['size_sm']),
+                                           width=22, state='readonly')
+        self.filter_category.pack(side=tk.LEFT, padx=(DS.SPACING['sm'], 0))
+        self.filter_category.current(0)
+        self.filter_category.bind('<<ComboboxSelected>>', lambda e: self.schedule_search(0))
+        
+        MinimalButton(search_bar, text="", icon="✕",
+                     command=self.clear_search, style='secondary',
+                     width=36).pack(side=tk.LEFT, padx=(DS.SPACING['xs'], 0))
+        
         # Treeview
         tree_container = tk.Frame(card.inner, bg=DS.COLORS['border'])
         tree_container.pack(fill=tk.BOTH, expand=True)
@@ -763,16 +1161,12 @@ class MinimalLadyGlamManager:
         tree_inner = tk.Frame(tree_container, bg=DS.COLORS['bg_primary'])
         tree_inner.pack(fill=tk.BOTH, expand=True, padx=1, pady=1)
         
-        tree_scroll = ttk.Scrollbar(tree_inner)
-        tree_scroll.pack(side=tk.RIGHT, fill=tk.Y)
-        
-        self.tree = ttk.Treeview(tree_inner,
-                                columns=('ID', 'Nom', 'Catégorie', 'Prix', 'Note', 'Badge'),
-                                show='headings',
-                                yscrollcommand=tree_scroll.set,
-                                style='Minimal.Treeview')
-        
-        tree_scroll.config(command=self.tree.yview)
+        # Liste virtualisée : seules les lignes visibles sont créées dans Tk
+        self.tree = VirtualTreeview(tree_inner,
+                                    columns=('ID', 'Nom', 'Catégorie', 'Prix', 'Note', 'Badge'),
+                                    format_row=self.format_product_row,
+                                    on_select=self.on_product_select,
+                                    style='Minimal.Treeview')
         
         # Colonnes
         columns_config = {
@@ -785,15 +1179,13 @@ class MinimalLadyGlamManager:
         }
         
         for col, (width, anchor) in columns_config.items():
-            self.tree.heading(col, text=col)
-            self.tree.column(col, width=width, anchor=anchor)
+            self.tree.tree.heading(col, text=col)
+            self.tree.tree.column(col, width=width, anchor=anchor)
         
         self.tree.pack(fill=tk.BOTH, expand=True)
         
-        self.tree.tag_configure('oddrow', background=DS.COLORS['bg_primary'])
-        self.tree.tag_configure('evenrow', background=DS.COLORS['bg_secondary'])
-        
-        self.tree.bind('<<TreeviewSelect>>', self.on_product_select)
+        self.tree.tree.tag_configure('oddrow', background=DS.COLORS['bg_primary'])
+        self.tree.tree.tag_configure('evenrow', background=DS.COLORS['bg_secondary'])
     
     # ========================================================================
     # MÉTHODES MÉTIER
@@ -809,16 +1201,13 @@ class MinimalLadyGlamManager:
         if file_path:
             self.selected_image_path = file_path
             
-            try:
-                img = Image.open(file_path)
-                img.thumbnail((90, 90))
-                photo = ImageTk.PhotoImage(img)
-                
+            photo = self.thumbnails.get(file_path)
+            if photo:
                 self.preview_label.config(image=photo, text="")
                 self.preview_label.image = photo
                 
                 SimpleToast(self.root, f"Image sélectionnée", "success")
-            except:
+            else:
                 filename = os.path.basename(file_path)
                 self.preview_label.config(text=f"✓\n{filename[:30]}")
                 SimpleToast(self.root, "Image sélectionnée", "success")
@@ -848,31 +1237,32 @@ class MinimalLadyGlamManager:
         return True
     
     def get_form_data(self):
+        """
+        Lit le formulaire (thread Tk).
+        Retourne (données du produit, copie d'image à effectuer ou None) ;
+        la copie elle-même est faite par copy_form_image() sur le thread de travail.
+        """
         image_path = ""
+        image_copy = None
         
         if self.selected_image_path:
             image_ext = os.path.splitext(self.selected_image_path)[1]
+            if image_pipeline.is_available():
+                # L'image sera redimensionnée et réencodée (voir copy_form_image)
+                image_ext = image_pipeline.MASTER_EXTENSION
             image_name = f"product_{int(time.time())}{image_ext}"
             dest_path = os.path.join("images", image_name)
+            image_path = dest_path
             
-            try:
-                import shutil
-                shutil.copy2(self.selected_image_path, dest_path)
-                image_path = dest_path
-                
-                if self.current_product_id and self.current_product_image:
-                    if os.path.exists(self.current_product_image):
-                        try:
-                            os.remove(self.current_product_image)
-                        except:
-                            pass
-            except Exception as e:
-                SimpleToast(self.root, f"Erreur copie image", "error")
+            old_image = None
+            if self.current_product_id and self.current_product_image:
+                old_image = self.current_product_image
+            image_copy = (self.selected_image_path, dest_path, old_image)
         else:
             if self.current_product_id and self.current_product_image:
                 image_path = self.current_product_image
         
-        return {
+        data = {
             'name': self.entry_name.get().strip(),
             'category': self.combo_category.get(),
             'price': float(self.entry_price.get().strip()),
@@ -882,22 +1272,102 @@ class MinimalLadyGlamManager:
             'image_path': image_path,
             'icon': '🎁'
         }
+        return data, image_copy
+    
+    @staticmethod
+    def copy_form_image(product_data, image_copy):
+        """
+        Importe l'image sélectionnée dans images/ (redimensionnée, sans
+        métadonnées, avec ses variantes pour le site) (thread de travail).
+        L'ancienne image n'est pas touchée : voir _save_product_job().
+        Retourne False si la copie a échoué.
+        """
+        if not image_copy:
+            return True
+        
+        source, dest_path, _ = image_copy
+        try:
+            os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+            try:
+                image_pipeline.ingest_image(source, dest_path)
+            except Exception:
+                # Format non pris en charge ou Pillow absent : copie telle quelle
+                base, ext = os.path.splitext(dest_path)
+                source_ext = os.path.splitext(source)[1]
+                if source_ext.lower() != ext.lower():
+                    dest_path = base + source_ext
+                    product_data['image_path'] = dest_path
+                shutil.copy2(source, dest_path)
+            return True
+        except Exception:
+            # Pas de fichier à moitié écrit dans images/
+            image_pipeline.remove_image(dest_path)
+            product_data['image_path'] = ""
+            return False
+    
+    def _save_product_job(self, product_id, product_data, image_copy, expected=None):
+        """
+        Copie l'image puis enregistre le produit (thread de travail).
+        L'ancienne image n'est supprimée qu'une fois l'enregistrement
+        réussi ; en cas d'échec, c'est la nouvelle copie qui est retirée.
+        """
+        if expected is not None and self.service.get_by_id(product_id) != expected:
+            # Modifié par un autre poste : inutile de remplacer l'image
+            return False, CONFLICT_MESSAGE, True, None
+        image_ok = self.copy_form_image(product_data, image_copy)
+        new_image = product_data['image_path'] if image_copy and image_ok else None
+        try:
+            if product_id is None:
+                success, message = self.service.add(product_data)
+            else:
+                success, message = self.service.update(product_id, product_data, expected)
+        except Exception:
+            if new_image:
+                image_pipeline.remove_image(new_image)
+            raise
+        
+        if not success:
+            if new_image:
+                image_pipeline.remove_image(new_image)
+            return success, message, image_ok, None
+        
+        old_image = image_copy[2] if new_image else None
+        if old_image and old_image != new_image and os.path.exists(old_image):
+            image_pipeline.remove_image(old_image)
+        return success, message, image_ok, old_image
+    
+    def _on_product_saved(self, result):
+        """Affiche le résultat d'un ajout/modification (thread Tk)."""
+        success, message, image_ok, replaced_image = result
+        if not image_ok:
+            SimpleToast(self.root, f"Erreur copie image", "error")
+        if replaced_image:
+            self.thumbnails.invalidate(replaced_image)
+        
+        if success:
+            # La liste a déjà été mise à jour par _on_product_change
+            SimpleToast(self.root, message, "success")
+            self.clear_form()
+        else:
+            SimpleToast(self.root, message, "error")
+    
+    def _on_job_error(self, error):
+        SimpleToast(self.root, f"Erreur: {error}", "error")
+    
+    def set_busy(self, busy):
+        """Affiche ou masque l'indicateur d'activité."""
+        self.busy_label.config(text="⏳ Enregistrement…" if busy else "")
+        self.root.config(cursor='watch' if busy else '')
     
     def add_product(self):
         if not self.validate_form(is_update=False):
             return
         
         try:
-            product_data = self.get_form_data()
-            success, message = self.service.add(product_data)
-            
-            if success:
-                SimpleToast(self.root, message, "success")
-                self.clear_form()
-                self.load_products()
-            else:
-                SimpleToast(self.root, message, "error")
-            
+            product_data, image_copy = self.get_form_data()
+            self.worker.submit(self._save_product_job, None, product_data, image_copy,
+                               on_done=self._on_product_saved,
+                               on_error=self._on_job_error)
         except Exception as e:
             SimpleToast(self.root, f"Erreur: {e}", "error")
     
@@ -916,21 +1386,17 @@ class MinimalLadyGlamManager:
             return
         
         try:
-            product_data = self.get_form_data()
-            success, message = self.service.update(self.current_product_id, product_data)
-            
-            if success:
-                SimpleToast(self.root, message, "success")
-                self.clear_form()
-                self.load_products()
-            else:
-                SimpleToast(self.root, message, "error")
-            
+            product_data, image_copy = self.get_form_data()
+            self.worker.submit(self._save_product_job, self.current_product_id,
+                               product_data, image_copy, self.current_product,
+                               on_done=self._on_product_saved,
+                               on_error=self._on_job_error)
         except Exception as e:
             SimpleToast(self.root, f"Erreur: {e}", "error")
     
     def clear_form(self):
         self.current_product_id = None
+        self.current_product = None
         self.selected_image_path = None
         self.current_product_image = None
         
@@ -945,48 +1411,169 @@ class MinimalLadyGlamManager:
         self.preview_label.config(image='', text="📸")
         
         if hasattr(self, 'tree'):
-            for item in self.tree.selection():
-                self.tree.selection_remove(item)
+            self.tree.clear_selection()
         
         self.entry_name.entry.focus_set()
     
     def load_products(self):
+        if self.filter_active():
+            # La liste affiche les résultats de la recherche en cours
+            self.run_search()
+            return
+        # Lecture sur le thread de travail ; les demandes rapprochées sont regroupées
+        self.worker.submit(lambda: list(self.service.get_all()),
+                           on_done=self._fill_tree,
+                           on_error=lambda e: SimpleToast(self.root, f"Erreur chargement: {e}", "error"),
+                           key='load')
+    
+    @staticmethod
+    def format_product_row(product):
+        """Valeurs affichées dans la liste pour un produit."""
+        return (
+            product.get('id', ''),
+            product.get('name', ''),
+            product.get('category', ''),
+            f"{product.get('price', 0):.2f} FDJ",
+            '⭐' * product.get('rating', 0),
+            product.get('badge', '') if product.get('badge') else ""
+        )
+    
+    def _fill_tree(self, products):
         try:
-            for item in self.tree.get_children():
-                self.tree.delete(item)
+            # Seules les lignes visibles sont (re)remplies
+            self.tree.set_items(products)
             
-            products = self.service.get_all()
-            
-            for i, product in enumerate(products):
-                tag = 'evenrow' if i % 2 == 0 else 'oddrow'
-                
-                self.tree.insert('', 'end', values=(
-                    product.get('id', ''),
-                    product.get('name', ''),
-                    product.get('category', ''),
-                    f"{product.get('price', 0):.2f} FDJ",
-                    '⭐' * product.get('rating', 0),
-                    product.get('badge', '') if product.get('badge') else ""
-                ), tags=(tag,))
-            
-            self.stats_label.config(text=f"{len(products)} produits")
-            self.product_counter.config(text=f"({len(products)})")
+            self._update_counters()
             
         except Exception as e:
             SimpleToast(self.root, f"Erreur chargement: {e}", "error")
     
-    def on_product_select(self, event):
-        selected = self.tree.selection()
-        if not selected:
+    def _update_counters(self):
+        count = len(self.tree.items)
+        if self.filter_active():
+            self.stats_label.config(text=f"{count} résultat(s)")
+        else:
+            self.stats_label.config(text=f"{count} produits")
+        self.product_counter.config(text=f"({count})")
+    
+    # --- Recherche ----------------------------------------------------------
+    
+    def search_criteria(self):
+        """(texte, catégorie ou None) saisis dans la barre de recherche."""
+        category = self.filter_category.get()
+        return (self.search_entry.get().strip(),
+                None if category in ("", ALL_CATEGORIES) else category)
+    
+    def filter_active(self):
+        text, category = self.search_criteria()
+        return bool(text) or category is not None
+    
+    def schedule_search(self, delay=SEARCH_DEBOUNCE_MS):
+        """Relance la recherche après 'delay' ms sans nouvelle frappe."""
+        if self._search_after is not None:
+            self.root.after_cancel(self._search_after)
+        self._search_after = self.root.after(delay, self.run_search)
+    
+    def run_search(self):
+        self._search_after = None
+        if not self.filter_active():
+            self.load_products()
             return
         
-        item = self.tree.item(selected[0])
-        product_id = item['values'][0]
-        
-        product = self.service.get_by_id(product_id)
+        text, category = self.search_criteria()
+        # Index de recherche de ProductService.query() : quelques ms même
+        # sur un grand catalogue ; seule la dernière saisie est traitée
+        self.reader_worker.submit(
+            lambda: self.service.query_list(text=text or None, category=category),
+            on_done=lambda products: self._show_search_results((text, category), products),
+            on_error=lambda e: SimpleToast(self.root, f"Erreur recherche: {e}", "error"),
+            key='search')
+    
+    def _show_search_results(self, criteria, products):
+        # Résultat d'une saisie dépassée : une recherche plus récente suit
+        if criteria == self.search_criteria():
+            self._fill_tree(products)
+    
+    def clear_search(self):
+        self.search_entry.delete(0, tk.END)
+        self.filter_category.current(0)
+        self.schedule_search(0)
+    
+    def _on_service_change(self, change):
+        """Abonné du ProductService : appelé sur le thread de la modification."""
+        self.worker.post(self._on_product_change, change)
+    
+    def _on_product_change(self, change):
+        """Applique une modification du catalogue à la liste (thread Tk)."""
+        self.refresh_dashboard()
+        if change.action == 'reloaded':
+            self.load_products()
+            return
+        if self.filter_active():
+            # Le produit modifié peut entrer dans les résultats ou en sortir
+            self.schedule_search(0)
+            return
         
+        items = self.tree.items
+        index = change.index
+        # La liste affichée doit être à jour jusqu'à cette modification
+        expected_id = change.product_id if change.action != 'added' else None
+        if change.action == 'added' and index <= len(items):
+            self.tree.insert_item(index, change.product)
+        elif (index is not None and index < len(items)
+              and items[index].get('id') == expected_id):
+            if change.action == 'updated':
+                self.tree.replace_item(index, change.product)
+            else:
+                self.tree.remove_item(index)
+        else:
+            # Liste désynchronisée (ex: chargement en cours) : rechargement complet
+            self.load_products()
+            return
+        self._update_counters()
+    
+    # --- Tableau de bord -----------------------------------------------------
+    
+    def show_dashboard(self):
+        """Ouvre le tableau de bord (Ctrl+D), ou le ramène au premier plan."""
+        if self.dashboard is not None:
+            self.dashboard.lift()
+            return
+        self.dashboard = CatalogDashboard(self.root, on_close=self._on_dashboard_closed)
+        self.refresh_dashboard()
+    
+    def _on_dashboard_closed(self):
+        self.dashboard = None
+    
+    def refresh_dashboard(self):
+        """
+        Met à jour le tableau de bord s'il est ouvert. Les compteurs de
+        ProductService.statistics() sont tenus à jour à chaque modification :
+        la lecture est instantanée même sur un grand catalogue.
+        """
+        if self.dashboard is None:
+            return
+        self.reader_worker.submit(
+            self.service.statistics,
+            on_done=self._show_statistics,
+            on_error=lambda e: SimpleToast(self.root, f"Erreur statistiques: {e}", "error"),
+            key='statistics')
+    
+    def _show_statistics(self, summary):
+        # Le tableau de bord a pu être fermé pendant le calcul
+        if self.dashboard is not None:
+            self.dashboard.show(summary)
+    
+    def on_product_select(self, item):
+        # La ligne contient déjà le produit, tenu à jour par _on_product_change :
+        # pas d'appel au service depuis le thread Tk, car il attendrait la fin
+        # d'une écriture en cours sur le thread de travail. Un produit modifié
+        # entre-temps ailleurs est détecté à l'enregistrement (CONFLICT_MESSAGE).
+        product = item
+
         if product:
             self.current_product_id = product.get('id')
+            self.current_product = product
             self.current_product_image = product.get('image_path')
             
             self.entry_name.delete(0, tk.END)
@@ -1009,52 +1596,78 @@ class MinimalLadyGlamManager:
             self.selected_image_path = None
             
             if product.get('image_path') and os.path.exists(product.get('image_path')):
-                try:
-                    img = Image.open(product.get('image_path'))
-                    img.thumbnail((90, 90))
-                    photo = ImageTk.PhotoImage(img)
-                    
+                photo = self.thumbnails.get(product.get('image_path'))
+                if photo:
                     self.preview_label.config(image=photo, text="")
                     self.preview_label.image = photo
-                except:
+                else:
                     self.preview_label.config(text=f"📷\n{os.path.basename(product.get('image_path'))[:30]}")
             else:
                 self.preview_label.config(text="⚠️\nImage manquante")
+            
+            self.prefetch_thumbnails(product.get('id'))
+    
+    def prefetch_thumbnails(self, product_id, radius=3):
+        """Prépare en arrière-plan les miniatures des lignes voisines."""
+        index = self.tree.index_of(product_id)
+        if index is None:
+            return
+        items = self.tree.items
+        neighbours = items[max(0, index - radius):index] + items[index + 1:index + 1 + radius]
+        paths = [item.get('image_path') for item in neighbours if item.get('image_path')]
+        if paths:
+            self.reader_worker.submit(self.thumbnails.prefetch, paths,
+                                      on_done=self.thumbnails.store,
+                                      key='prefetch')
     
     def delete_product(self):
-        selected = self.tree.selection()
+        selected = self.tree.selected_item()
         if not selected:
             SimpleToast(self.root, "Aucun produit sélectionné", "warning")
             return
         
-        item = self.tree.item(selected[0])
-        product_id = item['values'][0]
-        product_name = item['values'][1]
+        product_id = selected.get('id')
+        product_name = selected.get('name', '')
         
         result = ask_yes_no("Confirmer", f"Supprimer '{product_name}' ?")
         
         if result:
-            try:
-                success, message = self.service.delete(product_id)
-                if success:
-                    SimpleToast(self.root, message, "success")
-                    self.clear_form()
-                    self.load_products()
-                else:
-                    SimpleToast(self.root, message, "error")
-            except Exception as e:
-                SimpleToast(self.root, f"Erreur: {e}", "error")
+            self.worker.submit(self.service.delete, product_id,
+                               on_done=self._on_product_deleted,
+                               on_error=self._on_job_error)
+    
+    def _on_product_deleted(self, result):
+        success, message = result
+        if success:
+            SimpleToast(self.root, message, "success")
+            self.clear_form()
+        else:
+            SimpleToast(self.root, message, "error")
     
     def export_products_js(self):
         """Exporte les produits vers le fichier JavaScript en utilisant le module ProductsExporter"""
-        try:
-            success = self.exporter.export_to_js()
-            if success:
-                SimpleToast(self.root, "Fichier products.js mis à jour avec succès", "success")
-            else:
-                SimpleToast(self.root, "Erreur lors de l'export", "error")
-        except Exception as e:
-            SimpleToast(self.root, f"Erreur: {e}", "error")
+        # Plusieurs clics rapprochés ne lancent qu'un seul export
+        self.worker.submit(self._export_job,
+                           on_done=self._on_exported,
+                           on_error=self._on_job_error,
+                           key='export')
+    
+    def _export_job(self):
+        """Export JS (thread de travail)."""
+        products = self.service.get_all()
+        return self.exporter.export_to_js(products, self.service.signature)
+    
+    def _on_exported(self, success):
+        if success:
+            SimpleToast(self.root, "Fichier products.js mis à jour avec succès", "success")
+        else:
+            SimpleToast(self.root, "Erreur lors de l'export", "error")
+    
+    def on_close(self):
+        """Termine les écritures en cours avant de fermer la fenêtre."""
+        self.reader_worker.shutdown(wait=False)
+        self.worker.shutdown(wait=True)
+        self.root.destroy()
 
 # ============================================================================
 # POINT D'ENTRÉE
@@ -1070,6 +1683,7 @@ def main():
         pass
     
     app = MinimalLadyGlamManager(root)
+    root.protocol("WM_DELETE_WINDOW", app.on_close)
     
     # Charger les produits au démarrage
     root.after(500, app.load_products)
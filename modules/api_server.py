@@ -0,0 +1,355 @@
+# modules/api_server.py
+
+"""
+Serveur HTTP local exposant le catalogue en JSON (asyncio, sans dépendance).
+
+    GET /api/products?page=1&page_size=24&category=...&q=...&badge=...
+                     &min_price=...&max_price=...&sort=price-asc|price-desc|name|id
+    GET /api/products/<id>
+    GET /api/categories
+
+Les requêtes sont servies depuis un instantané du catalogue en mémoire ;
+le stockage n'est consulté que toutes les 'refresh_interval' secondes
+(sur un thread, sans bloquer la boucle) pour détecter une modification.
+Chaque réponse porte un ETag et un Last-Modified : un GET conditionnel
+(If-None-Match / If-Modified-Since) reçoit un 304 sans corps. Les
+réponses déjà calculées sont gardées dans un cache LRU, vidé à chaque
+nouvelle version du catalogue.
+
+Usage : python -m modules.api_server [--host 127.0.0.1] [--port 8765] [--db products.json]
+"""
+
+import argparse
+import asyncio
+import collections
+import email.utils
+import hashlib
+import json
+import os
+import sys
+import time
+from urllib.parse import parse_qs, urlsplit
+
+from modules import json_codec
+from modules.product_query import SORTS, ProductIndexes
+
+DEFAULT_PAGE_SIZE = 24
+MAX_PAGE_SIZE = 200
+
+STATUS_TEXT = {200: "OK", 304: "Not Modified", 400: "Bad Request",
+               404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+# Corps de requête lu et ignoré sur une connexion gardée ouverte ; au-delà
+# (ou en transfert 'chunked'), la connexion est fermée après la réponse
+MAX_IGNORED_BODY = 64 * 1024
+
+
+class ApiError(Exception):
+    """Erreur renvoyée au client avec un code HTTP."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class CatalogSnapshot:
+    """
+    Version figée du catalogue servie par l'API, avec ses index (les mêmes
+    que ProductService.query()). Elle est construite sur le thread de
+    rechargement et n'est plus modifiée ensuite.
+    """
+
+    def __init__(self, products, version, modified):
+        self.products = list(products)
+        self.by_id = {product.get('id'): product for product in self.products}
+        self.indexes = ProductIndexes(self.products)
+        self.version = version
+        self.last_modified = int(modified)
+
+
+class CatalogApiServer:
+    """Serveur HTTP/1.1 (keep-alive) de l'API du catalogue."""
+
+    def __init__(self, service, host="127.0.0.1", port=8765,
+                 refresh_interval=1.0, cache_size=1024):
+        self.service = service
+        self.host = host
+        self.port = port
+        self.refresh_interval = refresh_interval
+        self.cache_size = cache_size
+        self.snapshot = None
+        self._cache = collections.OrderedDict()   # clé -> (corps, etag)
+        self._server = None
+        self._refresh_task = None
+
+    # ------------------------------------------------------------------
+    # Données
+    # ------------------------------------------------------------------
+
+    def _check_for_changes(self):
+        """Recharge le catalogue s'il a changé (appelé sur un thread)."""
+        products = self.service.get_all()
+        version = str(self.service.signature)
+        if self.snapshot is None or version != self.snapshot.version:
+            # Last-Modified : date de la dernière écriture dans le stockage,
+            # pour qu'un redémarrage ne change pas la date de données identiques
+            modified = self.service.db.get_modified_time()
+            return CatalogSnapshot(products, version,
+                                   modified if modified is not None else time.time())
+        return None
+
+    async def _refresh_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                snapshot = await loop.run_in_executor(None, self._check_for_changes)
+            except Exception as e:
+                print(f"Erreur lors du rechargement du catalogue : {e}")
+                continue
+            if snapshot is not None:
+                self.snapshot = snapshot
+                self._cache.clear()
+
+    # ------------------------------------------------------------------
+    # Routes
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _int_param(params, name, default, minimum, maximum=None):
+        value = params.get(name, default)
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            raise ApiError(400, f"Paramètre '{name}' : entier attendu.")
+        if value < minimum or (maximum is not None and value > maximum):
+            raise ApiError(400, f"Paramètre '{name}' hors limites.")
+        return value
+
+    @staticmethod
+    def _float_param(params, name):
+        if name not in params:
+            return None
+        try:
+            return float(params[name])
+        except ValueError:
+            raise ApiError(400, f"Paramètre '{name}' : nombre attendu.")
+
+    def _list_products(self, params):
+        snapshot = self.snapshot
+        sort = params.get('sort')
+        if sort is not None and sort not in SORTS:
+            raise ApiError(400, f"Tri inconnu : {sort} ({', '.join(SORTS)})")
+        page = self._int_param(params, 'page', 1, 1)
+        page_size = self._int_param(params, 'page_size', DEFAULT_PAGE_SIZE, 1, MAX_PAGE_SIZE)
+        min_price = self._float_param(params, 'min_price')
+        max_price = self._float_param(params, 'max_price')
+        price_range = None
+        if min_price is not None or max_price is not None:
+            price_range = (min_price, max_price)
+        total, items = snapshot.indexes.query_page(
+            snapshot.products, snapshot.by_id, category=params.get('category'),
+            badge=params.get('badge'), price_range=price_range, text=params.get('q') or None,
+            sort=sort, offset=(page - 1) * page_size, limit=page_size)
+        return {
+            'total': total,
+            'page': page,
+            'page_size': page_size,
+            'pages': (total + page_size - 1) // page_size,
+            'items': items,
+        }
+
+    def _get_product(self, product_id):
+        try:
+            product_id = int(product_id)
+        except ValueError:
+            raise ApiError(404, "Produit non trouvé.")
+        product = self.snapshot.by_id.get(product_id)
+        if product is None:
+            raise ApiError(404, "Produit non trouvé.")
+        return product
+
+    def _categories(self):
+        category_ids = self.snapshot.indexes.category_ids
+        return [{'category': name, 'count': len(category_ids[name])}
+                for name in sorted(category_ids)]
+
+    def _route(self, path, params):
+        if path == '/api/products':
+            return self._list_products(params)
+        if path.startswith('/api/products/'):
+            return self._get_product(path[len('/api/products/'):])
+        if path == '/api/categories':
+            return self._categories()
+        raise ApiError(404, "Ressource inconnue.")
+
+    # ------------------------------------------------------------------
+    # HTTP
+    # ------------------------------------------------------------------
+
+    def _cached_response(self, path, params):
+        """Corps JSON et ETag de la réponse, depuis le cache si possible."""
+        key = (self.snapshot.version, path, tuple(sorted(params.items())))
+        entry = self._cache.get(key)
+        if entry is not None:
+            self._cache.move_to_end(key)
+            return entry
+
+        body = json_codec.encode(self._route(path, params))
+        etag = f'"{hashlib.sha1(body).hexdigest()[:16]}"'
+        entry = self._cache[key] = (body, etag)
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return entry
+
+    def _not_modified(self, headers, etag):
+        if_none_match = headers.get('if-none-match')
+        if if_none_match is not None:
+            # If-None-Match prime sur If-Modified-Since
+            tags = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+            return '*' in tags or etag in tags
+        if_modified_since = headers.get('if-modified-since')
+        if if_modified_since:
+            try:
+                since = email.utils.parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+            return self.snapshot.last_modified <= since
+        return False
+
+    def handle(self, method, target, headers):
+        """Traite une requête. Retourne (statut, en-têtes, corps)."""
+        response_headers = {
+            'Content-Type': 'application/json; charset=utf-8',
+            'Access-Control-Allow-Origin': '*',
+        }
+        if method not in ('GET', 'HEAD'):
+            response_headers['Allow'] = 'GET, HEAD'
+            return 405, response_headers, b'{"error":"Method Not Allowed"}'
+
+        url = urlsplit(target)
+        # Un seul exemplaire de chaque paramètre (le dernier)
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        try:
+            body, etag = self._cached_response(url.path.rstrip('/') or '/', params)
+        except ApiError as e:
+            body = json.dumps({'error': str(e)}, ensure_ascii=False).encode('utf-8')
+            return e.status, response_headers, body
+
+        response_headers.update({
+            'ETag': etag,
+            'Last-Modified': email.utils.formatdate(self.snapshot.last_modified, usegmt=True),
+            # Le client garde la réponse mais la revalide (GET conditionnel)
+            'Cache-Control': 'no-cache',
+        })
+        if self._not_modified(headers, etag):
+            return 304, response_headers, b''
+        return 200, response_headers, body
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                keep_alive = (version == 'HTTP/1.1'
+                              and headers.get('connection', '').lower() != 'close')
+                # Le corps éventuel (POST, PUT...) n'est pas utilisé : il est
+                # lu pour ne pas être pris pour la requête suivante
+                try:
+                    length = int(headers.get('content-length') or 0)
+                except ValueError:
+                    length = -1
+                if 'transfer-encoding' in headers or not 0 <= length <= MAX_IGNORED_BODY:
+                    keep_alive = False
+                elif length:
+                    await reader.readexactly(length)
+
+                try:
+                    status, response_headers, body = self.handle(method, target, headers)
+                except Exception as e:
+                    print(f"Erreur lors du traitement de {method} {target} : {e}")
+                    status, response_headers, body = 500, {
+                        'Content-Type': 'application/json; charset=utf-8',
+                        'Access-Control-Allow-Origin': '*',
+                    }, b'{"error":"Internal Server Error"}'
+                response_headers['Content-Length'] = str(len(body))
+                response_headers['Connection'] = 'keep-alive' if keep_alive else 'close'
+
+                head = [f"HTTP/1.1 {status} {STATUS_TEXT[status]}"]
+                head += [f"{name}: {value}" for name, value in response_headers.items()]
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode('latin-1'))
+                if method != 'HEAD' and status != 304:
+                    writer.write(body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError,
+                ValueError):
+            pass
+        finally:
+            writer.close()
+
+    # ------------------------------------------------------------------
+    # Démarrage
+    # ------------------------------------------------------------------
+
+    async def start(self):
+        """Charge le catalogue et commence à écouter."""
+        loop = asyncio.get_running_loop()
+        self.snapshot = await loop.run_in_executor(None, self._check_for_changes)
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        if self._refresh_task:
+            self._refresh_task.cancel()
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def serve_forever(self):
+        await self.start()
+        print(f"API du catalogue disponible sur http://{self.host}:{self.port}/api/products")
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m modules.api_server",
+                                     description="API HTTP JSON du catalogue.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--db", default=os.environ.get("LADYGLAM_DB", "products.json"),
+                        help="fichier de données (products.json ou products.db)")
+    args = parser.parse_args(argv)
+
+    from modules.product_service import ProductService
+    from modules.storage_backend import open_storage
+
+    server = CatalogApiServer(ProductService(open_storage(args.db)), args.host, args.port)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
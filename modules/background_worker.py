@@ -0,0 +1,152 @@
+# modules/background_worker.py
+
+import collections
+import queue
+import threading
+
+
+class BackgroundWorker:
+    """
+    Exécute les tâches lentes (lecture/écriture disque, sauvegardes, export)
+    sur un thread dédié pour ne pas bloquer l'interface Tkinter.
+
+    Les tâches sont traitées une par une, dans l'ordre de soumission.
+    Les résultats sont déposés dans une file (queue.Queue) que le thread Tk
+    vide par une scrutation root.after, lancée à la création et relancée
+    par elle-même : seul le thread Tk appelle root.after, et les callbacks
+    on_done/on_error peuvent donc manipuler les widgets.
+
+    Une tâche soumise avec une 'key' remplace la tâche de même clé encore
+    en attente (ex: plusieurs F5 ou clics sur "Exporter JS" d'affilée
+    ne provoquent qu'un seul rechargement ou export).
+    """
+
+    def __init__(self, root, on_busy_change=None, poll_interval=50):
+        self.root = root
+        self.on_busy_change = on_busy_change
+        self.poll_interval = poll_interval
+
+        self._jobs = collections.deque()
+        self._pending_by_key = {}
+        self._condition = threading.Condition()
+        self._results = queue.Queue()
+        self._stopping = False
+
+        # Tâches soumises et pas encore terminées (lu/écrit sur le thread Tk uniquement)
+        self._unfinished = 0
+
+        self._thread = threading.Thread(target=self._run, name="ladyglam-worker", daemon=True)
+        self._thread.start()
+        # Créé sur le thread Tk : la scrutation y reste
+        self._after_id = self.root.after(self.poll_interval, self._poll)
+
+    @property
+    def busy(self):
+        """True tant qu'une tâche est en attente ou en cours."""
+        return self._unfinished > 0
+
+    def submit(self, func, *args, on_done=None, on_error=None, key=None):
+        """
+        Planifie func(*args) sur le thread de travail.
+        on_done(résultat) ou on_error(exception) sont appelés sur le thread Tk.
+        Retourne False si la tâche a remplacé une tâche de même clé en attente.
+        """
+        with self._condition:
+            job = self._pending_by_key.get(key) if key is not None else None
+            if job is not None:
+                # La tâche en attente n'a pas démarré : on la remplace par la plus récente
+                job.update(func=func, args=args, on_done=on_done, on_error=on_error)
+                return False
+
+            job = {'func': func, 'args': args, 'on_done': on_done,
+                   'on_error': on_error, 'key': key}
+            self._jobs.append(job)
+            if key is not None:
+                self._pending_by_key[key] = job
+            self._condition.notify()
+
+        self._unfinished += 1
+        if self._unfinished == 1:
+            self._notify_busy(True)
+        return True
+
+    def post(self, func, *args):
+        """
+        Planifie func(*args) sur le thread Tk (utilisable depuis n'importe
+        quel thread, ex: notifications émises pendant une tâche).
+        Les appels sont exécutés dans l'ordre, avant le résultat de la
+        tâche en cours.
+        """
+        self._results.put((None, (func, args), None))
+
+    def _run(self):
+        """Boucle du thread de travail."""
+        while True:
+            with self._condition:
+                while not self._jobs and not self._stopping:
+                    self._condition.wait()
+                if not self._jobs:
+                    return
+                job = self._jobs.popleft()
+                if job['key'] is not None:
+                    del self._pending_by_key[job['key']]
+
+            try:
+                result = job['func'](*job['args'])
+                self._results.put((job, result, None))
+            except Exception as e:
+                self._results.put((job, None, e))
+
+    def _poll(self):
+        """Traite, sur le thread Tk, les résultats des tâches terminées."""
+        was_busy = self.busy
+        while True:
+            try:
+                job, result, error = self._results.get_nowait()
+            except queue.Empty:
+                break
+
+            if job is None:
+                # Appel planifié par post()
+                func, args = result
+                try:
+                    func(*args)
+                except Exception as e:
+                    print(f"Erreur lors d'un appel planifié sur le thread Tk : {e}")
+                continue
+
+            self._unfinished -= 1
+            try:
+                if error is not None:
+                    if job['on_error']:
+                        job['on_error'](error)
+                    else:
+                        print(f"Erreur dans une tâche en arrière-plan : {error}")
+                elif job['on_done']:
+                    job['on_done'](result)
+            except Exception as e:
+                print(f"Erreur lors du traitement du résultat d'une tâche : {e}")
+
+        if was_busy and not self.busy:
+            self._notify_busy(False)
+        if not self._stopping:
+            self._after_id = self.root.after(self.poll_interval, self._poll)
+
+    def _notify_busy(self, busy):
+        if self.on_busy_change:
+            self.on_busy_change(busy)
+
+    def shutdown(self, wait=True):
+        """
+        Arrête le thread après avoir terminé les tâches déjà soumises
+        (les callbacks de ces dernières ne sont plus appelés).
+        À appeler sur le thread Tk.
+        """
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        if wait:
+            self._thread.join()
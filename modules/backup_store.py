@@ -0,0 +1,340 @@
+# modules/backup_store.py
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from datetime import datetime
+
+try:
+    import zstandard
+except ImportError:  # compression zstd optionnelle
+    zstandard = None
+
+# Anciennes sauvegardes horodatées (products_20251028_104110.json...) et
+# copie de la dernière version (products_lastest_version.json)
+LEGACY_BACKUP = re.compile(r'^(?P<base>.+)_(?:(?P<stamp>\d{8}_\d{6})|lastest_version)\.(?P<ext>\w+)$')
+
+
+class BackupStore:
+    """
+    Stockage des sauvegardes adressé par contenu.
+    Chaque version est identifiée par le SHA-256 de son contenu : deux
+    sauvegardes identiques ne sont stockées qu'une fois, les fichiers vides
+    sont ignorés, et une politique de rétention (N dernières versions,
+    puis une par heure et une par jour) limite la place occupée.
+
+    Organisation sur disque :
+        <backups_dir>/objects/ab/abcdef....gz   contenu (éventuellement compressé)
+        <backups_dir>/index.json               historique des versions
+
+    Les anciennes copies horodatées d'un dossier s'importent avec
+    'python -m modules.backup_store migrate-legacy <dossier>' (voir
+    import_legacy_backups).
+    """
+
+    def __init__(self, backups_dir, compression="gzip",
+                 keep_last=20, keep_hourly=24, keep_daily=30):
+        if compression == "zstd" and zstandard is None:
+            compression = "gzip"
+        if compression not in ("gzip", "zstd", None):
+            raise ValueError(f"Compression inconnue : {compression}")
+
+        self.backups_dir = backups_dir
+        self.objects_dir = os.path.join(backups_dir, "objects")
+        self.index_file = os.path.join(backups_dir, "index.json")
+        self.compression = compression
+        self.keep_last = keep_last
+        self.keep_hourly = keep_hourly
+        self.keep_daily = keep_daily
+
+        os.makedirs(self.objects_dir, exist_ok=True)
+
+    # ------------------------------------------------------------------
+    # Index
+    # ------------------------------------------------------------------
+
+    def _load_index(self):
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return []
+
+    def _save_index(self, entries):
+        temp_file = f"{self.index_file}.tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(entries, f, ensure_ascii=False, indent=2)
+        os.replace(temp_file, self.index_file)
+
+    # ------------------------------------------------------------------
+    # Objets
+    # ------------------------------------------------------------------
+
+    def _object_path(self, digest, compression):
+        suffix = {"gzip": ".gz", "zstd": ".zst", None: ""}[compression]
+        return os.path.join(self.objects_dir, digest[:2], digest + suffix)
+
+    def _compress(self, data):
+        if self.compression == "gzip":
+            # mtime=0 : même contenu -> mêmes octets compressés
+            return gzip.compress(data, compresslevel=6, mtime=0)
+        if self.compression == "zstd":
+            return zstandard.ZstdCompressor(level=10).compress(data)
+        return data
+
+    @staticmethod
+    def _decompress(data, compression):
+        if compression == "gzip":
+            return gzip.decompress(data)
+        if compression == "zstd":
+            if zstandard is None:
+                raise RuntimeError("Le module 'zstandard' est requis pour cette sauvegarde.")
+            return zstandard.ZstdDecompressor().decompress(data)
+        return data
+
+    def _write_object(self, digest, data):
+        """Écrit l'objet s'il n'existe pas déjà. Retourne son chemin."""
+        path = self._object_path(digest, self.compression)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_file = f"{path}.tmp"
+            with open(temp_file, 'wb') as f:
+                f.write(self._compress(data))
+            os.replace(temp_file, path)
+        return path
+
+    # ------------------------------------------------------------------
+    # API publique
+    # ------------------------------------------------------------------
+
+    def backup_file(self, source_path, name=None):
+        """
+        Sauvegarde le contenu de 'source_path'.
+        Retourne le chemin de l'objet stocké, ou None si le fichier est
+        absent, vide, ou identique à la dernière sauvegarde.
+        """
+        try:
+            with open(source_path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        return self.backup_bytes(data, name or os.path.basename(source_path))
+
+    def backup_bytes(self, data, name):
+        """Sauvegarde un contenu brut sous le nom 'name' (voir backup_file)."""
+        if not data:
+            return None
+
+        digest = hashlib.sha256(data).hexdigest()
+        entries = self._load_index()
+        if entries and entries[0]['hash'] == digest:
+            # Rien n'a changé depuis la dernière sauvegarde
+            return None
+
+        path = self._write_object(digest, data)
+        now = time.time()
+        entries.insert(0, {
+            'hash': digest,
+            'name': name,
+            'size': len(data),
+            'time': now,
+            'date': datetime.fromtimestamp(now).strftime("%Y-%m-%d %H:%M:%S"),
+            'compression': self.compression,
+        })
+        self._save_index(self._apply_retention(entries, now))
+        self._collect_garbage()
+        return path
+
+    def list(self):
+        """Retourne les sauvegardes, de la plus récente à la plus ancienne."""
+        return self._load_index()
+
+    def find(self, ref):
+        """
+        Retrouve une sauvegarde par son numéro dans list() (0 = la plus
+        récente) ou par un préfixe de son hash. Retourne None si introuvable.
+        """
+        entries = self._load_index()
+        if isinstance(ref, int) or (str(ref).isdigit() and len(str(ref)) < 6):
+            index = int(ref)
+            return entries[index] if 0 <= index < len(entries) else None
+        matches = [e for e in entries if e['hash'].startswith(str(ref))]
+        return matches[0] if matches else None
+
+    def read(self, entry):
+        """Retourne le contenu décompressé d'une sauvegarde."""
+        path = self._object_path(entry['hash'], entry.get('compression'))
+        with open(path, 'rb') as f:
+            return self._decompress(f.read(), entry.get('compression'))
+
+    def restore(self, ref, dest_path):
+        """
+        Restaure la sauvegarde 'ref' vers 'dest_path' (écriture atomique).
+        La version actuelle de 'dest_path' est sauvegardée au préalable.
+        Le fichier est remplacé sans verrou ni numéro de version : pour la
+        base des produits, passer par StorageBackend.restore_backup().
+        Retourne True en cas de succès, False sinon.
+        """
+        entry = self.find(ref)
+        if entry is None:
+            print(f"Sauvegarde introuvable : {ref}")
+            return False
+
+        data = self.read(entry)
+        self.backup_file(dest_path)
+        temp_file = f"{dest_path}.tmp"
+        with open(temp_file, 'wb') as f:
+            f.write(data)
+        os.replace(temp_file, dest_path)
+        print(f"Sauvegarde {entry['hash'][:12]} ({entry['date']}) restaurée vers {dest_path}")
+        return True
+
+    def import_legacy_backups(self, remove=False):
+        """
+        Importe les anciennes sauvegardes horodatées du dossier
+        (products_AAAAMMJJ_HHMMSS.json, products_lastest_version.json...)
+        dans le stockage, à leur date d'origine. Les fichiers vides sont
+        ignorés, deux versions successives identiques ne sont gardées
+        qu'une fois et une version déjà importée n'est pas ajoutée à
+        nouveau. Les originaux sont conservés, sauf avec 'remove=True'.
+        Retourne le nombre de sauvegardes importées.
+        """
+        legacy = []
+        for filename in os.listdir(self.backups_dir):
+            match = LEGACY_BACKUP.match(filename)
+            path = os.path.join(self.backups_dir, filename)
+            if match is None or not os.path.isfile(path):
+                continue
+            try:
+                if match['stamp']:
+                    moment = datetime.strptime(match['stamp'], "%Y%m%d_%H%M%S").timestamp()
+                else:
+                    moment = os.path.getmtime(path)
+            except ValueError:
+                continue
+            legacy.append((moment, path, f"{match['base']}.{match['ext']}"))
+        if not legacy:
+            return 0
+
+        entries = self._load_index()
+        known = {(entry['hash'], entry['time']) for entry in entries}
+        imported = []
+        previous = None
+        for moment, path, name in sorted(legacy):
+            with open(path, 'rb') as f:
+                data = f.read()
+            if not data:
+                continue
+            digest = hashlib.sha256(data).hexdigest()
+            repeated, previous = digest == previous, digest
+            if repeated or (digest, moment) in known:
+                continue
+            self._write_object(digest, data)
+            imported.insert(0, {
+                'hash': digest,
+                'name': name,
+                'size': len(data),
+                'time': moment,
+                'date': datetime.fromtimestamp(moment).strftime("%Y-%m-%d %H:%M:%S"),
+                'compression': self.compression,
+            })
+
+        entries = sorted(entries + imported, key=lambda entry: entry['time'], reverse=True)
+        self._save_index(self._apply_retention(entries, time.time()))
+        self._collect_garbage()
+        if remove:
+            for _, path, _ in legacy:
+                os.remove(path)
+        print(f"{len(imported)} ancienne(s) sauvegarde(s) importée(s) dans {self.backups_dir}")
+        return len(imported)
+
+    # ------------------------------------------------------------------
+    # Rétention
+    # ------------------------------------------------------------------
+
+    def _apply_retention(self, entries, now):
+        """
+        Garde les 'keep_last' dernières versions, puis la plus récente de
+        chaque heure sur 'keep_hourly' heures et de chaque jour sur
+        'keep_daily' jours. 'entries' est trié du plus récent au plus ancien.
+        """
+        kept = []
+        hours_seen = set()
+        days_seen = set()
+        for i, entry in enumerate(entries):
+            age = now - entry['time']
+            moment = datetime.fromtimestamp(entry['time'])
+            hour = moment.strftime("%Y%m%d%H")
+            day = moment.strftime("%Y%m%d")
+
+            keep = i < self.keep_last
+            if age <= self.keep_hourly * 3600 and hour not in hours_seen:
+                keep = True
+            if age <= self.keep_daily * 86400 and day not in days_seen:
+                keep = True
+            hours_seen.add(hour)
+            days_seen.add(day)
+
+            if keep:
+                kept.append(entry)
+        return kept
+
+    def _collect_garbage(self):
+        """Supprime les objets qui ne sont plus référencés par l'index."""
+        referenced = {
+            self._object_path(e['hash'], e.get('compression'))
+            for e in self._load_index()
+        }
+        for subdir in os.listdir(self.objects_dir):
+            subdir_path = os.path.join(self.objects_dir, subdir)
+            if not os.path.isdir(subdir_path):
+                continue
+            for filename in os.listdir(subdir_path):
+                path = os.path.join(subdir_path, filename)
+                if path not in referenced:
+                    os.remove(path)
+
+
+def main(argv=None):
+    """
+    Usage :
+        python -m modules.backup_store list <dossier>
+        python -m modules.backup_store restore <dossier> <ref> <fichier>
+            (pas pour products.json / products.db : python -m modules.cli restore)
+        python -m modules.backup_store migrate-legacy <dossier> [--remove]
+            importe les anciennes copies horodatées du dossier
+            (products_AAAAMMJJ_HHMMSS.json...) ; --remove les supprime ensuite
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) >= 2 and argv[0] == "list":
+        for i, entry in enumerate(BackupStore(argv[1]).list()):
+            print(f"{i:3d}  {entry['hash'][:12]}  {entry['date']}  "
+                  f"{entry['size']:>10d} o  {entry['name']}")
+        return 0
+    if len(argv) == 4 and argv[0] == "restore":
+        from modules.storage_backend import SQLITE_EXTENSIONS
+
+        if os.path.splitext(argv[3])[1].lower() in ('.json',) + SQLITE_EXTENSIONS:
+            # Base des produits : verrou, numéro de version et journal sont
+            # gérés par le moteur de stockage
+            print(f"{argv[3]} est une base de produits : utilisez "
+                  f"python -m modules.cli --db {argv[3]} restore {argv[2]}")
+            return 1
+        return 0 if BackupStore(argv[1]).restore(argv[2], argv[3]) else 1
+    if len(argv) in (2, 3) and argv[0] == "migrate-legacy" and argv[2:] in ([], ["--remove"]):
+        try:
+            BackupStore(argv[1]).import_legacy_backups(remove=bool(argv[2:]))
+        except OSError as e:
+            print(f"Erreur lors de l'import des anciennes sauvegardes : {e}")
+            return 1
+        return 0
+    print(main.__doc__)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+# modules/bulk_import.py
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sys
+
+# Colonnes reconnues (les autres sont ignorées)
+FIELDS = ('name', 'price', 'category', 'rating', 'badge', 'description', 'image_path', 'icon')
+
+
+def _clean(row):
+    """Ne garde que les colonnes connues et traite les cellules vides comme absentes."""
+    cleaned = {}
+    for field in FIELDS:
+        value = row.get(field)
+        if isinstance(value, str):
+            value = value.strip()
+        if value not in (None, ''):
+            cleaned[field] = value
+    return cleaned
+
+
+def read_csv(path):
+    """Lit un CSV (en-tête obligatoire) ligne par ligne : (numéro de ligne, dict)."""
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            yield reader.line_num, _clean(row)
+
+
+def read_jsonl(path, errors):
+    """
+    Lit un fichier JSON-lines (un objet par ligne) : (numéro de ligne, dict).
+    Les lignes mal formées sont ajoutées à 'errors'.
+    """
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                errors.append((line_number, f"JSON invalide : {e.msg}"))
+                continue
+            if not isinstance(row, dict):
+                errors.append((line_number, "Un objet JSON est attendu."))
+                continue
+            yield line_number, _clean(row)
+
+
+def read_rows(path, errors):
+    """Choisit le lecteur selon l'extension (.csv ou .jsonl/.ndjson)."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        return read_csv(path)
+    if extension in ('.jsonl', '.ndjson'):
+        return read_jsonl(path, errors)
+    raise ValueError(f"Format d'import non pris en charge : {extension} (csv ou jsonl)")
+
+
+def ingest_row_images(rows, images_dir, errors):
+    """
+    Traite en parallèle (tous les cœurs) les images référencées par les
+    lignes et remplace leur 'image_path' par l'image importée.
+    Une image illisible est signalée dans 'errors' ; le produit est alors
+    importé sans image.
+    """
+    from modules import image_pipeline
+
+    jobs = []
+    targets = []
+    for line, row in rows:
+        source = row.get('image_path')
+        if source and os.path.exists(source):
+            digest = hashlib.sha1(os.path.abspath(source).encode('utf-8')).hexdigest()[:16]
+            dest = os.path.join(images_dir, f"import_{digest}{image_pipeline.MASTER_EXTENSION}")
+            jobs.append((source, dest))
+            targets.append((line, row))
+
+    results = image_pipeline.ingest_images(jobs)
+    for (line, row), (dest, error) in zip(targets, results):
+        if error:
+            errors.append((line, f"Image ignorée : {error}"))
+            row['image_path'] = ''
+        else:
+            row['image_path'] = dest.replace(os.sep, '/')
+
+
+def import_file(service, path, images_dir=None):
+    """
+    Importe un fichier CSV ou JSON-lines dans 'service' (ProductService)
+    en une seule écriture. Si 'images_dir' est fourni, les images sont
+    redimensionnées et copiées dans ce dossier avant l'import.
+    Retourne un tuple (succès: bool, message: str, erreurs) ; erreurs est
+    la liste triée des (numéro de ligne, message).
+    """
+    errors = []
+    rows = read_rows(path, errors)
+    if images_dir:
+        # Les images doivent être traitées avant l'écriture : on matérialise les lignes
+        rows = list(rows)
+        ingest_row_images(rows, images_dir, errors)
+
+    success, message, rejected = service.import_products(rows)
+    errors.extend(rejected)
+    errors.sort()
+    if errors:
+        message += f" {len(errors)} ligne(s) refusée(s) ou incomplète(s)."
+    return success, message, errors
+
+
+def main(argv=None):
+    """Usage : python -m modules.bulk_import fichier.csv|fichier.jsonl [--db products.json]"""
+    parser = argparse.ArgumentParser(
+        prog="python -m modules.bulk_import",
+        description="Importe des produits depuis un fichier CSV ou JSON-lines.")
+    parser.add_argument("file", help="fichier .csv ou .jsonl à importer")
+    parser.add_argument("--db", default=os.environ.get("LADYGLAM_DB", "products.json"),
+                        help="fichier de données (products.json ou products.db)")
+    parser.add_argument("--images", metavar="DOSSIER",
+                        help="redimensionne et copie les images référencées dans ce dossier")
+    args = parser.parse_args(argv)
+
+    from modules.product_service import ProductService
+    from modules.storage_backend import open_storage
+
+    service = ProductService(open_storage(args.db))
+    try:
+        success, message, errors = import_file(service, args.file, args.images)
+    except (OSError, ValueError) as e:
+        print(f"Erreur : {e}")
+        return 2
+
+    for line, error in errors:
+        print(f"Ligne {line} : {error}")
+    print(message)
+    return 0 if success else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
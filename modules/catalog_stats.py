@@ -0,0 +1,110 @@
+# modules/catalog_stats.py
+
+import bisect
+import collections
+
+from modules.product import column
+
+# Tranches de prix du tableau de bord (FDJ) : [0, 1000), [1000, 2500)... [50000, +inf)
+PRICE_BOUNDS = (1000, 2500, 5000, 10000, 25000, 50000)
+
+# Statistiques du catalogue retournées par ProductService.statistics().
+# categories, badges : {valeur: nombre de produits} ('' = sans catégorie / sans badge)
+# ratings : {note: nombre de produits}, par note croissante
+# price_ranges : liste de (borne basse, borne haute ou None, nombre de produits)
+# average_price, average_rating : moyennes (None si le catalogue est vide)
+# missing_images : nombre de produits sans image (image_path vide)
+CatalogSummary = collections.namedtuple(
+    'CatalogSummary',
+    'count categories badges ratings price_ranges average_price average_rating missing_images')
+
+
+def _price(value):
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _rating(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+class CatalogStats:
+    """
+    Compteurs du catalogue tenus à jour produit par produit : ajouter,
+    retirer ou remplacer un produit coûte O(1), et summary() ne dépend
+    que du nombre de catégories, badges, notes et tranches de prix, pas
+    du nombre de produits. Le total des prix est tenu en centimes (entier)
+    pour que les ajouts et retraits successifs ne cumulent pas d'erreur.
+    """
+
+    def __init__(self, products=()):
+        self.count = 0
+        self.categories = collections.Counter()
+        self.badges = collections.Counter()
+        self.ratings = collections.Counter()
+        self.price_counts = [0] * (len(PRICE_BOUNDS) + 1)
+        self.price_cents = 0
+        self.rating_total = 0
+        self.missing_images = 0
+        if products:
+            self._count_all(products)
+
+    def _count_all(self, products):
+        """Comptage initial, champ par champ (plus rapide que add() produit par produit)."""
+        prices = [_price(price) for price in column(products, 'price', 0)]
+        ratings = [_rating(rating) for rating in column(products, 'rating', 5)]
+        self.count = len(products)
+        self.categories.update(category or '' for category in column(products, 'category', ''))
+        self.badges.update(badge or '' for badge in column(products, 'badge'))
+        self.ratings.update(ratings)
+        self.rating_total = sum(ratings)
+        for bucket, n in collections.Counter(
+                bisect.bisect_right(PRICE_BOUNDS, price) for price in prices).items():
+            self.price_counts[bucket] = n
+        self.price_cents = sum(round(price * 100) for price in prices)
+        self.missing_images = sum(1 for path in column(products, 'image_path', '') if not path)
+
+    def _apply(self, product, delta):
+        price = _price(product.get('price'))
+        rating = _rating(product.get('rating', 5))
+        self.count += delta
+        self.categories[product.get('category') or ''] += delta
+        self.badges[product.get('badge') or ''] += delta
+        self.ratings[rating] += delta
+        self.rating_total += delta * rating
+        self.price_counts[bisect.bisect_right(PRICE_BOUNDS, price)] += delta
+        self.price_cents += delta * round(price * 100)
+        if not product.get('image_path'):
+            self.missing_images += delta
+
+    def add(self, product):
+        """Compte un produit ajouté."""
+        self._apply(product, 1)
+
+    def remove(self, product):
+        """Décompte un produit retiré (tel qu'il avait été compté)."""
+        self._apply(product, -1)
+
+    def replace(self, old_product, new_product):
+        """Remplace un produit compté par sa nouvelle version."""
+        self._apply(old_product, -1)
+        self._apply(new_product, 1)
+
+    def summary(self):
+        """Instantané des compteurs (CatalogSummary)."""
+        bounds = (0,) + PRICE_BOUNDS + (None,)
+        return CatalogSummary(
+            count=self.count,
+            categories={key: n for key, n in self.categories.most_common() if n},
+            badges={key: n for key, n in self.badges.most_common() if n},
+            ratings={key: self.ratings[key] for key in sorted(self.ratings) if self.ratings[key]},
+            price_ranges=[(bounds[i], bounds[i + 1], n) for i, n in enumerate(self.price_counts)],
+            average_price=self.price_cents / 100 / self.count if self.count else None,
+            average_rating=self.rating_total / self.count if self.count else None,
+            missing_images=self.missing_images,
+        )
@@ -0,0 +1,251 @@
+# modules/cli.py
+
+"""
+Ligne de commande de Lady Glam Manager, sans interface graphique.
+
+Usage : python -m modules.cli <commande> [options]
+    list      liste les produits
+    get       affiche un produit (JSON)
+    add       ajoute un produit
+    update    modifie un produit
+    delete    supprime un produit
+    import    importe un fichier CSV ou JSON-lines
+    export    exporte le catalogue pour le site (products.js)
+    backup    sauvegarde les données, ou liste les sauvegardes (--list)
+    restore   restaure une sauvegarde (numéro ou préfixe de hash)
+    serve     lance l'API HTTP JSON du catalogue (modules/api_server.py)
+
+Le fichier de données et les options d'export suivent les mêmes
+variables d'environnement que gestion.py (LADYGLAM_DB, LADYGLAM_JOURNAL,
+LADYGLAM_EXPORT_MODE, LADYGLAM_EXPORT_PROFILE).
+
+Seuls argparse et os sont importés au démarrage : chaque commande importe
+ce dont elle a besoin (ni tkinter ni Pillow), pour que les scripts
+d'automatisation démarrent en quelques dizaines de millisecondes.
+"""
+
+import argparse
+import os
+import sys
+
+
+def _open_service(args):
+    from modules.product_service import ProductService
+    from modules.storage_backend import open_storage
+    return ProductService(open_storage(args.db, journal=args.journal))
+
+
+def _print_json(value):
+    from modules import json_codec
+    print(json_codec.encode(value, pretty=True).decode('utf-8'))
+
+
+def _product_fields(args):
+    """Champs produit fournis sur la ligne de commande (options non renseignées ignorées)."""
+    fields = {}
+    for field in ('name', 'price', 'category', 'rating', 'badge', 'description', 'image_path', 'icon'):
+        value = getattr(args, field, None)
+        if value is not None:
+            fields[field] = value
+    return fields
+
+
+def _report(success, message):
+    print(message)
+    return 0 if success else 1
+
+
+# ----------------------------------------------------------------------
+# Commandes
+# ----------------------------------------------------------------------
+
+def cmd_list(args):
+    products = _open_service(args).get_all()
+    if args.category:
+        products = [p for p in products if p.get('category') == args.category]
+    if args.limit is not None:
+        products = products[:args.limit]
+    if args.json:
+        _print_json(products)
+        return 0
+    for product in products:
+        print(f"{product.get('id', ''):>6}  {product.get('price', 0):>10.2f}  "
+              f"{product.get('category', '') or '-':<20}  {product.get('name', '')}")
+    return 0
+
+
+def cmd_get(args):
+    product = _open_service(args).get_by_id(args.id)
+    if product is None:
+        print("Produit non trouvé.")
+        return 1
+    _print_json(product)
+    return 0
+
+
+def cmd_add(args):
+    return _report(*_open_service(args).add(_product_fields(args)))
+
+
+def cmd_update(args):
+    service = _open_service(args)
+    product = service.get_by_id(args.id)
+    if product is None:
+        print("Produit non trouvé.")
+        return 1
+    # Seuls les champs fournis sont modifiés
+    return _report(*service.update(args.id, {**product, **_product_fields(args)}))
+
+
+def cmd_delete(args):
+    return _report(*_open_service(args).delete(args.id))
+
+
+def cmd_import(args):
+    from modules.bulk_import import import_file
+
+    try:
+        success, message, errors = import_file(_open_service(args), args.file, args.images)
+    except (OSError, ValueError) as e:
+        print(f"Erreur : {e}")
+        return 2
+    for line, error in errors:
+        print(f"Ligne {line} : {error}")
+    return _report(success, message)
+
+
+def cmd_export(args):
+    from modules.products_exporter import ProductsExporter
+
+    # L'exporteur lit lui-même le stockage (journal compris) : si la
+    # signature n'a pas changé, le catalogue n'est même pas chargé
+    exporter = ProductsExporter(args.db, sharded=args.sharded, profile=args.profile)
+    if exporter.export_to_js(force=args.force):
+        return 0
+    return 1
+
+
+def cmd_backup(args):
+    from modules.storage_backend import open_storage
+
+    db = open_storage(args.db, journal=args.journal)
+    if args.list:
+        for i, entry in enumerate(db.list_backups()):
+            print(f"{i:3d}  {entry['hash'][:12]}  {entry['date']}  "
+                  f"{entry['size']:>10d} o  {entry['name']}")
+        return 0
+    if db.backup_current_version() is None:
+        print("Aucune modification depuis la dernière sauvegarde.")
+    return 0
+
+
+def cmd_restore(args):
+    from modules.storage_backend import open_storage
+
+    db = open_storage(args.db, journal=args.journal)
+    if db.restore_backup(args.ref):
+        print(f"Sauvegarde {args.ref} restaurée dans {args.db}.")
+        return 0
+    return 1
+
+
+def cmd_serve(args):
+    import asyncio
+    from modules.api_server import CatalogApiServer
+
+    server = CatalogApiServer(_open_service(args), args.host, args.port)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+# ----------------------------------------------------------------------
+# Arguments
+# ----------------------------------------------------------------------
+
+def _add_product_options(parser, required):
+    parser.add_argument("--name", required=required, help="nom du produit")
+    parser.add_argument("--price", required=required, help="prix (nombre > 0)")
+    parser.add_argument("--category", help="catégorie")
+    parser.add_argument("--rating", help="note de 1 à 5")
+    parser.add_argument("--badge", help="badge (ex: Nouveau)")
+    parser.add_argument("--description", help="description")
+    parser.add_argument("--image", dest="image_path", help="chemin de l'image")
+    parser.add_argument("--icon", help="emoji affiché sans image")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m modules.cli",
+        description="Gestion du catalogue Lady Glam sans interface graphique.")
+    parser.add_argument("--db", default=os.environ.get("LADYGLAM_DB", "products.json"),
+                        help="fichier de données (products.json ou products.db)")
+    parser.add_argument("--journal", action="store_true",
+                        default=os.environ.get("LADYGLAM_JOURNAL", "0") == "1",
+                        help="mode journal du stockage JSON")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    sub = commands.add_parser("list", help="liste les produits")
+    sub.add_argument("--category", help="seulement cette catégorie")
+    sub.add_argument("--limit", type=int, help="nombre maximum de produits")
+    sub.add_argument("--json", action="store_true", help="sortie JSON")
+    sub.set_defaults(func=cmd_list)
+
+    sub = commands.add_parser("get", help="affiche un produit")
+    sub.add_argument("id", type=int)
+    sub.set_defaults(func=cmd_get)
+
+    sub = commands.add_parser("add", help="ajoute un produit")
+    _add_product_options(sub, required=True)
+    sub.set_defaults(func=cmd_add)
+
+    sub = commands.add_parser("update", help="modifie un produit")
+    sub.add_argument("id", type=int)
+    _add_product_options(sub, required=False)
+    sub.set_defaults(func=cmd_update)
+
+    sub = commands.add_parser("delete", help="supprime un produit")
+    sub.add_argument("id", type=int)
+    sub.set_defaults(func=cmd_delete)
+
+    sub = commands.add_parser("import", help="importe un fichier CSV ou JSON-lines")
+    sub.add_argument("file")
+    sub.add_argument("--images", metavar="DOSSIER",
+                     help="redimensionne et copie les images référencées dans ce dossier")
+    sub.set_defaults(func=cmd_import)
+
+    sub = commands.add_parser("export", help="exporte le catalogue vers web/js/products.js")
+    sub.add_argument("--force", action="store_true", help="réécrit même si rien n'a changé")
+    sub.add_argument("--sharded", action="store_true",
+                     default=os.environ.get("LADYGLAM_EXPORT_MODE") == "sharded",
+                     help="export fragmenté (pages JSON)")
+    sub.add_argument("--profile", choices=("dev", "production"),
+                     default=os.environ.get("LADYGLAM_EXPORT_PROFILE", "dev"),
+                     help="profil d'export")
+    sub.set_defaults(func=cmd_export)
+
+    sub = commands.add_parser("backup", help="sauvegarde les données")
+    sub.add_argument("--list", action="store_true", help="liste les sauvegardes existantes")
+    sub.set_defaults(func=cmd_backup)
+
+    sub = commands.add_parser("restore", help="restaure une sauvegarde")
+    sub.add_argument("ref", help="numéro (0 = la plus récente) ou préfixe de hash")
+    sub.set_defaults(func=cmd_restore)
+
+    sub = commands.add_parser("serve", help="lance l'API HTTP JSON du catalogue")
+    sub.add_argument("--host", default="127.0.0.1")
+    sub.add_argument("--port", type=int, default=8765)
+    sub.set_defaults(func=cmd_serve)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,52 +1,131 @@
 # modules/database_manager.py
 
+import contextlib
 import json
 import os
-import shutil
-from datetime import datetime
 
-class DatabaseManager:
+from modules import json_codec
+from modules.file_lock import FileLock
+from modules.storage_backend import StorageBackend
+
+class DatabaseManager(StorageBackend):
     """
     Gère la base de données JSON des produits.
     S'occupe de la lecture, de l'écriture atomique et des sauvegardes.
+
+    En mode journal, les ajouts/modifications/suppressions sont ajoutés
+    à products.journal (une ligne JSON par opération) au lieu de réécrire
+    products.json ; le journal est replié dans le fichier JSON (compaction)
+    dès qu'il dépasse un nombre d'entrées ou une taille donnés. Ces
+    modifications ne réécrivent pas le fichier : une sauvegarde du
+    catalogue (fichier JSON et journal rejoué) est faite avant la première,
+    puis toutes les 'backup_every' modifications.
+
+    Plusieurs processus peuvent partager le même fichier : chaque écriture
+    se fait sous un verrou exclusif (products.lock) et augmente le numéro
+    de version conservé dans products.version.
     """
-    
-    def __init__(self, json_file="products.json"):
+
+    def __init__(self, json_file="products.json", journal=False,
+                 journal_max_entries=500, journal_max_bytes=1024 * 1024, backup_every=50):
         self.json_file = json_file
         self.db_backups_dir = "backups/db_backups"
-        
-        # Crée le dossier de sauvegarde s'il n'existe pas
-        os.makedirs(self.db_backups_dir, exist_ok=True)
-        
+        self.journal = journal
+        base = os.path.splitext(json_file)[0]
+        self.journal_file = f"{base}.journal"
+        self.version_file = f"{base}.version"
+        self._file_lock = FileLock(f"{base}.lock")
+        self.journal_max_entries = journal_max_entries
+        self.journal_max_bytes = journal_max_bytes
+        self.backup_every = backup_every
+        self._journal_entries = 0
+
         # Crée le fichier JSON s'il n'existe pas
-        if not os.path.exists(self.json_file):
-            self.save([])
+        with self._file_lock:
+            if not os.path.exists(self.json_file):
+                self.save([])
+
+    def lock(self):
+        """Verrou exclusif inter-processus (réentrant) sur products.lock."""
+        return self._file_lock
+
+    def get_version(self):
+        """Numéro de version écrit dans products.version (0 s'il n'existe pas)."""
+        try:
+            with open(self.version_file, 'r', encoding='utf-8') as f:
+                return int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def _bump_version(self):
+        """Augmente le numéro de version (appelé sous le verrou, après une écriture)."""
+        temp_file = f"{self.version_file}.tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            f.write(str(self.get_version() + 1))
+        os.replace(temp_file, self.version_file)
 
     def backup_current_version(self):
         """
-        Crée une sauvegarde de la version actuelle du fichier JSON.
-        Retourne le chemin du fichier de sauvegarde.
+        Crée une sauvegarde de la version actuelle du fichier JSON (en mode
+        journal, du catalogue avec le journal rejoué).
+        Retourne le chemin du fichier de sauvegarde, ou None si le fichier
+        est absent, vide ou identique à la dernière sauvegarde.
         """
-        if os.path.exists(self.json_file):
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_filename = f"products_{timestamp}.json"
-            backup_path = os.path.join(self.db_backups_dir, backup_filename)
-            shutil.copy2(self.json_file, backup_path)
+        if self.journal and os.path.exists(self.journal_file):
+            data = json_codec.encode(self.load(), pretty=True)
+            backup_path = self.backup_store.backup_bytes(data, os.path.basename(self.json_file))
+        else:
+            backup_path = self.backup_store.backup_file(self.json_file)
+        if backup_path:
             print(f"Sauvegarde de la base de données créée : {backup_path}")
-            return backup_path
-        return None
+        return backup_path
+
+    def get_modified_time(self):
+        """Date de la dernière écriture (fichier JSON, journal ou products.version)."""
+        return self._latest_mtime(self.json_file, self.journal_file, self.version_file)
+
+    @staticmethod
+    def _stat_signature(path):
+        """Retourne (mtime, taille, inode) d'un fichier, ou None s'il n'existe pas."""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def get_signature(self):
+        """
+        Retourne la signature (mtime, taille, inode, version) du fichier JSON.
+        Permet de savoir si le fichier a changé sans le relire ; le numéro
+        de version distingue deux écritures faites dans la même tranche de
+        mtime. Retourne None si le fichier n'existe pas.
+        En mode journal, la signature du journal est incluse.
+        """
+        signature = self._stat_signature(self.json_file)
+        if signature is None:
+            return None
+        signature += (self.get_version(),)
+        if not self.journal:
+            return signature
+        return signature + (self._stat_signature(self.journal_file),)
 
     def load(self):
         """
         Charge les données depuis le fichier JSON.
         Retourne une liste de produits (vide si erreur ou fichier vide).
+        En mode journal, les opérations journalisées sont rejouées par-dessus
+        (sous le verrou, pour ne pas lire le journal pendant une compaction).
         """
-        try:
-            with open(self.json_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            # Si le fichier n'existe pas ou est corrompu, on retourne une liste vide
-            return []
+        with self._file_lock if self.journal else contextlib.nullcontext():
+            try:
+                data = json_codec.load(self.json_file)
+            except (FileNotFoundError, json.JSONDecodeError):
+                # Si le fichier n'existe pas ou est corrompu, on retourne une liste vide
+                data = []
+
+            if self.journal:
+                self._replay_journal(data)
+        return data
 
     def save(self, data):
         """
@@ -54,17 +133,25 @@ class DatabaseManager:
         Crée une sauvegarde avant d'écrire.
         Retourne True en cas de succès, False en cas d'erreur.
         """
+        with self._file_lock:
+            return self._save(data)
+
+    def _save(self, data):
         # 1. Créer une sauvegarde de l'ancienne version
         self.backup_current_version()
-        
+
         # 2. Écriture atomique via un fichier temporaire
         temp_file = f"{self.json_file}.tmp"
         try:
-            with open(temp_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            
+            with open(temp_file, 'wb') as f:
+                f.write(json_codec.encode(data, pretty=True))
+
             # 3. Remplacer le fichier original par le fichier temporaire
             os.replace(temp_file, self.json_file)
+
+            # 4. Le fichier JSON contient désormais tout : le journal est obsolète
+            self._clear_journal()
+            self._bump_version()
             return True
         except Exception as e:
             print(f"Erreur lors de la sauvegarde de la base de données : {e}")
@@ -72,3 +159,129 @@ class DatabaseManager:
             if os.path.exists(temp_file):
                 os.remove(temp_file)
             return False
+
+    # ------------------------------------------------------------------
+    # Mode journal
+    # ------------------------------------------------------------------
+
+    def insert(self, product, products):
+        if not self.journal:
+            return self.save(products)
+        return self._journal_append({'op': 'insert', 'product': product}, products)
+
+    def update(self, product, products):
+        if not self.journal:
+            return self.save(products)
+        return self._journal_append({'op': 'update', 'product': product}, products)
+
+    def delete(self, product_id, products):
+        if not self.journal:
+            return self.save(products)
+        return self._journal_append({'op': 'delete', 'id': product_id}, products)
+
+    def _journal_append(self, record, products):
+        """
+        Ajoute une opération à la fin du journal (coût indépendant de la
+        taille du catalogue), puis compacte si un seuil est dépassé.
+        """
+        with self._file_lock:
+            return self._journal_append_locked(record, products)
+
+    def _journal_append_locked(self, record, products):
+        try:
+            self._periodic_backup()
+            line = json_codec.encode(record)
+            with open(self.journal_file, 'a+b') as f:
+                # Si un arrêt brutal a laissé une ligne incomplète, on la termine
+                # pour ne pas coller la nouvelle opération à ses restes
+                if f.tell() > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        f.write(b"\n")
+                f.write(line + b"\n")
+                f.flush()
+                os.fsync(f.fileno())
+                journal_size = f.tell()
+            self._bump_version()
+        except OSError as e:
+            print(f"Erreur lors de l'écriture du journal : {e}")
+            return False
+
+        self._journal_entries += 1
+        if (self._journal_entries >= self.journal_max_entries
+                or journal_size >= self.journal_max_bytes):
+            self.compact(products)
+        return True
+
+    def _replay_journal(self, data):
+        """
+        Applique les opérations du journal à la liste 'data' (en place).
+        Le rejeu est idempotent : rejouer un journal déjà replié dans le
+        fichier JSON (arrêt brutal pendant une compaction) ne change rien.
+        """
+        self._journal_entries = 0
+        try:
+            with open(self.journal_file, 'rb') as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return
+
+        latest = {}    # id -> dernière version du produit, ou None si supprimé
+        inserted = []  # ids ajoutés, dans l'ordre du journal
+        for line in lines:
+            try:
+                record = json_codec.decode(line)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                # Ligne tronquée par un arrêt brutal : on l'ignore
+                continue
+
+            op = record.get('op')
+            if op in ('insert', 'update'):
+                product_id = record['product'].get('id')
+                latest[product_id] = record['product']
+                if op == 'insert':
+                    inserted.append(product_id)
+            elif op == 'delete':
+                latest[record.get('id')] = None
+            self._journal_entries += 1
+
+        if not latest:
+            return
+
+        # Un seul passage sur la liste : remplacement ou retrait des produits existants
+        existing = set()
+        result = []
+        for product in data:
+            product_id = product.get('id')
+            existing.add(product_id)
+            current = latest.get(product_id, product)
+            if current is not None:
+                result.append(current)
+
+        # Les nouveaux produits vont en tête, le plus récent en premier
+        new_products = []
+        for product_id in reversed(inserted):
+            if product_id in existing or latest.get(product_id) is None:
+                continue
+            existing.add(product_id)
+            new_products.append(latest[product_id])
+
+        data[:] = new_products + result
+
+    def _clear_journal(self):
+        """Supprime le journal une fois son contenu écrit dans le fichier JSON."""
+        self._journal_entries = 0
+        if os.path.exists(self.journal_file):
+            os.remove(self.journal_file)
+
+    def compact(self, products=None):
+        """
+        Replie le journal dans products.json (écriture atomique via save).
+        'products' est l'état complet courant ; s'il est omis, il est
+        reconstruit à partir du fichier JSON et du journal.
+        Retourne True en cas de succès, False en cas d'erreur.
+        """
+        with self._file_lock:
+            if products is None:
+                products = self.load()
+            return self.save(products)
@@ -0,0 +1,86 @@
+# modules/file_lock.py
+
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:   # Windows
+    fcntl = None
+    import msvcrt
+
+
+class FileLock:
+    """
+    Verrou exclusif inter-processus, posé sur un fichier dédié (ex:
+    products.lock) : plusieurs instances de gestion.py, la ligne de
+    commande ou l'API peuvent ainsi partager le même fichier de données.
+
+        with FileLock("products.lock"):
+            ...  # relire, modifier, écrire
+
+    Verrou consultatif (fcntl.flock, ou msvcrt.locking sous Windows) :
+    seuls les programmes qui le prennent sont exclus. Il est réentrant
+    pour le thread qui le détient et exclut aussi les autres threads du
+    processus. Le système le libère si le processus s'arrête brutalement.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._fd = None
+
+    def acquire(self):
+        """Attend que le verrou soit libre, puis le prend."""
+        self._thread_lock.acquire()
+        if self._depth == 0:
+            try:
+                self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+                self._lock_fd(self._fd)
+            except BaseException:
+                if self._fd is not None:
+                    os.close(self._fd)
+                    self._fd = None
+                self._thread_lock.release()
+                raise
+        self._depth += 1
+
+    def release(self):
+        self._depth -= 1
+        if self._depth == 0:
+            try:
+                self._unlock_fd(self._fd)
+            finally:
+                os.close(self._fd)
+                self._fd = None
+        self._thread_lock.release()
+
+    @staticmethod
+    def _lock_fd(fd):
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            return
+        # msvcrt.locking abandonne après 10 tentatives d'une seconde : on réessaie
+        while True:
+            try:
+                msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                continue
+
+    @staticmethod
+    def _unlock_fd(fd):
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        else:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+        return False
@@ -0,0 +1,186 @@
+# modules/image_pipeline.py
+
+import importlib.util
+import os
+import sys
+
+# Pillow n'est importé qu'au premier traitement d'image : l'export (qui
+# n'utilise que find_variants) et la ligne de commande démarrent plus vite.
+
+# Largeurs des variantes générées pour le site (en pixels)
+VARIANT_WIDTHS = {'thumb': 160, 'card': 480, 'detail': 1200}
+# Plus grand côté de l'image principale conservée dans images/
+MAX_DIMENSION = 2000
+# Extension de l'image principale après traitement
+MASTER_EXTENSION = ".jpg"
+
+JPEG_QUALITY = 82
+WEBP_QUALITY = 80
+# Fond utilisé pour aplatir la transparence (cartes produit blanches)
+BACKGROUND = (255, 255, 255)
+
+
+def is_available():
+    """True si Pillow est installé (sinon les images sont copiées sans traitement)."""
+    return importlib.util.find_spec("PIL") is not None
+
+
+def _webp_supported():
+    from PIL import features
+    return features.check('webp')
+
+
+def variant_path(image_path, width, extension):
+    """'images/p_1.jpg', 480, '.webp' -> 'images/p_1-480w.webp'."""
+    base = os.path.splitext(image_path)[0]
+    return f"{base}-{width}w{extension}"
+
+
+def find_variants(image_path):
+    """
+    Retourne les variantes existantes de 'image_path' par format,
+    triées par largeur : {'jpeg': [[chemin, largeur], ...], 'webp': [...]}.
+    Retourne None si l'image n'a pas été traitée par ingest_image().
+    """
+    if not image_path:
+        return None
+    # ingest_image() écrit toujours le plus petit JPEG : s'il manque, l'image
+    # n'a pas été traitée (un seul stat au lieu d'un par variante à l'export)
+    if not os.path.exists(variant_path(image_path, min(VARIANT_WIDTHS.values()), '.jpg')):
+        return None
+    variants = {}
+    for fmt, extension in (('webp', '.webp'), ('jpeg', '.jpg')):
+        found = []
+        for width in sorted(VARIANT_WIDTHS.values()):
+            path = variant_path(image_path, width, extension)
+            if os.path.exists(path):
+                found.append([path.replace(os.sep, '/'), width])
+        if found:
+            variants[fmt] = found
+    return variants or None
+
+
+def _prepare(img):
+    """Oriente selon l'EXIF, aplatit la transparence et passe en RGB."""
+    from PIL import Image, ImageOps
+
+    img = ImageOps.exif_transpose(img)
+    if img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info):
+        img = img.convert('RGBA')
+        flat = Image.new('RGB', img.size, BACKGROUND)
+        flat.paste(img, mask=img.getchannel('A'))
+        return flat
+    return img.convert('RGB')
+
+
+def _save(img, path, fmt, quality):
+    """Écriture atomique, sans métadonnées (EXIF, GPS, profil...)."""
+    temp_file = f"{path}.tmp"
+    options = {'quality': quality}
+    if fmt == 'JPEG':
+        options.update(optimize=True, progressive=True)
+    else:
+        options.update(method=6)
+    img.save(temp_file, format=fmt, **options)
+    os.replace(temp_file, path)
+
+
+def ingest_image(source, dest_path):
+    """
+    Traite une image importée :
+    - limite le plus grand côté à MAX_DIMENSION et retire les métadonnées,
+    - écrit l'image principale en JPEG dans 'dest_path',
+    - écrit une variante WebP et JPEG pour chaque largeur de VARIANT_WIDTHS
+      plus petite que l'image (et toujours au moins la plus petite).
+    Retourne 'dest_path'. Lève OSError/ValueError si l'image est illisible.
+    """
+    try:
+        from PIL import Image
+    except ImportError:
+        raise RuntimeError("Le module 'Pillow' est requis pour traiter les images.")
+
+    with Image.open(source) as original:
+        img = _prepare(original)
+    img.thumbnail((MAX_DIMENSION, MAX_DIMENSION), Image.LANCZOS)
+
+    os.makedirs(os.path.dirname(dest_path) or ".", exist_ok=True)
+    _save(img, dest_path, 'JPEG', JPEG_QUALITY)
+
+    webp = _webp_supported()
+    widths = sorted(VARIANT_WIDTHS.values())
+    for width in widths:
+        if width >= img.width and width != widths[0]:
+            break
+        variant = img.copy()
+        variant.thumbnail((width, variant.height), Image.LANCZOS)
+        _save(variant, variant_path(dest_path, width, '.jpg'), 'JPEG', JPEG_QUALITY)
+        if webp:
+            _save(variant, variant_path(dest_path, width, '.webp'), 'WEBP', WEBP_QUALITY)
+    return dest_path
+
+
+def _ingest_job(job):
+    """Point d'entrée des processus du pool : ne lève jamais d'exception."""
+    source, dest_path = job
+    try:
+        return ingest_image(source, dest_path), None
+    except Exception as e:
+        return None, f"{source} : {e}"
+
+
+def ingest_images(jobs, max_workers=None):
+    """
+    Traite une liste de (source, destination) en parallèle sur tous les cœurs.
+    Retourne, dans le même ordre, une liste de (destination, None) en cas
+    de succès ou (None, message d'erreur) en cas d'échec.
+    """
+    jobs = list(jobs)
+    if len(jobs) <= 1 or max_workers == 1:
+        return [_ingest_job(job) for job in jobs]
+
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(_ingest_job, jobs, chunksize=4))
+
+
+def remove_image(image_path):
+    """Supprime une image principale et toutes ses variantes."""
+    paths = [image_path]
+    for width in VARIANT_WIDTHS.values():
+        paths += [variant_path(image_path, width, ext) for ext in ('.jpg', '.webp')]
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def main(argv=None):
+    """
+    Usage : python -m modules.image_pipeline <image.jpg> [...]
+    (Re)génère sur place l'image principale et les variantes d'images JPEG
+    déjà présentes dans images/, par exemple après une mise à jour.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print(main.__doc__)
+        return 2
+    failures = 0
+    jpeg_files = []
+    for path in argv:
+        if path.lower().endswith(('.jpg', '.jpeg')):
+            jpeg_files.append(path)
+        else:
+            failures += 1
+            print(f"Ignorée (pas un JPEG, le chemin du produit changerait) : {path}")
+    for dest, error in ingest_images((path, path) for path in jpeg_files):
+        if error:
+            failures += 1
+            print(f"Erreur : {error}")
+        else:
+            print(f"Traitée : {dest}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,209 @@
+# modules/json_codec.py
+
+"""
+Lecture et écriture JSON avec le module le plus rapide disponible :
+orjson, sinon msgspec, sinon json (bibliothèque standard). La variable
+d'environnement LADYGLAM_JSON_CODEC (orjson, msgspec ou json) force le choix.
+
+La sortie est identique octet pour octet quel que soit le module ; elle
+reproduit exactement celle de json :
+    encode(data, pretty=True)                    json.dumps(data, ensure_ascii=False, indent=2)
+    encode(data)                                 json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+    encode(data, pretty=True, ensure_ascii=True) json.dumps(data, indent=2)
+(puis encodés en UTF-8). Un Product est écrit comme le dict équivalent.
+Les rares valeurs que orjson et msgspec écrivent
+autrement (flottants très petits ou très grands, NaN, clés non textuelles,
+types autres que dict/list/tuple/str/int/float/bool/None) passent par json.
+"""
+
+import importlib
+import importlib.util
+import json
+import os
+import re
+import sys
+
+# Modules optionnels : seul celui qui est choisi est importé, et seulement
+# au premier encode() ou decode() (orjson et msgspec coûtent plusieurs
+# dizaines de millisecondes au démarrage)
+orjson = None
+msgspec = None
+
+# Classe Product, relevée quand modules.product est chargé : avant, aucun
+# Product ne peut exister (et ce module n'a pas à importer dataclasses)
+Product = None
+
+CODECS = ('orjson', 'msgspec', 'json')
+
+_SCALARS = frozenset((str, int, bool, type(None)))
+_ASTRAL = re.compile(rb'\\U[0-9a-f]{8}')
+_astral_cache = {}
+# Chiffres -> '0', le reste -> ' ' : repère les longs entiers sans regex
+_DIGITS = bytes(0x30 if 0x30 <= i <= 0x39 else 0x20 for i in range(256))
+
+
+def available_codecs():
+    """Modules installés, du plus rapide au plus lent."""
+    return [name for name in CODECS
+            if name == 'json' or importlib.util.find_spec(name) is not None]
+
+
+def set_codec(name):
+    """Choisit le module utilisé (ValueError s'il n'est pas installé)."""
+    global codec
+    if name not in available_codecs():
+        raise ValueError(f"Module JSON indisponible : {name} ({', '.join(available_codecs())})")
+    codec = name
+
+
+def _import_codec():
+    """Importe le module choisi s'il ne l'est pas encore."""
+    global orjson, msgspec
+    if codec == 'orjson' and orjson is None:
+        orjson = importlib.import_module('orjson')
+    elif codec == 'msgspec' and msgspec is None:
+        msgspec = importlib.import_module('msgspec')
+
+
+def _find_product_class():
+    global Product
+    if Product is None and 'modules.product' in sys.modules:
+        Product = sys.modules['modules.product'].Product
+
+
+codec = 'json'
+try:
+    set_codec(os.environ.get('LADYGLAM_JSON_CODEC') or available_codecs()[0])
+except ValueError:
+    # Module demandé absent : le plus rapide disponible
+    set_codec(available_codecs()[0])
+
+
+def _fast_path_ok(value):
+    """
+    Vérifie que 'value' ne contient que des valeurs que orjson et msgspec
+    écrivent exactement comme json (parcours sans récursion).
+    """
+    stack = [(value,)]
+    while stack:
+        container = stack.pop()
+        if type(container) is dict:
+            for key in container:
+                if type(key) is not str:
+                    return False
+            items = container.values()
+        else:
+            items = container
+        for item in items:
+            kind = type(item)
+            if kind in _SCALARS:
+                continue
+            if kind is float:
+                # json passe en notation scientifique hors de [1e-4, 1e16) ;
+                # NaN et l'infini échouent aussi à ce test
+                if item != 0.0 and not 1e-4 <= abs(item) < 1e16:
+                    return False
+            elif kind is dict or kind is list or kind is tuple:
+                stack.append(item)
+            elif kind is Product:
+                stack.append(item.values())
+            else:
+                return False
+    return True
+
+
+def _astral_escape(match):
+    sequence = match.group()
+    escaped = _astral_cache.get(sequence)
+    if escaped is None:
+        code = int(sequence[2:], 16) - 0x10000
+        high, low = 0xd800 | (code >> 10), 0xdc00 | (code & 0x3ff)
+        escaped = _astral_cache[sequence] = b'\\u%04x\\u%04x' % (high, low)
+    return escaped
+
+
+def _ascii_escape(data):
+    """
+    Remplace les caractères non ASCII de 'data' (JSON en UTF-8) par des
+    séquences \\uXXXX, comme json avec ensure_ascii=True. Retourne None
+    si un antislash du texte précède un 'x' ou un 'U' (cas ambigu, rare).
+    """
+    escaped = data.decode('utf-8').encode('ascii', 'backslashreplace')
+    if b'\\\\x' in escaped or b'\\\\U' in escaped:
+        return None
+    # backslashreplace écrit \xe9 et \U0001f381 là où json écrit é
+    # et la paire de substitution 🎁 ; json échappe aussi DEL
+    escaped = escaped.replace(b'\\x', b'\\u00').replace(b'\x7f', b'\\u007f')
+    if b'\\U' in escaped:
+        escaped = _ASTRAL.sub(_astral_escape, escaped)
+    return escaped
+
+
+def _default(value):
+    """Types supplémentaires acceptés par json (Product)."""
+    if type(value) is Product:
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _fast_encode(value, pretty):
+    _import_codec()
+    if codec == 'orjson':
+        return orjson.dumps(value, option=orjson.OPT_INDENT_2 if pretty else 0)
+    data = msgspec.json.encode(value)
+    return msgspec.json.format(data, indent=2) if pretty else data
+
+
+def encode(value, pretty=False, ensure_ascii=False):
+    """
+    Sérialise 'value' en JSON (bytes UTF-8) : indenté de 2 espaces si
+    'pretty', compact sinon ; caractères non ASCII échappés si 'ensure_ascii'.
+    """
+    _find_product_class()
+    if codec != 'json' and _fast_path_ok(value):
+        try:
+            data = _fast_encode(value, pretty)
+        except (TypeError, ValueError, OverflowError):
+            # Texte non encodable en UTF-8, entier trop grand pour orjson...
+            data = None
+        if data is not None and ensure_ascii:
+            data = _ascii_escape(data)
+        if data is not None:
+            return data
+
+    if pretty:
+        text = json.dumps(value, ensure_ascii=ensure_ascii, indent=2, default=_default)
+    else:
+        text = json.dumps(value, ensure_ascii=ensure_ascii, separators=(',', ':'),
+                          default=_default)
+    return text.encode('utf-8')
+
+
+def decode(data):
+    """
+    Désérialise un document JSON (bytes UTF-8 ou str). Lève
+    json.JSONDecodeError (ou UnicodeDecodeError) comme json.loads.
+    """
+    _import_codec()
+    if codec == 'orjson':
+        raw = data.encode('utf-8', 'surrogatepass') if isinstance(data, str) else data
+        # orjson lit en flottant les entiers de plus de 64 bits : on laisse
+        # json lire les documents contenant 19 chiffres consécutifs ou plus
+        if b'0' * 19 not in raw.translate(_DIGITS):
+            try:
+                return orjson.loads(raw)
+            except orjson.JSONDecodeError:
+                pass
+    elif codec == 'msgspec':
+        try:
+            return msgspec.json.decode(data)
+        except msgspec.DecodeError:
+            pass
+    # NaN, Infinity... acceptés par json ; sinon json lève l'erreur habituelle
+    return json.loads(data)
+
+
+def load(path):
+    """Lit et désérialise le fichier JSON 'path'."""
+    with open(path, 'rb') as f:
+        return decode(f.read())
@@ -0,0 +1,154 @@
+# modules/product.py
+
+import dataclasses
+import operator
+import sys
+
+# Champs d'un produit, dans l'ordre où ils sont écrits dans products.json
+FIELDS = ('id', 'name', 'price', 'category', 'rating', 'badge', 'description', 'image_path', 'icon')
+_FIELD_SET = frozenset(FIELDS)
+
+
+def _intern(value):
+    """Une seule copie en mémoire des textes répétés (catégorie, badge, icône)."""
+    return sys.intern(value) if type(value) is str else value
+
+
+def validate(product_data):
+    """
+    Vérifie les données d'un produit (règles communes à l'ajout, la
+    modification et l'import). Retourne un message d'erreur, ou None si valide.
+    """
+    if not product_data.get('name') or not str(product_data.get('name')).strip():
+        return "Le nom du produit est obligatoire."
+
+    try:
+        price = float(product_data.get('price', 0))
+        if price <= 0:
+            return "Le prix doit être un nombre supérieur à 0."
+    except (ValueError, TypeError):
+        return "Le prix doit être un nombre valide."
+
+    try:
+        int(product_data.get('rating', 5))
+    except (ValueError, TypeError):
+        return "La note doit être un nombre entier."
+    return None
+
+
+def column(products, field, default=None):
+    """
+    Valeurs du champ 'field' de tous les produits (Product ou dict), dans
+    l'ordre. Lecture directe des attributs quand tous sont des Product,
+    bien plus rapide qu'un get() par produit.
+    """
+    if all(type(product) is Product for product in products):
+        return list(map(operator.attrgetter(field), products))
+    return [product.get(field, default) for product in products]
+
+
+def replace(product, **changes):
+    """Copie de 'product' (Product ou dict) avec les champs 'changes' modifiés."""
+    if type(product) is Product:
+        return dataclasses.replace(product, **changes)
+    return {**product, **changes}
+
+
+@dataclasses.dataclass(slots=True, eq=False)
+class Product:
+    """
+    Un produit du catalogue. Beaucoup plus compact qu'un dict (pas de
+    table de hachage par produit, textes répétés partagés) ; se lit
+    comme un dict en lecture seule : product['name'], product.get('badge'),
+    {**product}, dict(product). json_codec l'écrit exactement comme le
+    dict équivalent.
+    """
+
+    id: int
+    name: str
+    price: float
+    category: str = ''
+    rating: int = 5
+    badge: str | None = None
+    description: str = ''
+    image_path: str = ''
+    icon: str = '🎁'
+
+    @classmethod
+    def build(cls, product_id, product_data):
+        """Construit le produit enregistré à partir de données validées (validate())."""
+        return cls(
+            product_id,
+            str(product_data['name']).strip(),
+            float(product_data.get('price', 0)),
+            _intern(product_data.get('category', '')),
+            int(product_data.get('rating', 5)),
+            _intern(product_data.get('badge')),
+            product_data.get('description', ''),
+            product_data.get('image_path', ''),
+            _intern(product_data.get('icon', '🎁')),
+        )
+
+    @classmethod
+    def from_dicts(cls, items):
+        """
+        Convertit des produits lus depuis le JSON. Seuls ceux qui ont
+        exactement les champs habituels, dans l'ordre, sont convertis :
+        les autres restent des dict, pour être réécrits à l'identique.
+        """
+        products = []
+        append = products.append
+        for item in items:
+            if type(item) is dict and tuple(item) == FIELDS:
+                (product_id, name, price, category, rating,
+                 badge, description, image_path, icon) = item.values()
+                item = cls(product_id, name, price, _intern(category), rating,
+                           _intern(badge), description, image_path, _intern(icon))
+            append(item)
+        return products
+
+    def values(self):
+        """Valeurs des champs, dans l'ordre de FIELDS."""
+        return (self.id, self.name, self.price, self.category, self.rating,
+                self.badge, self.description, self.image_path, self.icon)
+
+    def to_dict(self):
+        """Forme JSON du produit."""
+        return {'id': self.id, 'name': self.name, 'price': self.price,
+                'category': self.category, 'rating': self.rating, 'badge': self.badge,
+                'description': self.description, 'image_path': self.image_path,
+                'icon': self.icon}
+
+    # Lecture comme un dict
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in _FIELD_SET else default
+
+    def __getitem__(self, key):
+        if key in _FIELD_SET:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in _FIELD_SET
+
+    def keys(self):
+        return FIELDS
+
+    def items(self):
+        return zip(FIELDS, self.values())
+
+    def __iter__(self):
+        return iter(FIELDS)
+
+    def __len__(self):
+        return len(FIELDS)
+
+    def __eq__(self, other):
+        if type(other) is Product:
+            return self.values() == other.values()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    __hash__ = None
@@ -0,0 +1,206 @@
+# modules/product_columns.py
+
+"""
+Vue en colonnes du catalogue (tableaux NumPy), pour les statistiques et
+les modifications en masse sur de grands catalogues : un calcul sur une
+colonne remplace une boucle Python sur tous les produits.
+
+NumPy est optionnel : il n'est importé qu'à la première construction
+d'une vue, et is_available() indique s'il est installé.
+ProductService.columns() retourne la vue à jour du catalogue et
+ProductService.reprice() s'en sert pour les changements de prix en masse.
+"""
+
+import copy
+import importlib.util
+
+from modules.product import column
+
+np = None
+
+
+def is_available():
+    """True si NumPy est installé."""
+    return importlib.util.find_spec("numpy") is not None
+
+
+def _numpy():
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            raise RuntimeError("Le module 'numpy' est requis pour les statistiques du catalogue.")
+        np = numpy
+    return np
+
+
+def _number(value, convert, default):
+    try:
+        return convert(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _array(values, dtype, convert, default):
+    """Colonne NumPy ; valeur par valeur seulement si une valeur est invalide."""
+    try:
+        array = np.array(values, dtype=dtype)
+        if array.dtype.kind != 'f' or not np.isnan(array).any():
+            return array
+    except (TypeError, ValueError, OverflowError):
+        pass
+    return np.array([_number(value, convert, default) for value in values], dtype=dtype)
+
+
+def _rating(value):
+    # Les notes sont de 1 à 5 ; hors de l'intervalle int8 on borne
+    return max(-128, min(127, int(value)))
+
+
+def _codes(values):
+    """Codes des valeurs ('' pour None) et {valeur: code}."""
+    codes = {}
+    return [codes.setdefault(value or '', len(codes)) for value in values], codes
+
+
+class ProductColumns:
+    """
+    Colonnes du catalogue, ligne i = i-ème produit de la liste :
+    - ids (int64), prices (float64), ratings (int8)
+    - category_codes, badge_codes (int32) : positions dans categories et
+      badges ('' = sans catégorie / sans badge)
+    - index des ids (rows()) pour retrouver la ligne d'un produit.
+    C'est un instantané : ProductService en construit une nouvelle après
+    une modification (reprice() en dérive une avec with_prices()).
+    Les résultats sont des types Python (int, float, dict, list).
+    """
+
+    def __init__(self, products):
+        _numpy()
+        self.ids = _array(column(products, 'id'), np.int64, int, -1)
+        self.prices = _array([price or 0 for price in column(products, 'price', 0)],
+                             np.float64, float, 0.0)
+        self.ratings = _array(column(products, 'rating', 5), np.int8, _rating, 0)
+        category_codes, categories = _codes(column(products, 'category', ''))
+        badge_codes, badges = _codes(column(products, 'badge'))
+        self.category_codes = np.array(category_codes, dtype=np.int32)
+        self.badge_codes = np.array(badge_codes, dtype=np.int32)
+        self.categories = list(categories)
+        self.badges = list(badges)
+        self._category_code = categories
+        self._badge_code = badges
+        # Index des ids : ids triés et ligne correspondante
+        self._id_rows = np.argsort(self.ids, kind='stable')
+        self._sorted_ids = self.ids[self._id_rows]
+
+    def __len__(self):
+        return len(self.ids)
+
+    def with_prices(self, rows, prices):
+        """Copie de la vue où les lignes 'rows' ont les prix 'prices'."""
+        columns = copy.copy(self)
+        columns.prices = self.prices.copy()
+        columns.prices[rows] = prices
+        return columns
+
+    # Sélection
+
+    def rows(self, product_ids):
+        """Lignes des produits 'product_ids' (-1 pour un id inconnu)."""
+        product_ids = np.asarray(product_ids, dtype=np.int64)
+        if not len(self.ids):
+            return np.full(product_ids.shape, -1, dtype=np.int64)
+        found = np.minimum(np.searchsorted(self._sorted_ids, product_ids), len(self.ids) - 1)
+        return np.where(self._sorted_ids[found] == product_ids, self._id_rows[found], -1)
+
+    def row(self, product_id):
+        """Ligne du produit 'product_id', ou None s'il n'existe pas."""
+        row = int(self.rows([product_id])[0])
+        return row if row >= 0 else None
+
+    def select(self, category=None, badge=None, price_range=None, min_rating=None):
+        """
+        Masque booléen des produits correspondant aux filtres (mêmes
+        conventions que ProductService.query()) ; sans filtre, tous.
+        """
+        mask = np.ones(len(self.ids), dtype=bool)
+        if category is not None:
+            code = self._category_code.get(category)
+            mask &= self.category_codes == code if code is not None else False
+        if badge is not None:
+            code = self._badge_code.get(badge)
+            mask &= self.badge_codes == code if code is not None else False
+        if price_range is not None:
+            low, high = price_range
+            if low is not None:
+                mask &= self.prices >= low
+            if high is not None:
+                mask &= self.prices <= high
+        if min_rating is not None:
+            mask &= self.ratings >= min_rating
+        return mask
+
+    def _masked(self, column, mask):
+        return column if mask is None else column[mask]
+
+    # Statistiques
+
+    def price_summary(self, mask=None):
+        """{'count', 'total', 'min', 'max', 'mean'} des prix (None si aucun produit)."""
+        prices = self._masked(self.prices, mask)
+        if not len(prices):
+            return {'count': 0, 'total': 0.0, 'min': None, 'max': None, 'mean': None}
+        total = float(prices.sum())
+        return {'count': len(prices), 'total': total, 'min': float(prices.min()),
+                'max': float(prices.max()), 'mean': total / len(prices)}
+
+    def average_rating(self, mask=None):
+        """Note moyenne, ou None si aucun produit."""
+        ratings = self._masked(self.ratings, mask)
+        return float(ratings.mean(dtype=np.float64)) if len(ratings) else None
+
+    def price_histogram(self, bins=10, mask=None):
+        """Répartition des prix en 'bins' tranches égales : (effectifs, bornes)."""
+        counts, edges = np.histogram(self._masked(self.prices, mask), bins=bins)
+        return counts.tolist(), edges.tolist()
+
+    def rating_counts(self, mask=None):
+        """{note: nombre de produits}, par note croissante."""
+        values, counts = np.unique(self._masked(self.ratings, mask), return_counts=True)
+        return dict(zip(values.tolist(), counts.tolist()))
+
+    def badge_counts(self, mask=None):
+        """{badge: nombre de produits} ('' = sans badge)."""
+        counts = np.bincount(self._masked(self.badge_codes, mask), minlength=len(self.badges))
+        return {badge: count for badge, count in zip(self.badges, counts.tolist()) if count}
+
+    def category_summary(self, mask=None):
+        """
+        Par catégorie ('' = sans catégorie) : {'count', 'total', 'min',
+        'max', 'mean', 'mean_rating'} des prix et notes.
+        """
+        codes = self._masked(self.category_codes, mask)
+        prices = self._masked(self.prices, mask)
+        size = len(self.categories)
+        counts = np.bincount(codes, minlength=size)
+        totals = np.bincount(codes, weights=prices, minlength=size)
+        rating_totals = np.bincount(codes, weights=self._masked(self.ratings, mask),
+                                    minlength=size)
+        minimums = np.full(size, np.inf)
+        maximums = np.full(size, -np.inf)
+        np.minimum.at(minimums, codes, prices)
+        np.maximum.at(maximums, codes, prices)
+
+        summary = {}
+        for code, category in enumerate(self.categories):
+            count = int(counts[code])
+            if not count:
+                continue
+            summary[category] = {
+                'count': count, 'total': float(totals[code]),
+                'min': float(minimums[code]), 'max': float(maximums[code]),
+                'mean': float(totals[code]) / count,
+                'mean_rating': float(rating_totals[code]) / count,
+            }
+        return summary
@@ -0,0 +1,227 @@
+# modules/product_query.py
+
+import bisect
+import itertools
+
+from modules.search_index import SearchIndex, fold
+
+# Tris disponibles (mêmes options que le site) ; None = ordre du catalogue
+SORTS = ('price-asc', 'price-desc', 'name', 'id')
+
+
+def _price(product):
+    try:
+        return float(product.get('price') or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _first(entry):
+    return entry[0]
+
+
+class ProductIndexes:
+    """
+    Index secondaires du catalogue, mis à jour produit par produit :
+    - catégorie -> ids, badge -> ids
+    - listes triées (prix, rang, id), (nom sans accents, nom, rang, id) et
+      ids, parcourues avec bisect pour les intervalles de prix et les tris ;
+      à prix ou nom égal, l'ordre est celui du catalogue, comme sur le site
+    - index de recherche plein texte (SearchIndex)
+    - rang de chaque produit dans l'ordre du catalogue : un produit ajouté
+      en tête reçoit un rang inférieur à tous les autres, sans renuméroter.
+    """
+
+    def __init__(self, products=()):
+        self.category_ids = {}
+        self.badge_ids = {}
+        self.search_index = SearchIndex()
+        self._keys = {}   # id -> (rang, clé prix, clé nom, catégorie, badge)
+
+        entries = []
+        for rank, product in enumerate(products):
+            entries.append(self._register(product, rank))
+        self.price_index = sorted(entry[1] for entry in entries)
+        self.name_index = sorted(entry[2] for entry in entries)
+        self.id_index = sorted(product.get('id') for product in products)
+        self._front_rank = 0
+
+    def __len__(self):
+        return len(self._keys)
+
+    def _register(self, product, rank):
+        """Enregistre un produit dans les index non triés. Retourne ses clés."""
+        product_id = product.get('id')
+        name = product.get('name')
+        category = product.get('category') or ''
+        badge = product.get('badge') or ''
+        keys = (rank, (_price(product), rank, product_id),
+                (fold(name), str(name or ''), rank, product_id), category, badge)
+        self._keys[product_id] = keys
+        self.category_ids.setdefault(category, set()).add(product_id)
+        self.badge_ids.setdefault(badge, set()).add(product_id)
+        self.search_index.add(product)
+        return keys
+
+    def add(self, product):
+        """Indexe un nouveau produit, placé en tête du catalogue."""
+        self._front_rank -= 1
+        keys = self._register(product, self._front_rank)
+        bisect.insort(self.price_index, keys[1])
+        bisect.insort(self.name_index, keys[2])
+        bisect.insort(self.id_index, product.get('id'))
+
+    def remove(self, product_id):
+        """Retire un produit des index. Retourne son rang (ou None)."""
+        keys = self._keys.pop(product_id, None)
+        if keys is None:
+            return None
+        rank, price_key, name_key, category, badge = keys
+        for index, key in ((self.price_index, price_key), (self.name_index, name_key),
+                           (self.id_index, product_id)):
+            del index[bisect.bisect_left(index, key)]
+        for mapping, value in ((self.category_ids, category), (self.badge_ids, badge)):
+            ids = mapping[value]
+            ids.discard(product_id)
+            if not ids:
+                del mapping[value]
+        self.search_index.remove(product_id)
+        return rank
+
+    def update(self, product):
+        """Réindexe un produit modifié, sans changer sa place dans le catalogue."""
+        rank = self.remove(product.get('id'))
+        if rank is None:
+            self.add(product)
+            return
+        keys = self._register(product, rank)
+        bisect.insort(self.price_index, keys[1])
+        bisect.insort(self.name_index, keys[2])
+        bisect.insort(self.id_index, product.get('id'))
+
+    # ------------------------------------------------------------------
+    # Requêtes
+    # ------------------------------------------------------------------
+
+    def query(self, products, by_id, category=None, price_range=None, badge=None,
+              min_rating=None, text=None, sort=None, offset=0, limit=None):
+        """Voir ProductService.query()."""
+        stop = None if limit is None else offset + limit
+        results, _ = self._search(products, by_id, category, price_range, badge,
+                                  min_rating, text, sort, stop)
+        return itertools.islice(results, offset, stop)
+
+    def query_page(self, products, by_id, category=None, price_range=None, badge=None,
+                   min_rating=None, text=None, sort=None, offset=0, limit=None):
+        """
+        Comme query(), pour une pagination : retourne (nombre total de
+        résultats, liste des résultats de offset à offset + limit). Le total
+        est connu sans parcourir les résultats quand il n'y a que des filtres
+        catégorie, badge et texte (ou un intervalle de prix avec un tri par
+        prix) ; sinon les résultats sont comptés.
+        """
+        stop = None if limit is None else offset + limit
+        results, total = self._search(products, by_id, category, price_range, badge,
+                                      min_rating, text, sort, stop)
+        if total is not None:
+            return total, list(itertools.islice(results, offset, stop))
+        page = []
+        total = 0
+        for product in results:
+            if offset <= total and (stop is None or total < stop):
+                page.append(product)
+            total += 1
+        return total, page
+
+    def _search(self, products, by_id, category, price_range, badge, min_rating, text,
+                sort, stop):
+        """
+        Résultats ordonnés (itérateur) et leur nombre s'il est connu sans
+        les parcourir (sinon None). 'stop' : nombre de résultats voulus
+        (None = tous).
+        """
+        if sort is not None and sort not in SORTS:
+            raise ValueError(f"Tri inconnu : {sort} ({', '.join(SORTS)})")
+
+        # 1. Ensemble des ids candidats (index catégorie, badge, texte)
+        candidates = None
+        for ids in (self.category_ids.get(category or '', set()) if category is not None else None,
+                    self.badge_ids.get(badge or '', set()) if badge is not None else None,
+                    self.search_index.search(text) if text else None):
+            if ids is None:
+                continue
+            if candidates is None:
+                candidates = ids
+            else:
+                small, large = sorted((candidates, ids), key=len)
+                candidates = {i for i in small if i in large}
+
+        low, high = price_range if price_range is not None else (None, None)
+
+        def accept(product):
+            if min_rating is not None and (product.get('rating') or 0) < min_rating:
+                return False
+            if low is not None or high is not None:
+                price = _price(product)
+                if (low is not None and price < low) or (high is not None and price > high):
+                    return False
+            return True
+
+        # 2. Séquence qui fixe l'ordre (les tris par prix sont bornés par bisect)
+        if sort in ('price-asc', 'price-desc'):
+            start = 0 if low is None else bisect.bisect_left(self.price_index, low, key=_first)
+            end = (len(self.price_index) if high is None
+                   else bisect.bisect_right(self.price_index, high, key=_first))
+            positions = (range(start, end) if sort == 'price-asc'
+                         else self._price_descending(start, end))
+            ordered = (by_id[self.price_index[i][-1]] for i in positions)
+            size = end - start
+        elif sort == 'name':
+            ordered = (by_id[key[-1]] for key in self.name_index)
+            size = len(self.name_index)
+        elif sort == 'id':
+            ordered = (by_id[product_id] for product_id in self.id_index)
+            size = len(self.id_index)
+        else:
+            ordered = iter(products)
+            size = len(products)
+
+        # 3. Parcourir la séquence ordonnée coûte environ page * n / k éléments
+        #    pour k candidats ; s'ils sont peu nombreux, il est moins cher de
+        #    les trier directement (k log k)
+        wanted = size if stop is None else stop
+        if candidates is not None and len(candidates) < wanted * size / max(1, len(candidates)):
+            matches = [by_id[i] for i in candidates if accept(by_id[i])]
+            matches.sort(key=self._sort_key(sort))
+            return iter(matches), len(matches)
+
+        results = (p for p in ordered
+                   if (candidates is None or p.get('id') in candidates) and accept(p))
+        if min_rating is None and sort in ('price-asc', 'price-desc') and candidates is None:
+            return results, size
+        if min_rating is None and low is None and high is None:
+            return results, len(products) if candidates is None else len(candidates)
+        return results, None
+
+    def _price_descending(self, start, end):
+        """
+        Positions de price_index[start:end] par prix décroissant ; à prix
+        égal, dans l'ordre du catalogue (rang croissant), comme le tri du site.
+        """
+        index = self.price_index
+        while end > start:
+            run = bisect.bisect_left(index, index[end - 1][0], start, end, key=_first)
+            yield from range(run, end)
+            end = run
+
+    def _sort_key(self, sort):
+        keys = self._keys
+        if sort == 'price-asc':
+            return lambda p: keys[p.get('id')][1]
+        if sort == 'price-desc':
+            return lambda p: (-keys[p.get('id')][1][0], keys[p.get('id')][0])
+        if sort == 'name':
+            return lambda p: keys[p.get('id')][2]
+        if sort == 'id':
+            return lambda p: p.get('id')
+        return lambda p: keys[p.get('id')][0]
@@ -1,15 +1,160 @@
 # modules/product_service.py
 
+import bisect
+import collections
+import contextlib
+import functools
+import threading
+
+from modules.product import Product, replace, validate
+
+# product_query, catalog_stats et product_columns ne sont importés qu'au
+# premier appel de query(), statistics(), columns() ou reprice() : la ligne
+# de commande et l'API n'en paient pas le coût au démarrage.
+
+
+# Événement publié après chaque modification réussie du catalogue.
+# action : 'added', 'updated', 'removed', ou 'reloaded' (rechargement
+# complet, ex: fichier modifié par un autre programme).
+# index : position du produit dans la liste (None pour 'reloaded').
+ProductChange = collections.namedtuple('ProductChange', 'action product_id index product')
+
+CONFLICT_MESSAGE = ("Ce produit a été modifié entre-temps par un autre utilisateur. "
+                    "Sélectionnez-le à nouveau avant de le modifier.")
+
+
+def _synchronized(method):
+    """Exécute la méthode sous le verrou du service (appels depuis plusieurs threads)."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def _exclusive(method):
+    """
+    Comme _synchronized, en tenant aussi le verrou inter-processus du
+    stockage : la relecture (si un autre processus a écrit), la
+    modification et l'écriture forment une seule opération.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock, self.db.lock():
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class ProductBatch:
+    """
+    Lot de modifications d'un ProductService, enregistré en une seule
+    écriture (une sauvegarde + un db.save) :
+
+        with service.batch() as batch:
+            for product in service.get_all():
+                if product['category'] == 'Beauté':
+                    service.update(product['id'], {**product, 'price': product['price'] * 0.9})
+        success, message = batch.result
+
+    Dans le lot, add/update/delete valident et modifient la mémoire
+    immédiatement (mêmes retours qu'habituellement) mais n'écrivent rien.
+    En sortie du bloc tout est enregistré ; si l'écriture échoue ou si le
+    bloc lève une exception, la mémoire revient à l'état d'avant le lot.
+    Les lots imbriqués font partie du lot extérieur : si l'un d'eux sort
+    sur une exception, le lot entier est annulé à sa sortie, même si
+    l'exception a été rattrapée entre-temps.
+    Les autres threads attendent la fin du lot pour accéder au service,
+    les autres processus pour écrire dans le stockage.
+    """
+
+    def __init__(self, service):
+        self.service = service
+        self.result = None
+
+    def __enter__(self):
+        self.service._begin_batch()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.result = self.service._end_batch(commit=True)
+        else:
+            self.result = self.service._end_batch(commit=False)
+        return False
+
+
+class _PositionIndex:
+    """
+    Position de chaque produit (par id) dans la liste du service, le plus
+    récent en tête, sans renuméroter la liste à chaque ajout en tête.
+    Chaque produit garde un numéro d'arrivée (0 = le plus ancien, un ajout
+    prend le numéro suivant) ; les numéros des produits supprimés sont
+    gardés triés, et ceux qui les précèdent ne comptent pas :
+        position = nombre de produits - 1 - (numéro - numéros supprimés inférieurs)
+    position(), add_front() et remove() coûtent O(1) (plus une recherche
+    bisect parmi les suppressions depuis la construction).
+    """
+
+    def __init__(self, products):
+        count = len(products)
+        self._numbers = {product.get('id'): count - 1 - i for i, product in enumerate(products)}
+        self._removed = []
+        self._count = count
+        self._next = count
+
+    def position(self, product_id):
+        number = self._numbers.get(product_id)
+        if number is None:
+            return None
+        return self._count - 1 - (number - bisect.bisect_left(self._removed, number))
+
+    def add_front(self, product_id):
+        self._numbers[product_id] = self._next
+        self._next += 1
+        self._count += 1
+
+    def remove(self, product_id):
+        number = self._numbers.pop(product_id, None)
+        if number is not None:
+            bisect.insort(self._removed, number)
+        self._count -= 1
+
+
 class ProductService:
     """
     Logique métier pour la gestion des produits.
     Gère les opérations CRUD avec validation.
+    Les méthodes publiques peuvent être appelées depuis un thread de travail.
+    Les abonnés (subscribe) reçoivent un ProductChange après chaque
+    modification ; ils sont appelés sur le thread qui a fait la modification.
+
+    Plusieurs processus peuvent modifier le même stockage : chaque
+    modification prend le verrou du stockage, relit les données si leur
+    version a changé depuis la dernière lecture, puis s'applique sur cette
+    version à jour. Les modifications d'autres produits sont ainsi
+    conservées, et les ids restent uniques. update(..., expected=produit)
+    refuse de modifier un produit changé entre-temps par quelqu'un d'autre.
     """
     
     def __init__(self, db_manager):
         self.db = db_manager
-        self.products = self.db.load()
-        self._calculate_next_id()
+        self._lock = threading.RLock()
+        self.products = []
+        self._by_id = {}
+        self._indexes = None   # index secondaires de query(), construits à la demande
+        self._columns = None   # vue en colonnes de columns(), construite à la demande
+        self._stats = None     # compteurs de statistics(), construits à la demande
+        self._positions = None # positions dans la liste (_PositionIndex), à la demande
+        self._signature = None
+        self._listeners = []
+        # Lot en cours (voir batch())
+        self._batch_depth = 0
+        self._batch_snapshot = None
+        self._batch_changes = []
+        self._batch_dirty = False
+        self._batch_failed = False
+        self._batch_db_lock = None
+        self._reload_products(force=True)
 
     def _calculate_next_id(self):
         """Calcule le prochain ID disponible."""
@@ -23,127 +168,446 @@ class ProductService:
                 max_id = product['id']
         self.next_id = max_id + 1
 
-    def _reload_products(self):
-        """Recharge les produits depuis le fichier pour s'assurer d'avoir la dernière version."""
-        self.products = self.db.load()
+    def _rebuild_index(self):
+        """Reconstruit l'index id -> produit à partir de la liste."""
+        self._by_id = {product.get('id'): product for product in self.products}
+        # Les index de query(), la vue columns() et les compteurs de
+        # statistics() seront reconstruits à la demande
+        self._indexes = None
+        self._columns = None
+        self._stats = None
+        self._positions = None
+
+    def _reload_products(self, force=False):
+        """
+        Recharge les produits depuis le fichier uniquement s'il a changé
+        (mtime, taille ou inode différents de la dernière lecture).
+        """
+        if self._batch_depth and not force:
+            # Pendant un lot la mémoire est en avance sur le fichier
+            return
+        signature = self.db.get_signature()
+        if not force and signature is not None and signature == self._signature:
+            return
+        self.products = Product.from_dicts(self.db.load())
+        self._signature = signature
+        self._rebuild_index()
+        self._calculate_next_id()
+        self._notify('reloaded')
+
+    def subscribe(self, listener):
+        """Abonne 'listener(change)' aux modifications du catalogue."""
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        """Désabonne un listener précédemment abonné."""
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _notify(self, action, product_id=None, index=None, product=None):
+        """Publie un ProductChange à tous les abonnés."""
+        change = ProductChange(action, product_id, index, product)
+        if self._batch_depth:
+            # Publié seulement si le lot est enregistré
+            self._batch_changes.append(change)
+            return
+        for listener in list(self._listeners):
+            try:
+                listener(change)
+            except Exception as e:
+                print(f"Erreur dans un abonné aux modifications des produits : {e}")
+
+    def _persist(self, operation, *args):
+        """
+        Enregistre une modification via le moteur de stockage
+        (db.insert/update/delete/save), ou la diffère jusqu'à la fin du lot.
+        """
+        if self._batch_depth:
+            self._batch_dirty = True
+            return True
+        if operation == 'save':
+            return self.db.save(self.products)
+        return getattr(self.db, operation)(*args, self.products)
+
+    def batch(self):
+        """Retourne un ProductBatch : 'with service.batch():' (voir ProductBatch)."""
+        return ProductBatch(self)
+
+    def _begin_batch(self):
+        self._lock.acquire()
+        if self._batch_depth == 0:
+            db_lock = contextlib.ExitStack()
+            try:
+                db_lock.enter_context(self.db.lock())
+                self._reload_products()
+            except BaseException:
+                db_lock.close()
+                self._lock.release()
+                raise
+            self._batch_db_lock = db_lock
+            self._batch_snapshot = (list(self.products), self.next_id)
+            self._batch_changes = []
+            self._batch_dirty = False
+            self._batch_failed = False
+        self._batch_depth += 1
+
+    def _end_batch(self, commit):
+        """Termine un lot. Retourne un tuple (succès: bool, message: str)."""
+        try:
+            self._batch_depth -= 1
+            if self._batch_depth:
+                # Lot imbriqué : c'est le lot extérieur qui enregistre (ou
+                # annule tout, y compris ce qui précède ce lot-ci)
+                if not commit:
+                    self._batch_failed = True
+                    return False, "Lot imbriqué annulé : le lot entier sera annulé."
+                return True, "Modifications ajoutées au lot."
+
+            if not commit or self._batch_failed:
+                self._rollback_batch()
+                return False, "Lot annulé, aucune modification enregistrée."
+            if not self._batch_dirty:
+                return True, "Aucune modification à enregistrer."
+
+            if not self.db.save(self.products):
+                self._rollback_batch()
+                return False, "Erreur lors de la sauvegarde du lot, modifications annulées."
+
+            self._mark_saved()
+            changes, self._batch_changes = self._batch_changes, []
+            for change in changes:
+                self._notify(*change)
+            return True, f"{len(changes)} modification(s) enregistrée(s)."
+        finally:
+            if not self._batch_depth:
+                self._batch_snapshot = None
+                self._batch_db_lock, db_lock = None, self._batch_db_lock
+                db_lock.close()
+            self._lock.release()
+
+    def _rollback_batch(self):
+        """Rétablit la mémoire telle qu'au début du lot."""
+        products, next_id = self._batch_snapshot
+        self.products = products
+        self.next_id = next_id
+        self._rebuild_index()
+        self._batch_changes = []
+        self._batch_dirty = False
+        self._batch_failed = False
+
+    def _position(self, product):
+        """Position de 'product' (cet objet-là) dans la liste, en O(1)."""
+        if self._positions is None:
+            self._positions = _PositionIndex(self.products)
+        i = self._positions.position(product.get('id'))
+        if i is not None and i < len(self.products) and self.products[i] is product:
+            return i
+        # Ids en double dans le fichier : recherche dans la liste
+        for i, candidate in enumerate(self.products):
+            if candidate is product:
+                return i
+        raise ValueError("produit absent de la liste")
 
+    def _mark_saved(self):
+        """Mémorise la signature du fichier après une écriture réussie."""
+        self._signature = self.db.get_signature()
+
+    @property
+    def signature(self):
+        """Signature du stockage correspondant aux données en mémoire."""
+        return self._signature
+
+    @_synchronized
     def get_all(self):
         """Retourne tous les produits."""
         self._reload_products()
         return self.products
 
+    @_synchronized
     def get_by_id(self, product_id):
         """Retourne un produit par son ID, ou None s'il n'existe pas."""
         self._reload_products()
-        for product in self.products:
-            if product.get('id') == product_id:
-                return product
-        return None
+        return self._by_id.get(product_id)
+
+    @_synchronized
+    def query(self, category=None, price_range=None, badge=None, min_rating=None,
+              text=None, sort=None, offset=0, limit=None):
+        """
+        Recherche des produits à l'aide des index secondaires.
+        - category, badge : valeur exacte ('' = sans catégorie / sans badge)
+        - price_range : (min, max), bornes incluses, None = non borné
+        - min_rating : note minimale
+        - text : termes recherchés dans le nom, la catégorie et la description
+        - sort : None (ordre du catalogue), 'price-asc', 'price-desc', 'name' ou 'id' ;
+          à prix ou nom égal, l'ordre du catalogue (comme le site et l'API)
+        - offset, limit : pagination
+        Retourne un itérateur paresseux : une page coûte de l'ordre de
+        O(log n + taille de la page) quand les filtres ou le tri par prix
+        réduisent la recherche. Le résultat reflète le catalogue au moment
+        du parcours : il n'est sûr que sur le thread qui modifie le service.
+        Depuis un autre thread, utiliser query_list().
+        """
+        from modules.product_query import ProductIndexes
+
+        self._reload_products()
+        if self._indexes is None:
+            self._indexes = ProductIndexes(self.products)
+        return self._indexes.query(self.products, self._by_id, category=category,
+                                   price_range=price_range, badge=badge,
+                                   min_rating=min_rating, text=text, sort=sort,
+                                   offset=offset, limit=limit)
+
+    @_synchronized
+    def query_list(self, **criteria):
+        """
+        Comme query() (mêmes arguments), mais retourne la liste des
+        résultats, construite sous le verrou du service : aucune modification
+        faite par un autre thread ne peut intervenir pendant le parcours.
+        """
+        return list(self.query(**criteria))
+
+    @_synchronized
+    def statistics(self):
+        """
+        Statistiques du catalogue (CatalogSummary : nombre de produits par
+        catégorie et par badge, répartition des prix et des notes, produits
+        sans image). Les compteurs sont calculés au premier appel puis tenus
+        à jour à chaque modification : un appel ne parcourt pas les produits.
+        """
+        from modules.catalog_stats import CatalogStats
 
+        self._reload_products()
+        if self._stats is None:
+            self._stats = CatalogStats(self.products)
+        return self._stats.summary()
+
+    @_synchronized
+    def columns(self):
+        """
+        Vue en colonnes (ProductColumns) du catalogue actuel, pour les
+        statistiques : columns().category_summary(), price_summary()...
+        Nécessite NumPy (RuntimeError sinon). La vue n'est pas modifiée
+        par les opérations suivantes : en redemander une après.
+        """
+        from modules import product_columns
+
+        self._reload_products()
+        if self._columns is None:
+            self._columns = product_columns.ProductColumns(self.products)
+        return self._columns
+
+    @_exclusive
     def add(self, product_data):
         """
         Ajoute un nouveau produit.
         product_data: dict avec les informations du produit (sans 'id').
         Retourne un tuple (succès: bool, message: str).
         """
-        # Validation des données
-        if not product_data.get('name') or not product_data.get('name').strip():
-            return False, "Le nom du produit est obligatoire."
-        
-        try:
-            price = float(product_data.get('price', 0))
-            if price <= 0:
-                return False, "Le prix doit être un nombre supérieur à 0."
-        except (ValueError, TypeError):
-            return False, "Le prix doit être un nombre valide."
+        error = validate(product_data)
+        if error:
+            return False, error
+
+        self._reload_products()
 
         # Ajout du produit avec un ID auto-incrémenté
-        new_product = {
-            'id': self.next_id,
-            'name': product_data['name'].strip(),
-            'price': price,
-            'category': product_data.get('category', ''),
-            'rating': int(product_data.get('rating', 5)),
-            'badge': product_data.get('badge'),
-            'description': product_data.get('description', ''),
-            'image_path': product_data.get('image_path', ''),
-            'icon': product_data.get('icon', '🎁')
-        }
+        new_product = Product.build(self.next_id, product_data)
         
         self.products.insert(0, new_product) # Ajoute au début de la liste
+        self._by_id[new_product['id']] = new_product
+        if self._positions is not None:
+            self._positions.add_front(new_product['id'])
         self.next_id += 1
         
-        # Sauvegarde via le DatabaseManager
-        if self.db.save(self.products):
+        # Sauvegarde via le moteur de stockage
+        if self._persist('insert', new_product):
+            self._mark_saved()
+            if self._indexes is not None:
+                self._indexes.add(new_product)
+            if self._stats is not None:
+                self._stats.add(new_product)
+            self._columns = None
+            self._notify('added', new_product['id'], 0, new_product)
             return True, f"Produit '{new_product['name']}' ajouté avec succès."
         else:
             # En cas d'échec de la sauvegarde, on annule l'ajout en mémoire
             self.products.pop(0)
+            del self._by_id[new_product['id']]
+            if self._positions is not None:
+                self._positions.remove(new_product['id'])
             self.next_id -= 1
             return False, "Erreur lors de la sauvegarde du produit."
 
-    def update(self, product_id, product_data):
+    @_exclusive
+    def update(self, product_id, product_data, expected=None):
         """
         Met à jour un produit existant.
         product_data: dict avec les nouvelles informations.
+        expected: le produit tel qu'il a été lu avant modification (optionnel) ;
+        si le produit enregistré a changé depuis, la mise à jour est refusée.
         Retourne un tuple (succès: bool, message: str).
         """
-        # Validation des données
-        if not product_data.get('name') or not product_data.get('name').strip():
-            return False, "Le nom du produit est obligatoire."
+        error = validate(product_data)
+        if error:
+            return False, error
+
+        self._reload_products()
+
+        old_product = self._by_id.get(product_id)
+        if old_product is None:
+            return False, "Produit non trouvé."
+        if expected is not None and old_product != expected:
+            return False, CONFLICT_MESSAGE
+
+        # Mise à jour des champs
+        updated_product = Product.build(product_id, product_data)
+        i = self._position(old_product)
+        self.products[i] = updated_product
+        self._by_id[product_id] = updated_product
         
+        # Sauvegarde via le moteur de stockage
+        if self._persist('update', updated_product):
+            self._mark_saved()
+            if self._indexes is not None:
+                self._indexes.update(updated_product)
+            if self._stats is not None:
+                self._stats.replace(old_product, updated_product)
+            self._columns = None
+            self._notify('updated', product_id, i, updated_product)
+            return True, f"Produit '{updated_product['name']}' mis à jour."
+        else:
+            # En cas d'échec, on restaure l'ancienne version en mémoire
+            self.products[i] = old_product
+            self._by_id[product_id] = old_product
+            return False, "Erreur lors de la sauvegarde des modifications."
+
+    @_exclusive
+    def import_products(self, rows):
+        """
+        Ajoute un grand nombre de produits en une seule écriture.
+        rows: itérable de (numéro de ligne, dict) ; chaque dict est validé
+        avec les mêmes règles que add(). Les lignes invalides sont ignorées.
+        Les produits sont placés en tête de liste comme s'ils avaient été
+        ajoutés un par un, dans l'ordre.
+        Retourne un tuple (succès: bool, message: str, erreurs) où erreurs
+        est la liste des (numéro de ligne, message) des lignes refusées.
+        """
+        self._reload_products()
+
+        errors = []
+        imported = []
+        next_id = self.next_id
+        for line, product_data in rows:
+            error = validate(product_data)
+            if error:
+                errors.append((line, error))
+                continue
+            imported.append(Product.build(next_id, product_data))
+            next_id += 1
+
+        if not imported:
+            return False, "Aucun produit valide à importer.", errors
+
+        imported.reverse()  # le dernier importé est le plus récent
+        previous_products = self.products
+        self.products = imported + self.products
+
+        # Une seule sauvegarde et une seule écriture pour tout l'import
+        if not self._persist('save'):
+            self.products = previous_products
+            return False, "Erreur lors de la sauvegarde de l'import.", errors
+
+        self._rebuild_index()
+        self.next_id = next_id
+        self._mark_saved()
+        self._notify('reloaded')
+        return True, f"{len(imported)} produit(s) importé(s).", errors
+
+    @_exclusive
+    def reprice(self, percent, category=None, badge=None, price_range=None, min_rating=None):
+        """
+        Augmente (ou baisse, si négatif) de 'percent' % le prix des produits
+        sélectionnés par les filtres (mêmes conventions que query()), en
+        une seule écriture. Les prix sont arrondis au centime.
+        Nécessite NumPy. Retourne un tuple (succès: bool, message: str).
+        """
+        from modules import product_columns
+
+        if not product_columns.is_available():
+            return False, "Le module 'numpy' est requis pour modifier les prix en masse."
         try:
-            price = float(product_data.get('price', 0))
-            if price <= 0:
-                return False, "Le prix doit être un nombre supérieur à 0."
+            factor = 1 + float(percent) / 100
         except (ValueError, TypeError):
-            return False, "Le prix doit être un nombre valide."
-
-        for i, product in enumerate(self.products):
-            if product.get('id') == product_id:
-                # Mise à jour des champs
-                updated_product = {
-                    'id': product_id,
-                    'name': product_data['name'].strip(),
-                    'price': price,
-                    'category': product_data.get('category', ''),
-                    'rating': int(product_data.get('rating', 5)),
-                    'badge': product_data.get('badge'),
-                    'description': product_data.get('description', ''),
-                    'image_path': product_data.get('image_path', ''),
-                    'icon': product_data.get('icon', '🎁')
-                }
-                self.products[i] = updated_product
-                
-                # Sauvegarde via le DatabaseManager
-                if self.db.save(self.products):
-                    return True, f"Produit '{updated_product['name']}' mis à jour."
-                else:
-                    return False, "Erreur lors de la sauvegarde des modifications."
-        
-        return False, "Produit non trouvé."
+            return False, "Le pourcentage doit être un nombre valide."
+
+        self._reload_products()
+        if self._columns is None:
+            self._columns = product_columns.ProductColumns(self.products)
+        columns = self._columns
+        rows = columns.select(category=category, badge=badge, price_range=price_range,
+                              min_rating=min_rating).nonzero()[0]
+        if not len(rows):
+            return False, "Aucun produit ne correspond à la sélection."
+        # Calcul sur la colonne des prix ; seul l'arrondi, identique à
+        # round(prix, 2), et la copie des produits modifiés restent en Python
+        prices = [round(price, 2) for price in (columns.prices[rows] * factor).tolist()]
+        if min(prices) <= 0:
+            return False, "Le prix doit être un nombre supérieur à 0."
+
+        previous_products = self.products
+        self.products = list(previous_products)
+        rows = rows.tolist()
+        for row, price in zip(rows, prices):
+            self.products[row] = replace(self.products[row], price=price)
 
+        # Une seule sauvegarde et une seule écriture pour toute la sélection
+        if not self._persist('save'):
+            self.products = previous_products
+            return False, "Erreur lors de la sauvegarde des nouveaux prix."
+
+        for row in rows:
+            product = self.products[row]
+            self._by_id[product.get('id')] = product
+            if self._stats is not None:
+                self._stats.replace(previous_products[row], product)
+        self._indexes = None
+        self._columns = columns.with_prices(rows, prices)
+        self._mark_saved()
+        self._notify('reloaded')
+        return True, f"Prix de {len(rows)} produit(s) modifié(s) de {float(percent):+g} %."
+
+    @_exclusive
     def delete(self, product_id):
         """
         Supprime un produit.
         Retourne un tuple (succès: bool, message: str).
         """
-        product_to_delete = None
-        for product in self.products:
-            if product.get('id') == product_id:
-                product_to_delete = product
-                break
-        
+        self._reload_products()
+
+        product_to_delete = self._by_id.get(product_id)
         if not product_to_delete:
             return False, "Produit non trouvé."
         
         product_name = product_to_delete.get('name', 'Inconnu')
-        self.products.remove(product_to_delete)
+        i = self._position(product_to_delete)
+        del self.products[i]
+        del self._by_id[product_id]
+        if self._positions is not None:
+            self._positions.remove(product_id)
         
-        # Sauvegarde via le DatabaseManager
-        if self.db.save(self.products):
+        # Sauvegarde via le moteur de stockage
+        if self._persist('delete', product_id):
+            self._mark_saved()
+            if self._indexes is not None:
+                self._indexes.remove(product_id)
+            if self._stats is not None:
+                self._stats.remove(product_to_delete)
+            self._columns = None
+            self._notify('removed', product_id, i, product_to_delete)
             return True, f"Produit '{product_name}' supprimé."
         else:
             # En cas d'échec, on restaure le produit en mémoire
-            self.products.append(product_to_delete)
+            self.products.insert(i, product_to_delete)
+            self._by_id[product_id] = product_to_delete
+            # Réinsertion au milieu de la liste : positions recalculées à la demande
+            self._positions = None
             return False, "Erreur lors de la suppression du produit."
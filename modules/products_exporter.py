@@ -1,79 +1,488 @@
 # modules/products_exporter.py
 
+import hashlib
+import importlib.util
 import json
 import os
-import shutil
-from datetime import datetime
+import re
+
+from modules import json_codec
+
+# L'index de recherche, les images, les sauvegardes et la compression ne
+# sont importés que par les exports qui s'en servent : un export déjà à
+# jour (python -m modules.cli export) se termine sans les charger.
+
+
+def _brotli():
+    """Module brotli (fichiers .br optionnels), ou None s'il n'est pas installé."""
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
 
 class ProductsExporter:
     """
     Exporte les produits du fichier JSON vers un fichier JavaScript
     pour être utilisé par le site web.
+
+    L'export est incrémental : la signature de la source et le hash de
+    chaque fichier produit sont mémorisés dans 'state_file'. Si rien n'a
+    changé, l'export se termine immédiatement ; sinon seuls les fichiers
+    dont le contenu diffère sont réécrits.
+
+    En mode fragmenté ('sharded'), products.js ne contient plus qu'un petit
+    manifeste ; les produits sont écrits par pages de 'page_size' dans
+    'shards_dir' (toutes catégories, puis par catégorie) et le site ne
+    télécharge que les pages qu'il affiche.
+
+    Avec 'search_index', un index de recherche (jetons sans accents et
+    trigrammes) est écrit à côté de products.js dans search-index.js ;
+    le site le charge à la première recherche, avec la version du
+    manifeste (mode fragmenté) ou 'productsVersion' (hash de l'index,
+    écrit dans products.js) en paramètre pour qu'un navigateur ne garde
+    pas un ancien index en cache. Le même fichier contient
+    les ordres de tri précalculés et la liste des produits par catégorie,
+    pour que le site n'ait plus à trier ni filtrer tout le catalogue.
+
+    Les produits dont l'image a été traitée par modules/image_pipeline.py
+    reçoivent un champ 'image_srcset' (variantes WebP/JPEG par largeur)
+    pour que le site télécharge la plus petite image suffisante.
+
+    Le profil 'production' écrit du JSON compact en UTF-8 brut (les emojis
+    ne sont plus échappés) et dépose à côté de chaque fichier ses versions
+    précompressées .gz (et .br si le module brotli est installé), produites
+    de façon déterministe pour être servies telles quelles. Le profil 'dev'
+    garde la sortie indentée habituelle.
     """
     
-    def __init__(self, json_file="products.json", js_file="web/js/products.js"):
+    def __init__(self, json_file="products.json", js_file="web/js/products.js",
+                 state_file="backups/export_state.json", sharded=False,
+                 page_size=9, shards_dir="web/data", shards_url="data",
+                 search_index=True, profile="dev"):
+        if profile not in ("dev", "production"):
+            raise ValueError(f"Profil d'export inconnu : {profile}")
         self.json_file = json_file
         self.js_file = js_file
         self.js_backups_dir = "backups/js_backups"
-        
-        # Crée le dossier de sauvegarde s'il n'existe pas
-        os.makedirs(self.js_backups_dir, exist_ok=True)
+        self.state_file = state_file
+        self.sharded = sharded
+        self.page_size = page_size
+        self.shards_dir = shards_dir
+        self.shards_url = shards_url
+        self.search_index = search_index
+        self.search_index_file = os.path.join(os.path.dirname(js_file), "search-index.js")
+        self.profile = profile
+        self._backup_store = None
         
         # Crée le dossier web/js s'il n'existe pas
         os.makedirs(os.path.dirname(self.js_file), exist_ok=True)
 
+    @property
+    def backup_store(self):
+        """Sauvegardes dédupliquées de products.js (BackupStore), créées au premier usage."""
+        if self._backup_store is None:
+            from modules.backup_store import BackupStore
+            self._backup_store = BackupStore(self.js_backups_dir)
+        return self._backup_store
+
     def backup_current_js_version(self):
         """
         Crée une sauvegarde de la version actuelle du fichier JS.
-        Retourne le chemin du fichier de sauvegarde.
+        Retourne le chemin du fichier de sauvegarde, ou None si le fichier
+        est absent, vide ou identique à la dernière sauvegarde.
         """
-        if os.path.exists(self.js_file):
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_filename = f"products_{timestamp}.js"
-            backup_path = os.path.join(self.js_backups_dir, backup_filename)
-            shutil.copy2(self.js_file, backup_path)
+        backup_path = self.backup_store.backup_file(self.js_file)
+        if backup_path:
             print(f"Sauvegarde du fichier JS créée : {backup_path}")
-            return backup_path
-        return None
+        return backup_path
+
+    def restore_js_backup(self, ref):
+        """
+        Restaure une sauvegarde de products.js (numéro ou préfixe de hash).
+        Retourne True en cas de succès, False sinon.
+        """
+        return self.backup_store.restore(ref, self.js_file)
+
+    # ------------------------------------------------------------------
+    # État de l'export incrémental
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _normalize(value):
+        """Rend une signature comparable à sa version relue depuis le JSON."""
+        return json.loads(json.dumps(value))
+
+    @staticmethod
+    def _file_signature(path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return [stat.st_mtime_ns, stat.st_size, stat.st_ino]
+
+    @staticmethod
+    def _image_dirs(products):
+        """Dossiers des images des produits (là où image_pipeline écrit les variantes)."""
+        return {os.path.dirname(product.get('image_path')) or "."
+                for product in products if product.get('image_path')}
+
+    @staticmethod
+    def _dirs_signature(dirs):
+        """
+        {dossier: mtime} : créer ou remplacer une variante (os.replace) dans
+        un dossier change son mtime, même si le catalogue n'a pas changé.
+        """
+        signature = {}
+        for path in sorted(dirs):
+            try:
+                signature[path] = os.stat(path).st_mtime_ns
+            except OSError:
+                signature[path] = None
+        return signature
+
+    def _load_state(self):
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {'source': None, 'outputs': {}}
+
+    def _save_state(self, state):
+        os.makedirs(os.path.dirname(self.state_file) or ".", exist_ok=True)
+        temp_file = f"{self.state_file}.tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2)
+        os.replace(temp_file, self.state_file)
+
+    def _export_options(self):
+        """Options qui influencent le résultat : en changer force un nouvel export."""
+        return {'sharded': self.sharded, 'page_size': self.page_size,
+                'search_index': self.search_index, 'profile': self.profile,
+                'brotli': importlib.util.find_spec('brotli') is not None}
+
+    def _outputs_intact(self, state):
+        """Vérifie que les fichiers produits n'ont pas été modifiés depuis l'export."""
+        outputs = state.get('outputs', {})
+        return bool(outputs) and all(
+            self._file_signature(path) == info.get('stat')
+            for path, info in outputs.items()
+        )
+
+    def _write_if_changed(self, path, content, state, backup=None):
+        """
+        Écrit 'content' dans 'path' (atomiquement) seulement si son hash
+        diffère de celui du dernier export. 'backup' est appelé juste avant
+        de remplacer le fichier. Retourne True si le fichier a été réécrit.
+        """
+        data = content.encode('utf-8') if isinstance(content, str) else content
+        digest = hashlib.sha256(data).hexdigest()
+        outputs = state.setdefault('outputs', {})
+        previous = outputs.get(path)
+        if (previous and previous.get('hash') == digest
+                and self._file_signature(path) == previous.get('stat')):
+            return False
+
+        if backup:
+            backup()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        temp_file = f"{path}.tmp"
+        try:
+            with open(temp_file, 'wb') as f:
+                f.write(data)
+            os.replace(temp_file, path)
+        finally:
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+
+        outputs[path] = {'hash': digest, 'stat': self._file_signature(path)}
+        return True
+
+    def _dumps(self, data):
+        """
+        Sérialise selon le profil (bytes UTF-8) : indenté en dev, compact
+        et UTF-8 brut en production.
+        """
+        if self.profile == "production":
+            return json_codec.encode(data)
+        return json_codec.encode(data, pretty=True, ensure_ascii=True)
+
+    @staticmethod
+    def _compressors():
+        """Extensions et fonctions de compression (déterministes) des fichiers précompressés."""
+        import gzip
+
+        compressors = [('.gz', lambda data: gzip.compress(data, compresslevel=9, mtime=0))]
+        brotli = _brotli()
+        if brotli is not None:
+            compressors.append(('.br', lambda data: brotli.compress(data, quality=11)))
+        return compressors
+
+    def _write_output(self, path, content, state, written=None, backup=None):
+        """
+        Écrit un fichier d'export (voir _write_if_changed) et, en production,
+        ses versions précompressées. Les chemins produits sont ajoutés à
+        'written'. Retourne True si le fichier principal a été réécrit.
+        """
+        data = content.encode('utf-8') if isinstance(content, str) else content
+        changed = self._write_if_changed(path, data, state, backup=backup)
+        paths = {path}
+
+        if self.profile == "production":
+            outputs = state.setdefault('outputs', {})
+            for extension, compress in self._compressors():
+                sibling = path + extension
+                previous = outputs.get(sibling)
+                # On ne recompresse que si le fichier source a changé
+                if (changed or previous is None
+                        or self._file_signature(sibling) != previous.get('stat')):
+                    self._write_if_changed(sibling, compress(data), state)
+                paths.add(sibling)
+        else:
+            self._remove_stale_outputs(state, paths, path + ".")
+
+        if written is not None:
+            written.update(paths)
+        return changed
+
+    def _remove_stale_outputs(self, state, written, prefix):
+        """Supprime les fichiers sous 'prefix' produits par un export précédent mais plus par celui-ci."""
+        outputs = state.setdefault('outputs', {})
+        for path in list(outputs):
+            if path.startswith(prefix) and path not in written:
+                if os.path.exists(path):
+                    os.remove(path)
+                    try:
+                        os.rmdir(os.path.dirname(path))  # seulement s'il est vide
+                    except OSError:
+                        pass
+                del outputs[path]
+
+    @staticmethod
+    def _with_image_variants(products):
+        """Ajoute 'image_srcset' aux produits dont l'image a des variantes redimensionnées."""
+        from modules.image_pipeline import find_variants
+
+        exported = []
+        for product in products:
+            variants = find_variants(product.get('image_path'))
+            exported.append({**product, 'image_srcset': variants} if variants else product)
+        return exported
+
+    # ------------------------------------------------------------------
+    # Export fragmenté
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _slugify(text):
+        """'Mode & Vêtements' -> 'mode-vetements' (nom de dossier sûr)."""
+        from modules.search_index import fold
+
+        return re.sub(r'[^a-z0-9]+', '-', fold(text)).strip('-') or 'sans-categorie'
+
+    def _write_pages(self, products, folder, state, written, version):
+        """Écrit 'products' par pages de page_size dans 'folder'. Retourne le nombre de pages."""
+        pages = 0
+        for start in range(0, len(products), self.page_size):
+            pages += 1
+            page = products[start:start + self.page_size]
+            content = json_codec.encode(page)
+            version.update(content)
+            path = os.path.join(folder, f"{pages}.json")
+            self._write_output(path, content, state, written)
+        return pages
+
+    def _export_shards(self, products, state):
+        """
+        Écrit les pages de produits et retourne le manifeste décrivant où
+        les trouver (sa taille ne dépend que du nombre de catégories).
+        """
+        written = set()
+        version = hashlib.sha256()
+
+        pages_dir = os.path.join(self.shards_dir, "pages")
+        total_pages = self._write_pages(products, pages_dir, state, written, version)
+
+        by_category = {}
+        for product in products:
+            by_category.setdefault(product.get('category') or '', []).append(product)
+
+        categories = {}
+        for category, items in by_category.items():
+            slug = self._slugify(category)
+            folder = os.path.join(self.shards_dir, "categories", slug)
+            categories[category] = {
+                'slug': slug,
+                'count': len(items),
+                'pages': self._write_pages(items, folder, state, written, version),
+            }
+
+        self._remove_stale_outputs(state, written, self.shards_dir + os.sep)
+
+        return {
+            'version': version.hexdigest()[:12],
+            'total': len(products),
+            'page_size': self.page_size,
+            'pages': total_pages,
+            'page_url': f"{self.shards_url}/pages/{{page}}.json",
+            'category_url': f"{self.shards_url}/categories/{{slug}}/{{page}}.json",
+            'categories': categories,
+            # Produits mis en avant sur l'accueil : affichés sans attendre les pages
+            'featured': [p for p in products if p.get('badge')][:3],
+        }
+
+    # ------------------------------------------------------------------
+    # Index de recherche
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _sort_orders(products):
+        """
+        Positions des produits triées pour chaque option de tri du site
+        (mêmes critères que sortProducts() dans main.js, tri stable).
+        """
+        from modules.search_index import fold
+
+        positions = range(len(products))
 
-    def export_to_js(self):
+        def price(i):
+            try:
+                return float(products[i].get('price') or 0)
+            except (TypeError, ValueError):
+                return 0.0
+
+        def product_id(i):
+            value = products[i].get('id')
+            return value if isinstance(value, (int, float)) else 0
+
+        return {
+            'price-asc': sorted(positions, key=price),
+            'price-desc': sorted(positions, key=lambda i: -price(i)),
+            'name': sorted(positions, key=lambda i: (fold(products[i].get('name')),
+                                                     str(products[i].get('name') or ''))),
+            'id': sorted(positions, key=product_id),
+        }
+
+    @staticmethod
+    def _category_facets(products):
+        """Positions et nombre de produits par catégorie."""
+        facets = {}
+        for i, product in enumerate(products):
+            facet = facets.setdefault(product.get('category') or '', {'count': 0, 'positions': []})
+            facet['count'] += 1
+            facet['positions'].append(i)
+        return facets
+
+    def _export_search_index(self, products, state):
+        """
+        Construit l'index de recherche, les ordres de tri et les catégories,
+        et les écrit dans search-index.js. Retourne la version du fichier
+        (début de son hash), ajoutée à son URL par le site.
+        """
+        from modules.search_index import SearchIndex
+
+        ids = [product.get('id') for product in products]
+        pages = None
+        if self.sharded:
+            pages = [i // self.page_size + 1 for i in range(len(products))]
+        data = SearchIndex(products).export(ids, pages)
+        data['orders'] = self._sort_orders(products)
+        data['categories'] = self._category_facets(products)
+        content = b"const productsSearchIndex = " + json_codec.encode(data) + b";"
+        self._write_output(self.search_index_file, content, state)
+        return hashlib.sha256(content).hexdigest()[:12]
+
+    # ------------------------------------------------------------------
+    # Export
+    # ------------------------------------------------------------------
+
+    def _open_source(self):
         """
-        Lit le fichier JSON, le convertit en variable JS et l'écrit dans products.js.
+        Moteur de stockage de 'json_file' (JSON ou SQLite). Un journal
+        présent à côté du fichier JSON contient des modifications pas encore
+        repliées : il est relu comme le ferait l'application.
+        """
+        from modules.storage_backend import open_storage
+
+        if not os.path.exists(self.json_file):
+            raise FileNotFoundError(self.json_file)
+        journal = os.path.exists(f"{os.path.splitext(self.json_file)[0]}.journal")
+        return open_storage(self.json_file, journal=journal)
+
+    def export_to_js(self, products=None, source_signature=None, force=False):
+        """
+        Lit le catalogue (via son moteur de stockage : journal compris), le
+        convertit en variable JS et l'écrit dans products.js.
+        Si 'products' est fourni (ex: ProductService.get_all()), il est exporté
+        directement, quel que soit le moteur de stockage utilisé ; dans ce cas
+        'source_signature' (ex: ProductService.signature) permet de sauter
+        l'export quand les données n'ont pas changé.
+        L'export est aussi refait quand les dossiers des images ont changé
+        (nouvelles variantes à publier dans 'image_srcset').
+        'force' réécrit tout sans tenir compte de l'état mémorisé.
         Retourne True en cas de succès, False en cas d'erreur.
         """
         try:
-            # 1. Créer une sauvegarde de l'ancien fichier JS
-            self.backup_current_js_version()
-            
-            # 2. Charger les données depuis le fichier JSON
-            with open(self.json_file, 'r', encoding='utf-8') as f:
-                products = json.load(f)
+            # 1. Vérifier si la source a changé depuis le dernier export
+            storage = None
+            if products is None:
+                storage = self._open_source()
+                source_signature = storage.get_signature()
+            state = {'source': None, 'outputs': {}} if force else self._load_state()
+            if (not force and source_signature is not None
+                    and state.get('source') == self._normalize(source_signature)
+                    and state.get('options') == self._export_options()
+                    and state.get('images') == self._dirs_signature(state.get('images', {}))
+                    and self._outputs_intact(state)):
+                print(f"Fichier {self.js_file} déjà à jour.")
+                return True
+
+            # 2. Charger les données (dossiers d'images relevés avant de
+            #    chercher les variantes : une variante écrite pendant
+            #    l'export sera publiée au suivant)
+            if products is None:
+                products = storage.load()
+            images = self._dirs_signature(self._image_dirs(products))
+            products = self._with_image_variants(products)
             
             # 3. Préparer le contenu JavaScript
-            # On utilise json.dumps pour garantir une syntaxe JSON/JS valide
-            js_content = f"const products = {json.dumps(products, indent=2)};"
-            
-            # 4. Écriture atomique via un fichier temporaire
-            temp_file = f"{self.js_file}.tmp"
-            with open(temp_file, 'w', encoding='utf-8') as f:
-                f.write(js_content)
-            
-            # 5. Remplacer le fichier original par le fichier temporaire
-            os.replace(temp_file, self.js_file)
+            # On passe par le JSON pour garantir une syntaxe JS valide
+            index_version = None
+            if self.search_index:
+                index_version = self._export_search_index(products, state)
+            else:
+                self._remove_stale_outputs(state, set(), self.search_index_file)
+
+            if self.sharded:
+                manifest = self._export_shards(products, state)
+                js_content = b"const productsManifest = " + self._dumps(manifest) + b";"
+            else:
+                self._remove_stale_outputs(state, set(), self.shards_dir + os.sep)
+                js_content = b"const products = " + self._dumps(products) + b";"
+                if index_version:
+                    js_content += f'\nconst productsVersion = "{index_version}";'.encode('ascii')
+
+            # 4. Écriture atomique, uniquement si le contenu a changé
+            #    (l'ancien fichier JS est sauvegardé avant d'être remplacé)
+            changed = self._write_output(self.js_file, js_content, state,
+                                         backup=self.backup_current_js_version)
+
+            # 5. Mémoriser la source exportée
+            state['source'] = self._normalize(source_signature)
+            state['options'] = self._export_options()
+            state['images'] = images
+            self._save_state(state)
             
-            print(f"Fichier {self.js_file} mis à jour avec {len(products)} produit(s).")
+            if changed:
+                print(f"Fichier {self.js_file} mis à jour avec {len(products)} produit(s).")
+            else:
+                print(f"Fichier {self.js_file} inchangé ({len(products)} produit(s)).")
             return True
             
         except FileNotFoundError:
             print(f"Erreur : Le fichier {self.json_file} n'a pas été trouvé.")
             return False
-        except json.JSONDecodeError:
-            print(f"Erreur : Le fichier {self.json_file} contient du JSON invalide.")
-            return False
         except Exception as e:
             print(f"Erreur inattendue lors de l'export JS : {e}")
-            # Nettoyer le fichier temporaire en cas d'erreur
-            temp_file = f"{self.js_file}.tmp"
-            if os.path.exists(temp_file):
-                os.remove(temp_file)
             return False
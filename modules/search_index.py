@@ -0,0 +1,157 @@
+# modules/search_index.py
+
+import re
+import unicodedata
+
+# Champs indexés pour la recherche
+SEARCH_FIELDS = ('name', 'category', 'description')
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def fold(text):
+    """Met en minuscules et retire les accents : 'Sérum Éclat' -> 'serum eclat'."""
+    text = unicodedata.normalize('NFKD', str(text or ''))
+    return ''.join(c for c in text if not unicodedata.combining(c)).lower()
+
+
+def tokenize(text):
+    """Découpe un texte en jetons sans accents ('Mode & Vêtements' -> ['mode', 'vetements'])."""
+    return _TOKEN_RE.findall(fold(text))
+
+
+def product_tokens(product):
+    """Retourne l'ensemble des jetons indexés d'un produit."""
+    tokens = set()
+    for field in SEARCH_FIELDS:
+        tokens.update(tokenize(product.get(field)))
+    return tokens
+
+
+def trigrams(token):
+    """Retourne les trigrammes d'un jeton ('serum' -> {'ser', 'eru', 'rum'})."""
+    return {token[i:i + 3] for i in range(len(token) - 2)}
+
+
+class SearchIndex:
+    """
+    Index inversé des produits, mis à jour produit par produit.
+    - jeton -> ids des produits qui le contiennent
+    - trigramme -> jetons qui le contiennent, pour retrouver rapidement
+      les jetons dont un terme recherché est une sous-chaîne.
+    Une recherche renvoie les produits qui contiennent tous les termes.
+    """
+
+    def __init__(self, products=()):
+        self._postings = {}        # jeton -> set(ids)
+        self._tokens_by_id = {}    # id -> frozenset(jetons)
+        self._trigrams = {}        # trigramme -> set(jetons)
+        for product in products:
+            self.add(product)
+
+    def __len__(self):
+        return len(self._tokens_by_id)
+
+    def add(self, product):
+        """Indexe un produit (remplace l'ancienne version s'il était déjà indexé)."""
+        product_id = product.get('id')
+        if product_id in self._tokens_by_id:
+            self.remove(product_id)
+
+        tokens = frozenset(product_tokens(product))
+        self._tokens_by_id[product_id] = tokens
+        for token in tokens:
+            ids = self._postings.get(token)
+            if ids is None:
+                ids = self._postings[token] = set()
+                for trigram in trigrams(token):
+                    self._trigrams.setdefault(trigram, set()).add(token)
+            ids.add(product_id)
+
+    def update(self, product):
+        """Réindexe un produit modifié."""
+        self.add(product)
+
+    def remove(self, product_id):
+        """Retire un produit de l'index."""
+        tokens = self._tokens_by_id.pop(product_id, None)
+        if not tokens:
+            return
+        for token in tokens:
+            ids = self._postings[token]
+            ids.discard(product_id)
+            if not ids:
+                # Plus aucun produit ne contient ce jeton : on l'oublie
+                del self._postings[token]
+                for trigram in trigrams(token):
+                    holders = self._trigrams[trigram]
+                    holders.discard(token)
+                    if not holders:
+                        del self._trigrams[trigram]
+
+    def matching_tokens(self, term):
+        """Retourne les jetons de l'index qui contiennent 'term'."""
+        grams = trigrams(term)
+        if not grams:
+            # Terme de 1 ou 2 caractères : parcours du vocabulaire
+            return [token for token in self._postings if term in token]
+
+        candidates = None
+        for gram in sorted(grams, key=lambda g: len(self._trigrams.get(g, ()))):
+            holders = self._trigrams.get(gram)
+            if not holders:
+                return []
+            candidates = set(holders) if candidates is None else candidates & holders
+            if not candidates:
+                return []
+        # Les trigrammes peuvent être présents sans être contigus : on vérifie
+        return [token for token in candidates if term in token]
+
+    def search(self, query):
+        """
+        Retourne l'ensemble des ids des produits contenant tous les termes
+        de 'query' (chaque terme pouvant être une partie de mot).
+        Retourne None si la requête est vide (= pas de filtre).
+        """
+        terms = tokenize(query)
+        if not terms:
+            return None
+
+        result = None
+        for term in sorted(set(terms), key=len, reverse=True):
+            ids = set()
+            for token in self.matching_tokens(term):
+                ids |= self._postings[token]
+            result = ids if result is None else result & ids
+            if not result:
+                return set()
+        return result
+
+    def export(self, ordered_ids, pages=None):
+        """
+        Sérialise l'index pour le site web.
+        'ordered_ids' fixe l'ordre du catalogue : les listes de résultats
+        contiennent des positions dans ce tableau, déjà triées, ce qui
+        permet au navigateur de les intersecter sans re-trier.
+        'pages' (optionnel) donne, pour chaque position, le numéro de la
+        page de l'export fragmenté qui contient le produit.
+        """
+        position = {product_id: i for i, product_id in enumerate(ordered_ids)}
+        vocabulary = sorted(self._postings)
+        token_index = {token: i for i, token in enumerate(vocabulary)}
+
+        data = {
+            'ids': list(ordered_ids),
+            'tokens': vocabulary,
+            'postings': [
+                sorted(position[i] for i in self._postings[token] if i in position)
+                for token in vocabulary
+            ],
+            'trigrams': {
+                gram: sorted(token_index[token] for token in holders)
+                for gram, holders in sorted(self._trigrams.items())
+            },
+        }
+        if pages is not None:
+            data['pages'] = list(pages)
+        return data
@@ -0,0 +1,202 @@
+# modules/sqlite_manager.py
+
+import json
+import os
+import sqlite3
+import sys
+import threading
+
+from modules import json_codec
+from modules.file_lock import FileLock
+from modules.storage_backend import StorageBackend
+
+class SQLiteDatabaseManager(StorageBackend):
+    """
+    Stockage des produits dans une base SQLite (mode WAL).
+    Chaque ajout, modification ou suppression n'écrit qu'une seule ligne,
+    au lieu de réécrire tout le catalogue comme le fichier JSON ; une
+    sauvegarde du catalogue est faite avant la première de ces écritures,
+    puis toutes les 'backup_every'.
+    """
+
+    def __init__(self, db_file="products.db", backup_every=50):
+        self.db_file = db_file
+        self.backup_every = backup_every
+        self.db_backups_dir = "backups/db_backups"
+        self._lock = threading.Lock()
+        # Verrou inter-processus de ProductService (lecture-modification-écriture)
+        self._file_lock = FileLock(f"{os.path.splitext(db_file)[0]}.lock")
+
+        self.conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+
+    def _create_schema(self):
+        """Crée les tables si elles n'existent pas."""
+        with self.conn:
+            # 'position' conserve l'ordre d'affichage (le plus récent en premier),
+            # 'data' contient le produit complet sérialisé en JSON.
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS products ("
+                " id INTEGER PRIMARY KEY,"
+                " position INTEGER NOT NULL,"
+                " data TEXT NOT NULL)"
+            )
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_products_position ON products(position)"
+            )
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+            )
+            self.conn.execute(
+                "INSERT OR IGNORE INTO meta (key, value) VALUES ('generation', 0)"
+            )
+
+    def _bump_generation(self):
+        """Incrémente le compteur de génération (dans la transaction courante)."""
+        self.conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'generation'")
+
+    def lock(self):
+        """
+        Verrou exclusif inter-processus (réentrant). SQLite protège déjà
+        chaque écriture ; ce verrou évite que deux processus attribuent le
+        même id à deux nouveaux produits.
+        """
+        return self._file_lock
+
+    def get_signature(self):
+        """Retourne le compteur de génération, modifié à chaque écriture."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT value FROM meta WHERE key = 'generation'"
+            ).fetchone()
+        return row[0] if row else None
+
+    def get_modified_time(self):
+        """Date de la dernière écriture (base ou journal WAL)."""
+        return self._latest_mtime(self.db_file, f"{self.db_file}-wal")
+
+    def backup_current_version(self):
+        """
+        Sauvegarde le catalogue au format JSON (même format que products.json,
+        ce qui permet de restaurer indifféremment vers l'un ou l'autre moteur).
+        Retourne le chemin de la sauvegarde, ou None si rien n'a changé.
+        """
+        data = json_codec.encode(self.load(), pretty=True)
+        backup_path = self.backup_store.backup_bytes(data, "products.json")
+        if backup_path:
+            print(f"Sauvegarde de la base de données créée : {backup_path}")
+        return backup_path
+
+    def load(self):
+        """Charge tous les produits, du plus récent au plus ancien."""
+        try:
+            with self._lock:
+                rows = self.conn.execute(
+                    "SELECT data FROM products ORDER BY position DESC"
+                ).fetchall()
+            return [json_codec.decode(row[0]) for row in rows]
+        except (sqlite3.Error, json.JSONDecodeError, UnicodeDecodeError) as e:
+            print(f"Erreur lors de la lecture de la base SQLite : {e}")
+            return []
+
+    @staticmethod
+    def _row_data(product):
+        """Texte JSON stocké dans la colonne 'data' (dict ou Product)."""
+        return json_codec.encode(product).decode('utf-8')
+
+    def save(self, data):
+        """
+        Remplace tout le contenu de la base (import, restauration).
+        Crée une sauvegarde avant d'écrire.
+        Retourne True en cas de succès, False en cas d'erreur.
+        """
+        try:
+            self.backup_current_version()
+            with self._lock, self.conn:
+                self.conn.execute("DELETE FROM products")
+                total = len(data)
+                self.conn.executemany(
+                    "INSERT INTO products (id, position, data) VALUES (?, ?, ?)",
+                    ((product.get('id'), total - i, self._row_data(product))
+                     for i, product in enumerate(data))
+                )
+                self._bump_generation()
+            return True
+        except (sqlite3.Error, OSError) as e:
+            print(f"Erreur lors de la sauvegarde de la base de données : {e}")
+            return False
+
+    def insert(self, product, products=None):
+        """Insère un seul produit en tête de liste."""
+        try:
+            self._periodic_backup()
+            with self._lock, self.conn:
+                self.conn.execute(
+                    "INSERT INTO products (id, position, data) "
+                    "VALUES (?, (SELECT COALESCE(MAX(position), 0) + 1 FROM products), ?)",
+                    (product['id'], self._row_data(product))
+                )
+                self._bump_generation()
+            return True
+        except (sqlite3.Error, OSError) as e:
+            print(f"Erreur lors de l'ajout du produit : {e}")
+            return False
+
+    def update(self, product, products=None):
+        """Met à jour une seule ligne, sans changer sa position."""
+        try:
+            self._periodic_backup()
+            with self._lock, self.conn:
+                cursor = self.conn.execute(
+                    "UPDATE products SET data = ? WHERE id = ?",
+                    (self._row_data(product), product['id'])
+                )
+                if cursor.rowcount == 0:
+                    raise sqlite3.Error(f"produit {product['id']} introuvable")
+                self._bump_generation()
+            return True
+        except (sqlite3.Error, OSError) as e:
+            print(f"Erreur lors de la mise à jour du produit : {e}")
+            return False
+
+    def delete(self, product_id, products=None):
+        """Supprime une seule ligne."""
+        try:
+            self._periodic_backup()
+            with self._lock, self.conn:
+                self.conn.execute("DELETE FROM products WHERE id = ?", (product_id,))
+                self._bump_generation()
+            return True
+        except (sqlite3.Error, OSError) as e:
+            print(f"Erreur lors de la suppression du produit : {e}")
+            return False
+
+    def close(self):
+        """Ferme la connexion à la base."""
+        self.conn.close()
+
+
+def migrate_json_to_sqlite(json_file="products.json", db_file="products.db"):
+    """
+    Importe en une fois le contenu de products.json dans une base SQLite,
+    en conservant l'ordre des produits.
+    Retourne le nombre de produits migrés.
+    """
+    products = json_codec.load(json_file)
+
+    manager = SQLiteDatabaseManager(db_file)
+    try:
+        if not manager.save(products):
+            raise RuntimeError(f"Échec de l'écriture dans {db_file}")
+    finally:
+        manager.close()
+
+    print(f"{len(products)} produit(s) migré(s) de {json_file} vers {db_file}.")
+    return len(products)
+
+
+if __name__ == "__main__":
+    # Usage : python -m modules.sqlite_manager [products.json] [products.db]
+    migrate_json_to_sqlite(*sys.argv[1:3])
@@ -0,0 +1,145 @@
+# modules/storage_backend.py
+
+import contextlib
+import os
+
+from modules import json_codec
+
+
+class StorageBackend:
+    """
+    Interface commune des moteurs de stockage des produits.
+    ProductService ne dépend que de ces méthodes, ce qui permet de passer
+    du fichier JSON à SQLite sans modifier la logique métier.
+    """
+
+    # Moteurs qui écrivent produit par produit (journal, lignes SQLite) :
+    # une sauvegarde avant la première modification puis toutes les
+    # 'backup_every' modifications, au lieu d'une à chaque écriture
+    backup_every = 50
+    _edits_since_backup = 0
+    _backup_store = None
+
+    @property
+    def backup_store(self):
+        """
+        Sauvegardes dédupliquées dans 'db_backups_dir' (BackupStore), créées
+        à la première sauvegarde : ouvrir le stockage n'importe pas gzip ni
+        hashlib et ne crée pas le dossier.
+        """
+        if self._backup_store is None:
+            from modules.backup_store import BackupStore
+            self._backup_store = BackupStore(self.db_backups_dir)
+        return self._backup_store
+
+    def load(self):
+        """Retourne la liste complète des produits."""
+        raise NotImplementedError
+
+    def save(self, data):
+        """Remplace tout le contenu du stockage. Retourne True/False."""
+        raise NotImplementedError
+
+    def get_signature(self):
+        """
+        Retourne une valeur qui change à chaque modification du stockage
+        (ou None si le stockage n'existe pas encore).
+        """
+        raise NotImplementedError
+
+    def backup_current_version(self):
+        """Crée une sauvegarde de l'état actuel. Retourne son chemin ou None."""
+        raise NotImplementedError
+
+    def get_modified_time(self):
+        """
+        Date (timestamp) de la dernière écriture dans le stockage, ou None
+        si elle n'est pas connue.
+        """
+        return None
+
+    @staticmethod
+    def _latest_mtime(*paths):
+        """Plus récente date de modification des fichiers existants parmi 'paths'."""
+        times = []
+        for path in paths:
+            try:
+                times.append(os.stat(path).st_mtime)
+            except OSError:
+                pass
+        return max(times, default=None)
+
+    def _periodic_backup(self):
+        """
+        À appeler avant une modification unitaire : crée une sauvegarde
+        (point de restauration) toutes les 'backup_every' modifications.
+        Au plus 'backup_every' modifications ne sont donc couvertes par
+        aucune sauvegarde. Peut lever OSError.
+        """
+        if self._edits_since_backup % self.backup_every == 0:
+            self.backup_current_version()
+        self._edits_since_backup += 1
+
+    def get_version(self):
+        """
+        Numéro de version du stockage, augmenté à chaque écriture, quel que
+        soit le processus qui écrit. Par défaut : la signature.
+        """
+        return self.get_signature()
+
+    def lock(self):
+        """
+        Verrou exclusif partagé avec les autres processus, à tenir autour
+        d'une lecture-modification-écriture (context manager réentrant).
+        Par défaut : aucun verrou.
+        """
+        return contextlib.nullcontext()
+
+    def list_backups(self):
+        """Retourne les sauvegardes disponibles, de la plus récente à la plus ancienne."""
+        return self.backup_store.list()
+
+    def restore_backup(self, ref):
+        """
+        Restaure la sauvegarde 'ref' (numéro dans list_backups() ou préfixe
+        de hash) en remplaçant tout le contenu du stockage.
+        Retourne True en cas de succès, False sinon.
+        """
+        entry = self.backup_store.find(ref)
+        if entry is None:
+            print(f"Sauvegarde introuvable : {ref}")
+            return False
+        data = json_codec.decode(self.backup_store.read(entry))
+        return self.save(data)
+
+    # Opérations unitaires : par défaut, on réécrit la liste complète.
+    # Les moteurs capables d'écrire ligne par ligne les surchargent.
+
+    def insert(self, product, products):
+        """Enregistre un nouveau produit. 'products' est la liste complète à jour."""
+        return self.save(products)
+
+    def update(self, product, products):
+        """Enregistre la nouvelle version d'un produit existant."""
+        return self.save(products)
+
+    def delete(self, product_id, products):
+        """Supprime un produit. 'products' ne le contient déjà plus."""
+        return self.save(products)
+
+
+SQLITE_EXTENSIONS = ('.db', '.sqlite', '.sqlite3')
+
+
+def open_storage(path="products.json", journal=False):
+    """
+    Retourne le moteur de stockage adapté à l'extension du fichier :
+    SQLite pour .db/.sqlite/.sqlite3, JSON sinon.
+    'journal' active le mode journal du stockage JSON (ignoré pour SQLite).
+    """
+    if os.path.splitext(path)[1].lower() in SQLITE_EXTENSIONS:
+        from modules.sqlite_manager import SQLiteDatabaseManager
+        return SQLiteDatabaseManager(path)
+
+    from modules.database_manager import DatabaseManager
+    return DatabaseManager(path, journal=journal)
@@ -0,0 +1,162 @@
+# modules/thumbnail_cache.py
+
+import collections
+import glob
+import hashlib
+import os
+import threading
+
+from PIL import Image, ImageTk
+
+
+class ThumbnailCache:
+    """
+    Cache des miniatures (90 px) affichées dans le formulaire.
+
+    Deux niveaux :
+    - sur disque : <cache_dir>/<hash du chemin>_<mtime>_<taille>.png,
+      réutilisé d'une session à l'autre. Une image remplacée change de
+      mtime/taille et donc de clé : l'ancienne miniature n'est jamais servie.
+    - en mémoire : LRU des PhotoImage déjà créées.
+
+    Les PhotoImage ne doivent être créées et libérées que sur le thread Tk :
+    get(), store() et invalidate() s'appellent depuis le thread Tk,
+    load_thumbnail() et prefetch() peuvent tourner sur un thread de travail.
+    """
+
+    def __init__(self, cache_dir="cache/thumbnails", size=(90, 90), max_items=256):
+        self.cache_dir = cache_dir
+        self.size = size
+        self.max_items = max_items
+        self._photos = collections.OrderedDict()   # clé -> PhotoImage
+        self._disk_lock = threading.Lock()
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    # ------------------------------------------------------------------
+    # Disque (utilisable depuis n'importe quel thread)
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _path_hash(path):
+        return hashlib.sha1(os.path.abspath(path).encode('utf-8')).hexdigest()
+
+    def cache_key(self, path):
+        """Clé de la miniature de 'path' (chemin, mtime, taille), ou None si absent."""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return f"{self._path_hash(path)}_{stat.st_mtime_ns}_{stat.st_size}"
+
+    def _thumbnail_file(self, key):
+        return os.path.join(self.cache_dir, f"{key}.png")
+
+    def load_thumbnail(self, path, key=None):
+        """
+        Retourne la miniature de 'path' (image PIL) en la lisant depuis le
+        cache disque, ou en la créant à partir de l'original. None si l'image
+        est absente ou illisible.
+        """
+        key = key or self.cache_key(path)
+        if key is None:
+            return None
+
+        thumb_file = self._thumbnail_file(key)
+        try:
+            with Image.open(thumb_file) as img:
+                img.load()
+                return img
+        except (OSError, ValueError):
+            pass
+
+        try:
+            with Image.open(path) as img:
+                # JPEG : décodage directement à une résolution réduite
+                img.draft('RGB', (self.size[0] * 2, self.size[1] * 2))
+                img.thumbnail(self.size)
+                if img.mode not in ('RGB', 'RGBA', 'L', 'LA', 'P'):
+                    img = img.convert('RGBA')
+                thumb = img.copy()
+        except (OSError, ValueError) as e:
+            print(f"Erreur lors de la création de la miniature de {path} : {e}")
+            return None
+
+        with self._disk_lock:
+            # Les miniatures des versions précédentes de l'image sont obsolètes
+            self._remove_disk_thumbnails(path)
+            temp_file = f"{thumb_file}.tmp"
+            try:
+                thumb.save(temp_file, format='PNG')
+                os.replace(temp_file, thumb_file)
+            except OSError as e:
+                print(f"Erreur lors de l'écriture de la miniature : {e}")
+        return thumb
+
+    def _remove_disk_thumbnails(self, path):
+        pattern = os.path.join(self.cache_dir, f"{self._path_hash(path)}_*.png")
+        for thumb_file in glob.glob(pattern):
+            try:
+                os.remove(thumb_file)
+            except OSError:
+                pass
+
+    def prefetch(self, paths):
+        """
+        Prépare les miniatures de 'paths' (thread de travail).
+        Retourne une liste de (clé, image PIL) à passer à store() sur le
+        thread Tk ; les images déjà en mémoire sont ignorées.
+        """
+        results = []
+        for path in paths:
+            if not path:
+                continue
+            key = self.cache_key(path)
+            if key is None or key in self._photos:
+                continue
+            thumb = self.load_thumbnail(path, key)
+            if thumb is not None:
+                results.append((key, thumb))
+        return results
+
+    # ------------------------------------------------------------------
+    # Mémoire (thread Tk uniquement)
+    # ------------------------------------------------------------------
+
+    def _remember(self, key, photo):
+        self._photos[key] = photo
+        self._photos.move_to_end(key)
+        while len(self._photos) > self.max_items:
+            self._photos.popitem(last=False)
+
+    def get(self, path):
+        """Retourne la PhotoImage miniature de 'path', ou None."""
+        key = self.cache_key(path)
+        if key is None:
+            return None
+
+        photo = self._photos.get(key)
+        if photo is not None:
+            self._photos.move_to_end(key)
+            return photo
+
+        thumb = self.load_thumbnail(path, key)
+        if thumb is None:
+            return None
+        photo = ImageTk.PhotoImage(thumb)
+        self._remember(key, photo)
+        return photo
+
+    def store(self, results):
+        """Ajoute au cache mémoire les miniatures préparées par prefetch()."""
+        for key, thumb in results:
+            if key not in self._photos:
+                self._remember(key, ImageTk.PhotoImage(thumb))
+
+    def invalidate(self, path):
+        """Oublie les miniatures de 'path' (image remplacée ou supprimée)."""
+        prefix = f"{self._path_hash(path)}_"
+        for key in [k for k in self._photos if k.startswith(prefix)]:
+            del self._photos[key]
+        with self._disk_lock:
+            self._remove_disk_thumbnails(path)
@@ -10,17 +10,41 @@ const itemsPerPage = 9; // Nombre de produits par page
 let filteredProducts = [];
 const allProducts = []; // Garde une copie non filtrée de tous les produits
 
+// Mode fragmenté : products.js ne contient que 'productsManifest' et les
+// produits sont téléchargés page par page (voir ProductsExporter côté Python)
+let catalogManifest = null;
+let catalogFullyLoaded = false; // true une fois toutes les pages chargées
+let shardCategory = '';         // catégorie affichée en mode fragmenté
+const shardCache = new Map();   // url -> Promise de la liste des produits
+const productsById = new Map(); // id -> produit déjà connu
+let displayRequest = 0;         // numéro du dernier affichage demandé
+
+// Index de recherche précalculé (search-index.js), chargé à la première recherche
+let searchIndex = null;
+let searchIndexPromise = null;
+let viewPositions = null;     // positions (dans l'index) de la vue courante en mode fragmenté :
+                              // résultats de recherche ou liste triée ; null = pages de la catégorie
+
 // =================================================================
 // FONCTIONS D'INITIALISATION AU CHARGEMENT DE LA PAGE
 // =================================================================
 
 document.addEventListener('DOMContentLoaded', function () {
+    // Mode fragmenté : seul le manifeste est chargé, les pages suivront
+    if (typeof productsManifest !== 'undefined' && productsManifest.total > 0) {
+        catalogManifest = productsManifest;
+        registerProducts(catalogManifest.featured);
+
+        displayFeaturedProducts();
+        displayProducts();
+        updateCartCount();
     // Vérifie si les produits sont chargés depuis products.js
-    if (typeof products !== 'undefined' && products.length > 0) {
+    } else if (typeof products !== 'undefined' && products.length > 0) {
         allProducts.length = 0; // Vide le tableau
         allProducts.push(...products); // Copie tous les produits
         filteredProducts.length = 0;
         filteredProducts.push(...allProducts); // Initialise les produits filtrés
+        registerProducts(allProducts);
 
         displayFeaturedProducts();
         displayProducts();
@@ -35,6 +59,117 @@ document.addEventListener('DOMContentLoaded', function () {
     }
 });
 
+// =================================================================
+// CHARGEMENT DES PAGES DU CATALOGUE (MODE FRAGMENTÉ)
+// =================================================================
+
+function registerProducts(list) {
+    list.forEach(p => productsById.set(p.id, p));
+}
+
+function findProduct(productId) {
+    return productsById.get(productId) || allProducts.find(p => p.id === productId);
+}
+
+// Vrai tant que l'affichage se fait page par page depuis le serveur
+function isShardedView() {
+    return catalogManifest !== null && !catalogFullyLoaded;
+}
+
+function shardUrl(category, page) {
+    const template = category
+        ? catalogManifest.category_url.replace('{slug}', catalogManifest.categories[category].slug)
+        : catalogManifest.page_url;
+    return `${template.replace('{page}', page)}?v=${catalogManifest.version}`;
+}
+
+function fetchShard(category, page) {
+    const url = shardUrl(category, page);
+    if (!shardCache.has(url)) {
+        shardCache.set(url, fetch(url)
+            .then(response => {
+                if (!response.ok) throw new Error(`${response.status} ${url}`);
+                return response.json();
+            })
+            .then(list => {
+                registerProducts(list);
+                return list;
+            })
+            .catch(error => {
+                shardCache.delete(url); // on pourra réessayer
+                throw error;
+            }));
+    }
+    return shardCache.get(url);
+}
+
+// Nombre de produits de la vue courante en mode fragmenté
+function viewTotal() {
+    return viewPositions ? viewPositions.length : shardTotal(shardCategory);
+}
+
+function fetchViewRange(start, end) {
+    return viewPositions
+        ? fetchPositionRange(viewPositions.slice(start, end))
+        : fetchProductRange(shardCategory, start, end);
+}
+
+// Télécharge les pages qui contiennent les produits demandés (positions de l'index)
+function fetchPositionRange(positions) {
+    const pages = [...new Set(positions.map(pos => searchIndex.pages[pos]))];
+    return Promise.all(pages.map(page => fetchShard('', page)))
+        .then(() => positions.map(pos => productsById.get(searchIndex.ids[pos])).filter(Boolean));
+}
+
+function shardTotal(category) {
+    if (!category) return catalogManifest.total;
+    const info = catalogManifest.categories[category];
+    return info ? info.count : 0;
+}
+
+// Retourne les produits [start, end) de la catégorie en ne téléchargeant
+// que les pages nécessaires
+function fetchProductRange(category, start, end) {
+    const size = catalogManifest.page_size;
+    end = Math.min(end, shardTotal(category));
+    if (start >= end) return Promise.resolve([]);
+
+    const first = Math.floor(start / size);
+    const last = Math.floor((end - 1) / size);
+    const requests = [];
+    for (let i = first; i <= last; i++) {
+        requests.push(fetchShard(category, i + 1));
+    }
+    return Promise.all(requests).then(pages => {
+        const offset = start - first * size;
+        return pages.flat().slice(offset, offset + (end - start));
+    });
+}
+
+// Charge tout le catalogue (nécessaire pour la recherche et les tris),
+// puis repasse en mode "tout en mémoire"
+function loadAllProducts() {
+    if (!isShardedView()) return Promise.resolve(allProducts);
+
+    const requests = [];
+    for (let page = 1; page <= catalogManifest.pages; page++) {
+        requests.push(fetchShard('', page));
+    }
+    return Promise.all(requests).then(pages => {
+        allProducts.length = 0;
+        allProducts.push(...pages.flat());
+        if (viewPositions) {
+            filteredProducts = viewPositions.map(pos => productsById.get(searchIndex.ids[pos])).filter(Boolean);
+        } else {
+            filteredProducts = shardCategory
+                ? allProducts.filter(p => p.category === shardCategory)
+                : [...allProducts];
+        }
+        catalogFullyLoaded = true;
+        return allProducts;
+    });
+}
+
 // =================================================================
 // FONCTIONS UTILITAIRES
 // =================================================================
@@ -53,6 +188,37 @@ function getImagePath(product) {
     return null; // Pas d'image, on utilisera l'icône
 }
 
+// Largeur d'affichage des images (attribut 'sizes') selon l'emplacement
+const IMAGE_SIZES = {
+    card: '(max-width: 600px) 100vw, 300px',
+    detail: '(max-width: 900px) 100vw, 600px',
+    cart: '80px'
+};
+
+// Le navigateur sait-il afficher le WebP ? (testé une seule fois)
+const SUPPORTS_WEBP = (() => {
+    try {
+        return document.createElement('canvas').toDataURL('image/webp').startsWith('data:image/webp');
+    } catch (e) {
+        return false;
+    }
+})();
+
+function getImageAttributes(product, placement) {
+    // Attributs src/srcset/sizes de la balise <img> d'un produit.
+    // Avec les variantes redimensionnées de l'export (image_srcset), le
+    // navigateur télécharge la plus petite image suffisante pour l'écran.
+    const imageSrc = getImagePath(product);
+    const srcset = product.image_srcset;
+    const variants = srcset && ((SUPPORTS_WEBP && srcset.webp) || srcset.jpeg);
+    if (!variants || !variants.length) {
+        return `src="${imageSrc}"`;
+    }
+    const candidates = variants.map(([path, width]) => `../${path} ${width}w`).join(', ');
+    // src de repli : la plus petite variante
+    return `src="../${variants[0][0]}" srcset="${candidates}" sizes="${IMAGE_SIZES[placement]}" loading="lazy"`;
+}
+
 function showToast(message, type = 'info') {
     const toast = document.createElement('div');
     const colors = {
@@ -95,11 +261,30 @@ function displayProducts() {
 
     const startIndex = (currentPage - 1) * itemsPerPage;
     const endIndex = startIndex + itemsPerPage;
-    const pageProducts = filteredProducts.slice(startIndex, endIndex);
 
+    const request = ++displayRequest;
+    if (isShardedView()) {
+        fetchViewRange(startIndex, endIndex)
+            .then(pageProducts => {
+                // Ignore une réponse arrivée après un changement de page ou de filtre
+                if (request === displayRequest && isShardedView()) {
+                    renderProductGrid(grid, pageProducts);
+                }
+            })
+            .catch(error => {
+                console.error(error);
+                showToast('Impossible de charger les produits', 'error');
+            });
+        return;
+    }
+
+    renderProductGrid(grid, filteredProducts.slice(startIndex, endIndex));
+}
+
+function renderProductGrid(grid, pageProducts) {
     grid.innerHTML = pageProducts.map(product => {
         const imageSrc = getImagePath(product);
-        const imageHtml = imageSrc ? `<img src="${imageSrc}" alt="${product.name}" onerror="this.style.display='none'; this.nextElementSibling.style.display='flex';">
+        const imageHtml = imageSrc ? `<img ${getImageAttributes(product, 'card')} alt="${product.name}" onerror="this.style.display='none'; this.nextElementSibling.style.display='flex';">
                                         <div style="display:none; align-items:center; justify-content:center; height:100%; font-size: 3rem;">${product.icon || '📦'}</div>`
             : `<div style="display:flex; align-items:center; justify-content:center; height:100%; font-size: 3rem;">${product.icon || '📦'}</div>`;
 
@@ -131,11 +316,14 @@ function displayFeaturedProducts() {
 
     // On considère un produit comme "phare" s'il a un badge
     // On utilise 'allProducts' pour toujours avoir la liste complète
-    const featured = allProducts.filter(p => p.badge).slice(0, 3);
+    // (en mode fragmenté, le manifeste fournit déjà la sélection)
+    const featured = catalogManifest
+        ? catalogManifest.featured
+        : allProducts.filter(p => p.badge).slice(0, 3);
 
     grid.innerHTML = featured.map(product => {
         const imageSrc = getImagePath(product);
-        const imageHtml = imageSrc ? `<img src="${imageSrc}" alt="${product.name}" onerror="this.style.display='none'; this.nextElementSibling.style.display='flex';">
+        const imageHtml = imageSrc ? `<img ${getImageAttributes(product, 'card')} alt="${product.name}" onerror="this.style.display='none'; this.nextElementSibling.style.display='flex';">
                                         <div style="display:none; align-items:center; justify-content:center; height:100%; font-size: 3rem;">${product.icon || '📦'}</div>`
             : `<div style="display:flex; align-items:center; justify-content:center; height:100%; font-size: 3rem;">${product.icon || '📦'}</div>`;
 
@@ -164,7 +352,36 @@ function displayFeaturedProducts() {
 // =================================================================
 
 function searchProducts() {
-    const query = document.getElementById('searchBox').value.toLowerCase();
+    const query = document.getElementById('searchBox').value;
+    loadSearchIndex().then(index => {
+        // Une frappe plus récente a déjà lancé sa propre recherche
+        if (document.getElementById('searchBox').value !== query) return;
+
+        if (!index) {
+            searchProductsLinear(query);
+            return;
+        }
+
+        const positions = searchIndexQuery(index, query);
+        if (isShardedView()) {
+            viewPositions = positions;
+        } else {
+            filteredProducts = positions === null
+                ? [...allProducts]
+                : positions.map(pos => productsById.get(index.ids[pos])).filter(Boolean);
+        }
+        currentPage = 1;
+        displayProducts();
+    });
+}
+
+// Recherche sans index (search-index.js absent) : parcours de tous les produits
+function searchProductsLinear(query) {
+    if (isShardedView()) {
+        loadAllProducts().then(() => searchProductsLinear(query));
+        return;
+    }
+    query = query.toLowerCase();
     filteredProducts = allProducts.filter(p =>
         p.name.toLowerCase().includes(query) ||
         p.category.toLowerCase().includes(query)
@@ -173,10 +390,100 @@ function searchProducts() {
     displayProducts();
 }
 
+// =================================================================
+// INDEX DE RECHERCHE
+// =================================================================
+
+// Charge search-index.js à la demande ; résout null s'il est indisponible
+function loadSearchIndex() {
+    if (searchIndexPromise) return searchIndexPromise;
+
+    searchIndexPromise = new Promise(resolve => {
+        if (typeof productsSearchIndex !== 'undefined') {
+            resolve(productsSearchIndex);
+            return;
+        }
+        const script = document.createElement('script');
+        // Même version que le catalogue exporté : un index en cache n'est pas réutilisé
+        const version = catalogManifest ? catalogManifest.version
+            : (typeof productsVersion !== 'undefined' ? productsVersion : null);
+        script.src = version ? `js/search-index.js?v=${version}` : 'js/search-index.js';
+        script.onload = () => resolve(typeof productsSearchIndex !== 'undefined' ? productsSearchIndex : null);
+        script.onerror = () => resolve(null);
+        document.head.appendChild(script);
+    }).then(index => {
+        searchIndex = index;
+        return index;
+    });
+    return searchIndexPromise;
+}
+
+// Même normalisation que modules/search_index.py : minuscules, sans accents
+function foldText(text) {
+    return String(text || '').normalize('NFKD').replace(/\p{M}/gu, '').toLowerCase();
+}
+
+function tokenizeText(text) {
+    return foldText(text).match(/[a-z0-9]+/g) || [];
+}
+
+function intersectSorted(a, b) {
+    const result = [];
+    let i = 0, j = 0;
+    while (i < a.length && j < b.length) {
+        if (a[i] === b[j]) { result.push(a[i]); i++; j++; }
+        else if (a[i] < b[j]) i++;
+        else j++;
+    }
+    return result;
+}
+
+// Indices des jetons du vocabulaire qui contiennent 'term'
+function matchingTokens(index, term) {
+    if (term.length < 3) {
+        const found = [];
+        index.tokens.forEach((token, i) => { if (token.includes(term)) found.push(i); });
+        return found;
+    }
+    let candidates = null;
+    for (let i = 0; i + 3 <= term.length; i++) {
+        const holders = index.trigrams[term.slice(i, i + 3)];
+        if (!holders) return [];
+        candidates = candidates === null ? holders : intersectSorted(candidates, holders);
+        if (candidates.length === 0) return [];
+    }
+    // Les trigrammes peuvent être présents sans être contigus : on vérifie
+    return candidates.filter(i => index.tokens[i].includes(term));
+}
+
+// Positions (triées, dans l'ordre du catalogue) des produits contenant
+// tous les termes de la requête ; null si la requête est vide
+function searchIndexQuery(index, query) {
+    const terms = [...new Set(tokenizeText(query))].sort((a, b) => b.length - a.length);
+    if (terms.length === 0) return null;
+
+    let result = null;
+    for (const term of terms) {
+        const positions = new Set();
+        matchingTokens(index, term).forEach(t => index.postings[t].forEach(pos => positions.add(pos)));
+        const sorted = [...positions].sort((a, b) => a - b);
+        result = result === null ? sorted : intersectSorted(result, sorted);
+        if (result.length === 0) break;
+    }
+    return result;
+}
+
 function filterProducts() {
     const category = document.getElementById('categoryFilter').value;
-    if (category) {
-        filteredProducts = allProducts.filter(p => p.category === category);
+    if (isShardedView()) {
+        shardCategory = category;
+        viewPositions = null;
+    } else if (category) {
+        // Liste précalculée si l'index est déjà chargé, sinon parcours complet
+        const facet = searchIndex && searchIndex.categories[category];
+        filteredProducts = facet
+            ? facet.positions.map(pos => productsById.get(searchIndex.ids[pos])).filter(Boolean)
+            : allProducts.filter(p => p.category === category);
     } else {
         filteredProducts = [...allProducts];
     }
@@ -186,6 +493,39 @@ function filterProducts() {
 
 function sortProducts() {
     const sortType = document.getElementById('sortFilter').value;
+    loadSearchIndex().then(index => {
+        if (!index || !index.orders) {
+            sortProductsInMemory(sortType);
+            return;
+        }
+
+        // Positions de la vue courante (null = tout le catalogue)
+        let base;
+        if (isShardedView()) {
+            base = viewPositions || (shardCategory ? categoryPositions(index, shardCategory) : null);
+        } else {
+            const positionById = indexPositions(index);
+            base = filteredProducts.length === allProducts.length
+                ? null
+                : filteredProducts.map(p => positionById.get(p.id)).filter(pos => pos !== undefined);
+        }
+
+        const sorted = applySortOrder(index, sortType, base);
+        if (isShardedView()) {
+            viewPositions = sorted;
+        } else {
+            filteredProducts = sorted.map(pos => productsById.get(index.ids[pos])).filter(Boolean);
+        }
+        displayProducts();
+    });
+}
+
+// Tri sans index (search-index.js absent)
+function sortProductsInMemory(sortType) {
+    if (isShardedView()) {
+        loadAllProducts().then(() => sortProductsInMemory(sortType));
+        return;
+    }
 
     switch (sortType) {
         case 'price-asc':
@@ -204,6 +544,30 @@ function sortProducts() {
     displayProducts();
 }
 
+function categoryPositions(index, category) {
+    const facet = index.categories[category];
+    return facet ? facet.positions : [];
+}
+
+let positionByIdCache = null;
+function indexPositions(index) {
+    if (!positionByIdCache) {
+        positionByIdCache = new Map(index.ids.map((id, pos) => [id, pos]));
+    }
+    return positionByIdCache;
+}
+
+// Applique un ordre précalculé : aucun tri dans le navigateur, seulement
+// un filtrage linéaire quand la vue ne contient qu'une partie du catalogue
+function applySortOrder(index, sortType, base) {
+    const order = index.orders[sortType] || index.orders.id;
+    if (base === null) return order;
+
+    const inView = new Uint8Array(index.ids.length);
+    base.forEach(pos => { inView[pos] = 1; });
+    return order.filter(pos => inView[pos]);
+}
+
 function filterByCategory(category) {
     showPage('products');
     document.getElementById('categoryFilter').value = category;
@@ -218,7 +582,8 @@ function updatePagination() {
     const paginationContainer = document.getElementById('pagination');
     if (!paginationContainer) return;
 
-    const totalPages = Math.ceil(filteredProducts.length / itemsPerPage);
+    const total = isShardedView() ? viewTotal() : filteredProducts.length;
+    const totalPages = Math.ceil(total / itemsPerPage);
     let html = '';
 
     for (let i = 1; i <= totalPages; i++) {
@@ -238,7 +603,7 @@ function changePage(page) {
 // =================================================================
 
 function addToCart(productId) {
-    const product = allProducts.find(p => p.id === productId);
+    const product = findProduct(productId);
     if (!product) return;
 
     const existingItem = cart.find(item => item.id === productId);
@@ -273,7 +638,7 @@ function displayCart() {
 
     cartItemsContainer.innerHTML = cart.map(item => {
         const imageSrc = getImagePath(item);
-        const imageHtml = imageSrc ? `<img src="${imageSrc}" alt="${item.name}" style="width:100%; height:100%; object-fit:cover;">` : item.icon || '📦';
+        const imageHtml = imageSrc ? `<img ${getImageAttributes(item, 'cart')} alt="${item.name}" style="width:100%; height:100%; object-fit:cover;">` : item.icon || '📦';
 
         return `
         <div class="cart-item">
@@ -341,7 +706,7 @@ function updateCartSummary() {
 // =================================================================
 
 function openProductDetail(productId) {
-    const product = allProducts.find(p => p.id === productId);
+    const product = findProduct(productId);
     if (!product) return;
 
     const modal = document.getElementById('productModal');
@@ -349,7 +714,7 @@ function openProductDetail(productId) {
     if (!modal || !detailContainer) return;
 
     const imageSrc = getImagePath(product);
-    const imageHtml = imageSrc ? `<img src="${imageSrc}" alt="${product.name}" style="width:100%; height:100%; object-fit:cover;">` : product.icon || '📦';
+    const imageHtml = imageSrc ? `<img ${getImageAttributes(product, 'detail')} alt="${product.name}" style="width:100%; height:100%; object-fit:cover;">` : product.icon || '📦';
 
     detailContainer.innerHTML = `
         <div class="product-detail-image">